@@ -0,0 +1,102 @@
+"""
+Requests/s through a FastAPI app with strict auth off and on, driving the ASGI
+app in-process (httpx.ASGITransport) so only the app and middleware cost is
+measured. "legacy" is the previous BaseHTTPMiddleware-based check, kept here
+for comparison; "nested" mounts a sub-app that authenticates again, as run()
+used to do for every configured server.
+
+    python benchmarks/bench_auth.py --requests 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from mcpo.utils.auth import APIKeyMiddleware
+
+API_KEY = "benchmark-key"
+
+
+class LegacyAPIKeyMiddleware(BaseHTTPMiddleware):
+    """The Bearer path of the former BaseHTTPMiddleware implementation."""
+
+    def __init__(self, app, api_key: str):
+        super().__init__(app)
+        self.api_key = api_key
+
+    async def dispatch(self, request, call_next):
+        authorization = request.headers.get("Authorization")
+        if not authorization or authorization[7:] != self.api_key:
+            return JSONResponse(status_code=403, content={"detail": "Invalid API key"})
+        return await call_next(request)
+
+
+def make_app(middleware=None, nested=False) -> FastAPI:
+    app = FastAPI()
+    target = app
+    if nested:
+        target = FastAPI()
+        app.mount("/server", target)
+
+    @target.post("/tool")
+    async def tool():
+        return {"ok": True}
+
+    if middleware is not None:
+        if nested:
+            target.add_middleware(middleware, api_key=API_KEY)
+        app.add_middleware(middleware, api_key=API_KEY)
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {API_KEY}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing and model caches
+        for _ in range(50):
+            (await client.post(path, headers=headers)).raise_for_status()
+
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                (await client.post(path, headers=headers)).raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    cases = [
+        ("no auth", make_app(), "/tool"),
+        ("strict auth (pure ASGI)", make_app(APIKeyMiddleware), "/tool"),
+        ("strict auth (legacy)", make_app(LegacyAPIKeyMiddleware), "/tool"),
+        (
+            "strict auth, legacy, nested",
+            make_app(LegacyAPIKeyMiddleware, nested=True),
+            "/server/tool",
+        ),
+    ]
+    baseline = None
+    for label, app, path in cases:
+        rps = await measure(app, path, args.requests, args.concurrency)
+        baseline = baseline or rps
+        print(f"{label:<30} {rps:8.0f} req/s  ({rps / baseline:5.1%} of no auth)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
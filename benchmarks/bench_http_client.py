@@ -0,0 +1,128 @@
+"""
+Per-call latency of a fresh httpx.AsyncClient per request (the old behaviour of
+the bundled MCP tools) versus the shared, pooled client from
+mcp_tool/http_client.py, against a local stub HTTP server.
+
+    python benchmarks/bench_http_client.py --requests 500
+    python benchmarks/bench_http_client.py --tls   # include a TLS handshake
+
+--tls needs the `openssl` binary to create a throwaway self-signed certificate.
+"""
+
+import argparse
+import asyncio
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp_tool"))
+from http_client import create_http_client  # noqa: E402
+
+BODY = b'{"current": {"temp_c": 25.0, "condition": {"text": "Sunny"}}}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(tls: bool):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    scheme = "http"
+    if tls:
+        tmp = tempfile.mkdtemp()
+        cert, key = os.path.join(tmp, "cert.pem"), os.path.join(tmp, "key.pem")
+        subprocess.run(
+            [
+                "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+                "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=127.0.0.1",
+            ],
+            check=True,
+            capture_output=True,
+        )
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}/"
+
+
+async def fresh_client_call(url: str, verify: bool):
+    async with httpx.AsyncClient(verify=verify) as client:
+        response = await client.get(url, timeout=10)
+        response.raise_for_status()
+
+
+async def measure(name: str, call, requests: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f"{name:<14} mean {statistics.mean(latencies):7.2f} ms  "
+        f"p50 {latencies[len(latencies) // 2]:7.2f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95)]:7.2f} ms  "
+        f"{requests / elapsed:8.1f} req/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--tls", action="store_true")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.tls)
+    verify = not args.tls
+    print(f"Stub server: {url} ({args.requests} requests, concurrency {args.concurrency})")
+
+    await measure(
+        "fresh client",
+        lambda: fresh_client_call(url, verify),
+        args.requests,
+        args.concurrency,
+    )
+
+    shared = create_http_client(verify=verify)
+
+    async def shared_call():
+        response = await shared.get(url, timeout=10)
+        response.raise_for_status()
+
+    await measure("shared client", shared_call, args.requests, args.concurrency)
+    await shared.aclose()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
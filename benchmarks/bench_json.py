@@ -0,0 +1,100 @@
+"""
+Milliseconds per tool call for JSON tool output from 1 KB to 10 MB, with and
+without --fast-json, driving a tool endpoint in-process (httpx.ASGITransport)
+against a session that returns a prebuilt payload, so only the proxy's decode
+and encode cost is measured. Objects take the raw passthrough in fast mode;
+arrays are decoded and re-encoded with orjson.
+
+    python benchmarks/bench_json.py --sizes 1K 100K 1M 10M
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import FastAPI
+from mcp import types
+
+from mcpo.utils import fastjson
+from mcpo.utils.main import get_model_fields, get_tool_handler
+
+UNITS = {"K": 1024, "M": 1024 * 1024}
+
+
+def parse_size(value: str) -> int:
+    unit = UNITS.get(value[-1].upper())
+    return int(value[:-1]) * unit if unit else int(value)
+
+
+def make_items(size: int) -> list:
+    item = {
+        "id": 0,
+        "title": "A search result title",
+        "url": "https://example.com/some/page",
+        "score": 0.8731,
+        "tags": ["alpha", "beta", "gamma"],
+        "text": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3,
+    }
+    count = max(1, size // len(json.dumps(item)))
+    return [dict(item, id=i) for i in range(count)]
+
+
+class PayloadSession:
+    def __init__(self, text: str):
+        self.result = types.CallToolResult(
+            content=[types.TextContent(type="text", text=text)]
+        )
+
+    async def call_tool(self, name, arguments=None):
+        return self.result
+
+
+def make_app(text: str) -> FastAPI:
+    app = FastAPI()
+    fields = get_model_fields("tool_form_model", {}, [])
+    app.post("/tool")(get_tool_handler(PayloadSession(text), "tool", fields))
+    return app
+
+
+async def measure(text: str, repeat: int) -> float:
+    transport = httpx.ASGITransport(app=make_app(text))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        (await client.post("/tool", json={})).raise_for_status()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            (await client.post("/tool", json={})).raise_for_status()
+        return (time.perf_counter() - started) / repeat * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", default=["1K", "100K", "1M", "10M"])
+    parser.add_argument(
+        "--budget", type=float, default=2.0, help="seconds to spend per case"
+    )
+    args = parser.parse_args()
+
+    if not fastjson.available():
+        parser.error("orjson is not installed (pip install 'mcpo[fast]')")
+
+    print(f"{'payload':<16} {'default':>10} {'fast':>10} {'speedup':>8}")
+    for size in map(parse_size, args.sizes):
+        items = make_items(size)
+        for shape, payload in (("object", {"items": items}), ("array", items)):
+            text = json.dumps(payload, indent=1)
+            row = []
+            for enable in (fastjson.disable, fastjson.enable):
+                enable()
+                once = await measure(text, 1) / 1000
+                row.append(await measure(text, max(3, int(args.budget / once))))
+            fastjson.disable()
+            label = f"{len(text) / 1024:,.0f} KB {shape}"
+            print(
+                f"{label:<16} {row[0]:8.2f}ms {row[1]:8.2f}ms {row[0] / row[1]:7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
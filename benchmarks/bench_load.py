@@ -0,0 +1,358 @@
+"""
+End-to-end load test of mcpo against the stub MCP server
+(benchmarks/stub_mcp_server.py) over stdio, SSE and streamable HTTP.
+
+For each transport, mcpo runs as a separate process with a one-server
+config. A concurrent load generator then posts to ``/stub/work`` and reports
+req/s and p50/p95/p99 latency. The same load is also sent straight to the
+stub through an MCP client session, and the difference is reported as the
+latency the proxy adds.
+
+With --workers, the proxy is measured once per number of HTTP worker
+processes (mcpo --workers), e.g. ``--workers 1 2 4`` to see how throughput
+scales with cores; those results are reported as ``{transport}/workers={n}``.
+
+Results can be saved as a JSON baseline, and a later run can be compared
+against one. The run exits with status 1 when a metric regressed by more
+than --tolerance.
+
+    python benchmarks/bench_load.py --transports stdio sse streamable-http \
+        --requests 2000 --concurrency 32 --latency-ms 5 --payload-bytes 4096 \
+        --content json --output benchmarks/results/baseline.json
+    python benchmarks/bench_load.py --compare benchmarks/results/baseline.json
+    python benchmarks/bench_load.py --transports stdio --workers 1 2 4 \
+        --latency-ms 0 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STUB = os.path.join(HERE, "stub_mcp_server.py")
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+
+# For --compare: metrics where bigger is better, the rest are latencies
+HIGHER_IS_BETTER = {"rps"}
+COMPARED = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def stub_args(args, transport: str, port: int = 0) -> list:
+    return [
+        STUB,
+        "--transport", transport,
+        "--port", str(port),
+        "--latency-ms", str(args.latency_ms),
+        "--payload-bytes", str(args.payload_bytes),
+        "--content", args.content,
+        "--error-rate", str(args.error_rate),
+    ]  # fmt: skip
+
+
+async def wait_for(url: str, timeout: float = 60, accept=(200,)):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(url, timeout=2)
+                if response.status_code in accept:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError(f"{url} did not come up within {timeout}s")
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+    }
+
+
+async def generate_load(call, requests: int, concurrency: int, warmup: int) -> dict:
+    """Run ``call`` ``requests`` times from ``concurrency`` workers; it returns ok."""
+    for _ in range(warmup):
+        await call()
+
+    latencies, errors, remaining = [], 0, requests
+
+    async def worker():
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                ok = await call()
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+@contextlib.asynccontextmanager
+async def stub_process(args, transport: str):
+    """The stub's URL for mcpo's config, running it when it serves over HTTP."""
+    if transport == "stdio":
+        yield None
+        return
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, *stub_args(args, transport, port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        # Any HTTP answer means the server is listening
+        await wait_for(base, accept=range(200, 500))
+        yield f"{base}/sse" if transport == "sse" else f"{base}/mcp"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@contextlib.asynccontextmanager
+async def mcp_session(args, transport: str, url):
+    if transport == "stdio":
+        params = StdioServerParameters(
+            command=sys.executable, args=stub_args(args, "stdio")
+        )
+        streams = stdio_client(params, errlog=open(os.devnull, "w"))
+    elif transport == "sse":
+        streams = sse_client(url)
+    else:
+        streams = streamablehttp_client(url)
+    async with streams as (reader, writer, *_):
+        async with ClientSession(reader, writer) as session:
+            await session.initialize()
+            yield session
+
+
+@contextlib.asynccontextmanager
+async def mcpo_process(args, transport: str, url, workers: int = 1):
+    if transport == "stdio":
+        server = {"command": sys.executable, "args": stub_args(args, "stdio")}
+    else:
+        server = {"type": transport.replace("-", "_"), "url": url}
+    if args.pool > 1:
+        server["pool"] = {"min": args.pool, "max": args.pool}
+    server["healthCheck"] = False
+
+    port = free_port()
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump({"mcpServers": {"stub": server}}, f)
+    command = [
+        sys.executable, "-c", "from mcpo import app; app()",
+        "--config", f.name,
+        "--port", str(port),
+        "--log-level", "WARNING",
+        "--workers", str(workers),
+        *args.mcpo_arg,
+    ]  # fmt: skip
+    process = subprocess.Popen(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        await wait_for(f"{base}/readyz")
+        yield base
+    finally:
+        process.terminate()
+        process.wait()
+        os.unlink(f.name)
+
+
+async def bench_transport(args, transport: str) -> dict:
+    """Results by name: the transport, plus ``/workers={n}`` beyond one worker."""
+    results = {}
+    async with stub_process(args, transport) as url:
+        async with mcp_session(args, transport, url) as session:
+
+            async def direct_call():
+                result = await session.call_tool("work", {})
+                return not result.isError
+
+            direct = await generate_load(
+                direct_call, args.requests, args.concurrency, args.warmup
+            )
+
+        for workers in args.workers:
+            async with mcpo_process(args, transport, url, workers) as base:
+                limits = httpx.Limits(
+                    max_connections=args.concurrency,
+                    max_keepalive_connections=args.concurrency,
+                )
+                async with httpx.AsyncClient(
+                    base_url=base, limits=limits, timeout=60
+                ) as client:
+
+                    async def proxy_call():
+                        response = await client.post("/stub/work", json={})
+                        return response.status_code < 400
+
+                    proxy = await generate_load(
+                        proxy_call, args.requests, args.concurrency, args.warmup
+                    )
+
+            overhead = {
+                key: round(proxy[key] - direct[key], 3)
+                for key in ("mean_ms", "p50_ms", "p95_ms", "p99_ms")
+            }
+            name = transport if workers == 1 else f"{transport}/workers={workers}"
+            results[name] = {"proxy": proxy, "direct": direct, "overhead_ms": overhead}
+    return results
+
+
+def compare(baseline: dict, results: dict, tolerance: float) -> bool:
+    """Print the change of each metric; returns whether any regressed too far."""
+    regressed = False
+    print(f"\nAgainst baseline from {baseline['meta']['date']}:")
+    for transport, result in results.items():
+        old = baseline["results"].get(transport)
+        if old is None:
+            continue
+        for key in COMPARED:
+            before, after = old["proxy"][key], result["proxy"][key]
+            if not before:
+                continue
+            change = (after - before) / before
+            worse = -change if key in HIGHER_IS_BETTER else change
+            flag = ""
+            if worse > tolerance:
+                flag, regressed = "  REGRESSION", True
+            print(
+                f"  {transport:<26} {key:<7} {before:>10} -> {after:>10} "
+                f"({change:+.1%}){flag}"
+            )
+    return regressed
+
+
+def print_table(results: dict):
+    print(
+        f"{'transport':<26} {'path':<7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7}"
+    )
+    for transport, result in results.items():
+        for path in ("direct", "proxy"):
+            r = result[path]
+            print(
+                f"{transport:<26} {path:<7} {r['rps']:>8} {r['p50_ms']:>8} "
+                f"{r['p95_ms']:>8} {r['p99_ms']:>8} {r['errors']:>7}"
+            )
+        o = result["overhead_ms"]
+        print(
+            f"{transport:<26} {'added':<7} {'':>8} {o['p50_ms']:>8} "
+            f"{o['p95_ms']:>8} {o['p99_ms']:>8}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=TRANSPORTS)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--payload-bytes", type=int, default=4096)
+    parser.add_argument(
+        "--content", choices=("text", "json", "image"), default="json"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--pool", type=int, default=1, help="Sessions per server")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1],
+        help="mcpo HTTP worker processes; one proxy run per value",
+    )
+    parser.add_argument(
+        "--mcpo-arg",
+        action="append",
+        default=[],
+        help="Extra mcpo option, e.g. --mcpo-arg=--fast-json (repeatable)",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="Relative change counted as a regression by --compare",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for transport in args.transports:
+        print(f"Running {transport}...", file=sys.stderr)
+        results.update(await bench_transport(args, transport))
+
+    print_table(results)
+
+    settings = {
+        key: getattr(args, key)
+        for key in (
+            "requests", "concurrency", "warmup", "latency_ms", "payload_bytes",
+            "content", "error_rate", "pool", "workers", "mcpo_arg",
+        )
+    }  # fmt: skip
+    report = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": settings,
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["settings"] != settings:
+            print("Warning: the baseline was recorded with different settings")
+        if compare(baseline, results, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Time the event loop spends logging each tool call's arguments, for a call
+carrying a large argument (e.g. a workflow or a prompt with a pasted
+document), written to a file as stderr would be:
+
+- print: the previous print() of the whole argument dict
+- sync: a plain StreamHandler, formatting and writing on the loop
+- queued: setup_logging's queue handler with Truncated arguments; the
+  listener thread formats and writes
+
+    python benchmarks/bench_logging.py --calls 2000 --size 50000
+"""
+
+import argparse
+import contextlib
+import logging
+import tempfile
+import time
+
+from mcpo.utils.logs import Truncated, setup_logging
+
+
+def run(calls: int, log_call) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        log_call()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=50000)
+    args = parser.parse_args()
+
+    tool_args = {"prompt": "x" * args.size, "options": {"n": 1, "tags": ["a"] * 50}}
+    logger = logging.getLogger("bench")
+    results = {}
+
+    with tempfile.TemporaryFile("w") as out:
+        with contextlib.redirect_stdout(out):
+            results["print"] = run(
+                args.calls,
+                lambda: print(f"Calling endpoint: echo, with args: {tool_args}"),
+            )
+
+        handler = logging.StreamHandler(out)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+        logging.getLogger().handlers[:] = [handler]
+        logging.getLogger().setLevel(logging.INFO)
+        results["sync"] = run(
+            args.calls,
+            lambda: logger.info("Calling %s with args: %s", "echo", tool_args),
+        )
+
+        with contextlib.redirect_stderr(out):
+            listener = setup_logging()
+            results["queued"] = run(
+                args.calls,
+                lambda: logger.info(
+                    "Calling %s with args: %s", "echo", Truncated(tool_args)
+                ),
+            )
+            listener.stop()
+
+    print(f"{args.calls} calls, {args.size} byte argument; µs on the event loop per call")
+    for label, us in results.items():
+        print(f"{label:<8} {us:8.1f} µs  ({results['print'] / us:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Per-request overhead of the proxy's middleware and routing as the number of
+mounted MCP servers grows, driving the ASGI app in-process. Every request goes
+to the last mounted server, under strict auth with CORS.
+
+"per-sub-app" is the former layout: CORS, auth and a startup check added to
+the main app and again to every sub-app, with Starlette matching the mounts
+one by one. "shared" is the current layout: one stack on the main app and
+ServerDispatchMiddleware looking the server up by name.
+
+    python benchmarks/bench_middleware.py --servers 1 10 50 200
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from mcpo.utils.auth import APIKeyMiddleware
+from mcpo.utils.runner import ServerDispatchMiddleware
+
+API_KEY = "benchmark-key"
+CORS = dict(
+    allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"]
+)
+
+
+class RunningRunner:
+    def __init__(self, app, name):
+        self.app = app
+        self.name = name
+        self.running = True
+
+
+class StartupCheck:
+    """Stand-in for the former per-sub-app startup middleware."""
+
+    def __init__(self, app, runner):
+        self.app = app
+        self.runner = runner
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not self.runner.running:
+            raise RuntimeError("not started")
+        await self.app(scope, receive, send)
+
+
+def make_sub_app() -> FastAPI:
+    sub_app = FastAPI()
+
+    @sub_app.post("/get_weather")
+    async def get_weather():
+        return {"ok": True}
+
+    return sub_app
+
+
+def per_sub_app(servers: int) -> FastAPI:
+    main_app = FastAPI()
+    main_app.add_middleware(CORSMiddleware, **CORS)
+    main_app.add_middleware(APIKeyMiddleware, api_key=API_KEY)
+    for i in range(servers):
+        sub_app = make_sub_app()
+        sub_app.add_middleware(StartupCheck, runner=RunningRunner(sub_app, str(i)))
+        sub_app.add_middleware(CORSMiddleware, **CORS)
+        sub_app.add_middleware(APIKeyMiddleware, api_key=API_KEY)
+        main_app.mount(f"/server{i}", sub_app)
+    return main_app
+
+
+def shared(servers: int) -> FastAPI:
+    main_app = FastAPI()
+    runners = {}
+    main_app.add_middleware(ServerDispatchMiddleware, runners=runners)
+    main_app.add_middleware(APIKeyMiddleware, api_key=API_KEY)
+    main_app.add_middleware(CORSMiddleware, **CORS)
+    for i in range(servers):
+        sub_app = make_sub_app()
+        runners[f"server{i}"] = RunningRunner(sub_app, str(i))
+        main_app.mount(f"/server{i}", sub_app)
+    return main_app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> float:
+    headers = {"Authorization": f"Bearer {API_KEY}", "Origin": "http://webui"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):
+            (await client.post(path, headers=headers)).raise_for_status()
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.post(path, headers=headers)
+        return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--servers", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    print(f"{'servers':>8} {'per-sub-app':>14} {'shared':>14}")
+    for servers in args.servers:
+        path = f"/server{servers - 1}/get_weather"
+        before = await measure(per_sub_app(servers), path, args.requests)
+        after = await measure(shared(servers), path, args.requests)
+        print(f"{servers:>8} {before:>11.0f} us {after:>11.0f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
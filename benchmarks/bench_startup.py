@@ -0,0 +1,160 @@
+"""
+Time to build a server's endpoints (create_dynamic_endpoints) for 100+ tools
+whose schemas share nested objects, as many real servers' do:
+
+- legacy: models compiled per tool, nothing shared (the previous behaviour)
+- cold: the process-wide schema-hash cache, starting empty
+- warm: every model already compiled, as after a reconnect, or at startup when
+  --tool-cache precompiled the stored tool list while the server was starting
+
+    python benchmarks/bench_startup.py --tools 120
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from mcp import types
+from pydantic import create_model
+
+import mcpo.main
+from mcpo.main import create_dynamic_endpoints
+from mcpo.utils import main as utils
+from mcpo.utils.main import _process_schema_property
+
+SHARED = {
+    "pagination": {
+        "type": "object",
+        "properties": {
+            "page": {"type": "integer", "default": 1},
+            "per_page": {"type": "integer", "default": 20},
+            "cursor": {"type": ["string", "null"]},
+        },
+    },
+    "location": {
+        "type": "object",
+        "properties": {
+            "city": {"type": "string"},
+            "country": {"type": "string"},
+            "coordinates": {
+                "type": "object",
+                "properties": {
+                    "lat": {"type": "number"},
+                    "lon": {"type": "number"},
+                },
+                "required": ["lat", "lon"],
+            },
+        },
+    },
+    "filters": {
+        "type": "object",
+        "properties": {
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "since": {"type": "string", "description": "ISO date"},
+            "owner": {
+                "type": "object",
+                "properties": {"id": {"type": "string"}, "kind": {"type": "string"}},
+            },
+        },
+    },
+}
+
+
+def make_tools(count: int) -> list:
+    tools = []
+    for i in range(count):
+        properties = {
+            "query": {"type": "string", "description": f"Query for tool {i}"},
+            "limit": {"type": "integer", "default": 10},
+            "options": {
+                "type": "object",
+                "properties": {
+                    f"flag_{j}": {"type": "boolean"} for j in range(i % 5 + 1)
+                },
+            },
+        }
+        for name in list(SHARED)[: i % 3 + 1]:
+            properties[name] = SHARED[name]
+        tools.append(
+            types.Tool(
+                name=f"tool_{i}",
+                description=f"Tool number {i}",
+                inputSchema={
+                    "type": "object",
+                    "properties": properties,
+                    "required": ["query"],
+                },
+            )
+        )
+    return tools
+
+
+class ToolsSession:
+    def __init__(self, tools):
+        self.tools = tools
+
+    async def initialize(self):
+        return SimpleNamespace(serverInfo=None)
+
+    async def list_tools(self):
+        return SimpleNamespace(tools=self.tools)
+
+
+def legacy_get_model(model_name, schema):
+    properties = schema.get("properties", {})
+    if not properties:
+        return None
+    # A fresh cache per tool, as get_model_fields used to have
+    model_cache = {}
+    fields = {
+        name: _process_schema_property(
+            model_cache,
+            prop,
+            model_name,
+            name,
+            name in schema.get("required", []),
+            schema.get("$defs", {}),
+        )
+        for name, prop in properties.items()
+    }
+    return create_model(model_name, **fields)
+
+
+async def build(tools) -> float:
+    app = FastAPI()
+    app.state.session = ToolsSession(tools)
+    started = time.perf_counter()
+    await create_dynamic_endpoints(app)
+    return (time.perf_counter() - started) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tools", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tools = make_tools(args.tools)
+    results = {}
+
+    mcpo.main.get_model = legacy_get_model
+    results["legacy"] = min([await build(tools) for _ in range(args.repeat)])
+    mcpo.main.get_model = utils.get_model
+
+    cold = []
+    for _ in range(args.repeat):
+        utils._MODEL_CACHE.clear()
+        cold.append(await build(tools))
+    results["cold"] = min(cold)
+
+    results["warm"] = min([await build(tools) for _ in range(args.repeat)])
+
+    print(f"{args.tools} tools, {len(utils._MODEL_CACHE)} cached models")
+    for label, ms in results.items():
+        print(f"{label:<8} {ms:8.1f} ms  ({results['legacy'] / ms:4.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
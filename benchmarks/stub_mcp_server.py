@@ -0,0 +1,76 @@
+"""
+Stub MCP server for benchmarks/bench_load.py: a single ``work`` tool with
+tunable latency, payload size, content type and error rate, served over
+stdio, SSE or streamable HTTP. Every tunable is a default that a call can
+override with the tool argument of the same name.
+
+    python benchmarks/stub_mcp_server.py --transport sse --port 9001 \
+        --latency-ms 5 --payload-bytes 4096 --content json --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import os
+import random
+
+from mcp.server.fastmcp import FastMCP, Image
+
+CONTENT_TYPES = ("text", "json", "image")
+
+# A valid PNG header, so clients that sniff the image see one
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+def make_payload(content: str, size: int):
+    if content == "text":
+        return ("lorem ipsum " * (size // 12 + 1))[:size]
+    if content == "json":
+        item = {"id": 0, "title": "A search result", "score": 0.87, "tags": ["a", "b"]}
+        # ~70 bytes per serialized item
+        return {"items": [{**item, "id": i} for i in range(max(1, size // 70))]}
+    return Image(data=PNG_HEADER + os.urandom(max(0, size - len(PNG_HEADER))), format="png")
+
+
+def build_server(args) -> FastMCP:
+    mcp = FastMCP("stub", host="127.0.0.1", port=args.port, log_level="WARNING")
+    # Built once per (content, size), so the stub itself costs next to nothing
+    payloads = {}
+
+    @mcp.tool()
+    async def work(
+        latency_ms: float = args.latency_ms,
+        payload_bytes: int = args.payload_bytes,
+        content: str = args.content,
+        error_rate: float = args.error_rate,
+    ):
+        """Wait latency_ms, then return payload_bytes of content, or fail with probability error_rate."""
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if error_rate and random.random() < error_rate:
+            raise RuntimeError("Injected failure")
+        if content not in CONTENT_TYPES:
+            raise ValueError(f"content must be one of {CONTENT_TYPES}")
+        key = (content, payload_bytes)
+        if key not in payloads:
+            payloads[key] = make_payload(content, payload_bytes)
+        return payloads[key]
+
+    return mcp
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--transport", choices=("stdio", "sse", "streamable-http"), default="stdio"
+    )
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=1024)
+    parser.add_argument("--content", choices=CONTENT_TYPES, default="text")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    build_server(args).run(transport=args.transport)
@@ -1,20 +1,111 @@
 from mcp.server import FastMCP
 import os
+import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from exa_py import Exa
 import json
 from dotenv import load_dotenv
 import logging
-from typing import Dict, Any, List
+from log_setup import setup_logging
+from typing import Dict, Any, List, Optional
+from cancellation import enable_request_cancellation
 
 # 設置日誌
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # 載入環境變數
 load_dotenv()
 
+# 移除 HTML 標籤用的預編譯正規表示式
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# exa_multi_search 單次最多查詢數
+MAX_QUERIES = 10
+
+# Exa SDK 為同步實作，放到有上限的執行緒池中執行，避免阻塞事件迴圈
+_executor: Optional[ThreadPoolExecutor] = None
+_users = 0
+
+# 共用的 Exa 客戶端 (與建立時的 API Key 一併保存)
+_exa: Optional[Exa] = None
+_exa_api_key: Optional[str] = None
+
+
+def get_exa_client(api_key: str) -> Exa:
+    """取得共用的 Exa 客戶端，僅在首次使用或 API Key 變更時建立"""
+    global _exa, _exa_api_key
+    if _exa is None or _exa_api_key != api_key:
+        _exa = Exa(api_key=api_key)
+        _exa_api_key = api_key
+    return _exa
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """取得共用的執行緒池；若服務 lifespan 尚未建立或已關閉則即時建立"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("EXA_MAX_WORKERS", "8")),
+            thread_name_prefix="exa",
+        )
+    return _executor
+
+
+@asynccontextmanager
+async def exa_lifespan(server):
+    """FastMCP lifespan：啟用取消處理，並於最後一個連線結束時釋放執行緒池"""
+    global _executor, _users
+    enable_request_cancellation()
+    executor = get_executor()
+    _users += 1
+    try:
+        yield {}
+    finally:
+        _users -= 1
+        # SSE / Streamable HTTP 模式下每個連線都會進入 lifespan，最後一個離開時才關閉
+        if _users == 0:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if _executor is executor:
+                _executor = None
+
+
 # 創建一個 MCP 服務器
-mcp = FastMCP("EXA 搜索服務")
+mcp = FastMCP("EXA 搜索服務", lifespan=exa_lifespan)
+
+
+async def _search(exa: Exa, query: str, num_results: int, category: str, search_type: str) -> List[Any]:
+    """在執行緒池中執行搜索並返回結果列表"""
+    loop = asyncio.get_running_loop()
+    search_response = await loop.run_in_executor(
+        get_executor(),
+        lambda: exa.search_and_contents(
+            query,
+            text=True,
+            num_results=num_results,
+            category=category,
+            type=search_type
+        )
+    )
+    return search_response.results
+
+
+def _format_results(results: List[Any]) -> str:
+    """將搜索結果格式化為文字"""
+    formatted_content = []
+    for result in results:
+        content = f"標題: {result.title if hasattr(result, 'title') else '無標題'}\n"
+        content += f"網址: {result.url if hasattr(result, 'url') else '無網址'}\n"
+        if getattr(result, 'text', None):
+            # 移除 HTML 標籤
+            clean_text = HTML_TAG_PATTERN.sub('', result.text)
+            content += f"內容:\n{clean_text}\n"
+        formatted_content.append(content)
+
+    return "\n---\n".join(formatted_content) if formatted_content else "無搜索結果"
+
 
 @mcp.tool()
 async def exa_search(query: str, num_results: int = 5, category: str = "web", search_type: str = "keyword") -> str:
@@ -36,34 +127,74 @@ async def exa_search(query: str, num_results: int = 5, category: str = "web", se
         if not exa_api_key:
             return "錯誤：未設置 EXA_API_KEY"
 
-        # 初始化 Exa 客戶端
-        exa = Exa(api_key=exa_api_key)
-
         # 執行搜索
-        search_response = exa.search_and_contents(
-            query,
-            text=True,
-            num_results=num_results,
-            category=category,
-            type=search_type
-        )
-
-        # 取得搜索結果
-        results = search_response.results
+        results = await _search(get_exa_client(exa_api_key), query, num_results, category, search_type)
 
         # 格式化結果
-        formatted_content = []
-        for result in results:
-            content = f"標題: {result.title if hasattr(result, 'title') else '無標題'}\n"
-            content += f"網址: {result.url if hasattr(result, 'url') else '無網址'}\n"
-            if hasattr(result, 'text'):
-                # 移除 HTML 標籤
-                import re
-                clean_text = re.sub(r'<[^>]+>', '', result.text)
-                content += f"內容:\n{clean_text}\n"
-            formatted_content.append(content)
-
-        return "\n---\n".join(formatted_content) if formatted_content else "無搜索結果"
+        return _format_results(results)
+
+    except Exception as e:
+        logger.error(f"搜索過程中發生錯誤: {str(e)}")
+        return f"發生錯誤：{str(e)}"
+
+
+@mcp.tool()
+async def exa_multi_search(queries: List[str], num_results: int = 5, category: str = "web", search_type: str = "keyword") -> str:
+    """
+    同時以多個關鍵字進行 EXA 搜索，合併結果並依網址去除重複
+    
+    Args:
+        queries (List[str]): 搜索關鍵字列表 (最多 10 個)
+        num_results (int): 每個關鍵字返回的結果數量，預設為5
+        category (str): 搜索類別，預設為"web"
+        search_type (str): 搜索類型，預設為"keyword"
+        
+    Returns:
+        str: 格式化的合併搜索結果
+    """
+    try:
+        # 檢查 API Key
+        exa_api_key = os.getenv("EXA_API_KEY")
+        if not exa_api_key:
+            return "錯誤：未設置 EXA_API_KEY"
+
+        queries = [query for query in dict.fromkeys(q.strip() for q in queries) if query]
+        if not queries:
+            return "錯誤：未提供搜索關鍵字"
+        if len(queries) > MAX_QUERIES:
+            return f"錯誤：一次最多只能搜索 {MAX_QUERIES} 個關鍵字"
+
+        # 並行執行所有搜索，個別失敗不影響其他查詢
+        exa = get_exa_client(exa_api_key)
+        responses = await asyncio.gather(
+            *(_search(exa, query, num_results, category, search_type) for query in queries),
+            return_exceptions=True
+        )
+
+        # 依查詢順序合併結果，並依網址去除重複
+        merged = []
+        seen_urls = set()
+        errors = []
+        for query, response in zip(queries, responses):
+            if isinstance(response, Exception):
+                logger.error(f"搜索 {query} 時發生錯誤: {str(response)}")
+                errors.append(f"{query}: {str(response)}")
+                continue
+            for result in response:
+                url = getattr(result, 'url', None)
+                if url:
+                    if url in seen_urls:
+                        continue
+                    seen_urls.add(url)
+                merged.append(result)
+
+        if errors and len(errors) == len(queries):
+            return "發生錯誤：" + "; ".join(errors)
+
+        output = _format_results(merged)
+        if errors:
+            output += "\n\n部分搜索失敗：\n" + "\n".join(errors)
+        return output
 
     except Exception as e:
         logger.error(f"搜索過程中發生錯誤: {str(e)}")
@@ -80,6 +211,7 @@ def get_search_info() -> str:
 2. 支持自定義搜索結果數量
 3. 支持自定義搜索類別和類型
 4. 自動格式化搜索結果
+5. 同時搜索多個關鍵字並依網址合併結果
 
 使用方法：
 - 使用 exa_search 工具進行搜索，可指定：
@@ -87,10 +219,12 @@ def get_search_info() -> str:
   * 結果數量 (num_results)
   * 搜索類別 (category)
   * 搜索類型 (search_type)
+- 使用 exa_multi_search 工具同時搜索多個關鍵字 (queries，最多 10 個)
 - 使用 get_search_info 工具獲取服務信息
 
 環境配置：
 - EXA_API_KEY: EXA Search API 的金鑰
+- EXA_MAX_WORKERS: 同時進行的搜索請求上限 (預設 8)
 
 支援的搜索類別：
 - web: 網頁搜索
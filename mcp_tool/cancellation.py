@@ -0,0 +1,78 @@
+import logging
+from types import SimpleNamespace
+
+from mcp.shared.session import RequestResponder
+
+logger = logging.getLogger(__name__)
+
+_enabled = False
+
+
+def _request_responder_exit(self, exc_type, exc_val, exc_tb):
+    """
+    與 RequestResponder.__exit__ 相同，但會回傳 cancel scope 的結果
+
+    舊版 MCP SDK 忽略了 cancel scope 是否吞下取消例外，
+    收到 notifications/cancelled 時 CancelledError 會一路拋出並讓整個服務結束。
+    """
+    suppress = False
+    try:
+        if self._completed:
+            self._on_complete(self)
+    finally:
+        self._entered = False
+        if not self._cancel_scope:
+            raise RuntimeError("No active cancel scope")
+        suppress = self._cancel_scope.__exit__(exc_type, exc_val, exc_tb)
+    return suppress
+
+
+class _SuppressingScope:
+    """只會吞下例外的 cancel scope 替身，用來檢查 __exit__ 是否回傳其結果"""
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return True
+
+
+def _probe_sdk_exit():
+    """
+    以替身呼叫安裝的 RequestResponder.__exit__，回傳其結果
+
+    1.8.0 的實作只用到修補也會用到的屬性，並忽略 cancel scope 的結果而回傳 None；
+    內部實作改變（用到其他屬性）時會拋出例外。
+    """
+    responder = SimpleNamespace(
+        _completed=False,
+        _on_complete=None,
+        _entered=True,
+        _cancel_scope=_SuppressingScope(),
+    )
+    return RequestResponder.__exit__(responder, None, None, None)
+
+
+def enable_request_cancellation():
+    """
+    讓 MCP 服務能安全處理客戶端的取消通知
+
+    取消時工具協程會收到 CancelledError，進行中的 httpx 請求隨之中止並釋放連線，
+    服務本身則繼續處理後續請求。可重複呼叫。
+
+    只在安裝的 SDK 仍有此問題時才修補；無法確認時記錄警告並略過，
+    工具照常運作，只是取消時無法提早中止。
+    """
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    try:
+        suppressed = _probe_sdk_exit()
+    except Exception as e:
+        logger.warning(
+            f"此版本 MCP SDK 的 RequestResponder.__exit__ 與預期不同（{e!r}），略過請求取消修補"
+        )
+        return
+    if suppressed:
+        logger.debug("此版本 MCP SDK 已會回傳 cancel scope 的結果，不需修補")
+        return
+    RequestResponder.__exit__ = _request_responder_exit
+    logger.debug("已啟用 MCP 請求取消處理")
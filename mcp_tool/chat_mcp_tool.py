@@ -1,13 +1,14 @@
 from mcp.server import FastMCP
 import os
-import httpx
+from http_client import get_http_client, http_client_lifespan
+from log_setup import setup_logging, truncate
 from dotenv import load_dotenv
 import logging
 import uuid
 from typing import Dict, Any
 
 # 設置日誌
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # 載入環境變數
@@ -17,7 +18,7 @@ load_dotenv()
 CHAT_API_URL = os.getenv("CHAT_API_URL")
 
 # 創建 MCP 服務器
-mcp = FastMCP("聊天服務")
+mcp = FastMCP("聊天服務", lifespan=http_client_lifespan)
 
 @mcp.tool()
 async def chat(message: str) -> Dict[str, Any]:
@@ -41,25 +42,26 @@ async def chat(message: str) -> Dict[str, Any]:
         }
         
         # 發送請求獲取聊天回應
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                CHAT_API_URL,
-                json=request_data,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
-            
-            logger.info(f"API回應狀態碼: {response.status_code}")
-            logger.info(f"API回應內容: {response.text}")
-            
-            response.raise_for_status()
-            chat_data = response.json()
-            
-            return {
-                "session_id": session_id,
-                "message": message,
-                "response": chat_data.get("output", "無回應")
-            }
+        client = get_http_client()
+        response = await client.post(
+            CHAT_API_URL,
+            json=request_data,
+            headers={"Content-Type": "application/json"},
+            timeout=10
+        )
+        
+        logger.info("API回應狀態碼: %s，內容長度: %d", response.status_code, len(response.content))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("API回應內容: %s", truncate(response.text))
+        
+        response.raise_for_status()
+        chat_data = response.json()
+        
+        return {
+            "session_id": session_id,
+            "message": message,
+            "response": chat_data.get("output", "無回應")
+        }
         
     except Exception as e:
         logger.error(f"處理請求時發生錯誤：{str(e)}")
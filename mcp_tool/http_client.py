@@ -0,0 +1,83 @@
+import os
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import httpx
+
+from cancellation import enable_request_cancellation
+
+logger = logging.getLogger(__name__)
+
+# 由 MCP 服務 lifespan 建立並共用的 httpx 客戶端
+_client: Optional[httpx.AsyncClient] = None
+_users = 0
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    """
+    建立啟用 keep-alive 連線池的 httpx 客戶端
+
+    可透過環境變數調整：
+    - HTTP_MAX_CONNECTIONS: 最大連線數 (預設 100)
+    - HTTP_MAX_KEEPALIVE_CONNECTIONS: 最大閒置保留連線數 (預設 20)
+    - HTTP_KEEPALIVE_EXPIRY: 閒置連線保留秒數 (預設 30)
+    - HTTP_TIMEOUT: 預設逾時秒數 (預設 30，各工具仍可在請求時覆寫)
+    - HTTP_CONNECT_TIMEOUT: 連線逾時秒數 (預設 10)
+    - HTTP2: 是否啟用 HTTP/2 (需安裝 h2，預設關閉)
+
+    其餘參數會直接傳給 httpx.AsyncClient。
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+    timeout = httpx.Timeout(
+        float(os.getenv("HTTP_TIMEOUT", "30")),
+        connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", "10")),
+    )
+
+    http2 = _env_bool("HTTP2")
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP2 已啟用但未安裝 h2 套件，改用 HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2, **kwargs)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """取得共用的 httpx 客戶端；若服務 lifespan 尚未建立則即時建立"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+@asynccontextmanager
+async def http_client_lifespan(server):
+    """FastMCP lifespan：在服務啟動時建立共用客戶端，並於關閉時釋放連線"""
+    global _client, _users
+    # 客戶端中斷時 mcpo 會送出取消通知，讓工具中止對外請求而不是讓服務崩潰
+    enable_request_cancellation()
+    client = get_http_client()
+    _users += 1
+    try:
+        yield {"http_client": client}
+    finally:
+        _users -= 1
+        # SSE / Streamable HTTP 模式下每個連線都會進入 lifespan，最後一個離開時才關閉
+        if _users == 0:
+            await client.aclose()
+            if _client is client:
+                _client = None
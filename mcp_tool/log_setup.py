@@ -0,0 +1,51 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# 單一日誌欄位（例如 API 回應內容）最多保留的字元數
+LOG_MAX_LENGTH = int(os.getenv("LOG_MAX_LENGTH", "500"))
+
+_listener: Optional[QueueListener] = None
+
+
+class _QueueHandler(QueueHandler):
+    # 佇列只在同一程序內使用，格式化交給背景執行緒，不在事件迴圈上進行
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(
+    format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+) -> None:
+    """
+    設置日誌：記錄先放入佇列，由背景執行緒格式化並寫入 stderr，
+    避免同步 I/O 阻塞 MCP 服務的事件迴圈
+
+    可透過環境變數 LOG_LEVEL 調整等級 (預設 INFO)。
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(format))
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    _listener = QueueListener(queue_handler.queue, handler)
+    _listener.start()
+    # 結束前寫出佇列中剩餘的記錄
+    atexit.register(_listener.stop)
+
+
+def truncate(text: str, limit: int = LOG_MAX_LENGTH) -> str:
+    """截斷過長的日誌內容，並註明省略的字元數"""
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}…（省略 {len(text) - limit} 字元）"
@@ -3,17 +3,19 @@ import logging
 from dotenv import load_dotenv
 from mcp.server import FastMCP
 import httpx
+from http_client import get_http_client, http_client_lifespan
+from log_setup import setup_logging
 import json
 
 # 設置日誌
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+setup_logging(format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # 載入環境變數
 load_dotenv()
 
 # 創建 MCP 服務
-mcp = FastMCP("Flux 圖片生成服務")
+mcp = FastMCP("Flux 圖片生成服務", lifespan=http_client_lifespan)
 
 @mcp.tool()
 async def generate_flux_image(
@@ -71,43 +73,43 @@ async def generate_flux_image(
     logger.info(f"Webhook payload: {payload}")
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=60)
-            if response.status_code != 200:
-                return f"API 請求錯誤：狀態碼 {response.status_code}"
-
-            data = response.json()
-            image_links = data.get("image_urls") or data.get("圖片連結", "[]")
-            # image_links 可能是字串型態的 JSON 陣列
-            if isinstance(image_links, str):
-                try:
-                    image_objs = json.loads(image_links)
-                except Exception:
-                    image_objs = []
-            else:
-                image_objs = image_links
-
-            # image_objs 可能是 [{'url': ...}] 或直接是 url 字串陣列
-            image_urls = []
-            if isinstance(image_objs, list):
-                for item in image_objs:
-                    if isinstance(item, dict) and "url" in item:
-                        image_urls.append(item["url"])
-                    elif isinstance(item, str):
-                        image_urls.append(item)
-
-            if not image_urls:
-                return "錯誤：API 返回空回應"
-
-            image_url = image_urls[0]
-            if not image_url.startswith(('http://', 'https://')):
-                logger.error(f'無效的圖片 URL: {image_url}')
-                return "錯誤：收到無效的圖片 URL"
-
-            logger.info(f"成功獲取圖片 URL：{image_url}")
-
-            # 返回 Markdown 格式的圖片
-            return f"""
+        client = get_http_client()
+        response = await client.post(url, json=payload, timeout=60)
+        if response.status_code != 200:
+            return f"API 請求錯誤：狀態碼 {response.status_code}"
+
+        data = response.json()
+        image_links = data.get("image_urls") or data.get("圖片連結", "[]")
+        # image_links 可能是字串型態的 JSON 陣列
+        if isinstance(image_links, str):
+            try:
+                image_objs = json.loads(image_links)
+            except Exception:
+                image_objs = []
+        else:
+            image_objs = image_links
+
+        # image_objs 可能是 [{'url': ...}] 或直接是 url 字串陣列
+        image_urls = []
+        if isinstance(image_objs, list):
+            for item in image_objs:
+                if isinstance(item, dict) and "url" in item:
+                    image_urls.append(item["url"])
+                elif isinstance(item, str):
+                    image_urls.append(item)
+
+        if not image_urls:
+            return "錯誤：API 返回空回應"
+
+        image_url = image_urls[0]
+        if not image_url.startswith(('http://', 'https://')):
+            logger.error(f'無效的圖片 URL: {image_url}')
+            return "錯誤：收到無效的圖片 URL"
+
+        logger.info(f"成功獲取圖片 URL：{image_url}")
+
+        # 返回 Markdown 格式的圖片
+        return f"""
 ### 生成的圖片
 
 ![Generated Image]({image_url})
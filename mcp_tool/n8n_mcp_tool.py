@@ -1,13 +1,15 @@
 from mcp.server import FastMCP
 import os
 import httpx
+from http_client import get_http_client, http_client_lifespan
+from log_setup import setup_logging, truncate
 from dotenv import load_dotenv
 import logging
 from typing import Dict, Any, List
 import json
 
 # 設置日誌
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # 載入環境變數
@@ -19,7 +21,7 @@ N8N_API_KEY = os.getenv("N8N_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # 用於生成工作流程
 
 # 創建 MCP 服務器
-mcp = FastMCP("n8n 工作流程設計助手")
+mcp = FastMCP("n8n 工作流程設計助手", lifespan=http_client_lifespan)
 
 @mcp.tool()
 async def design_workflow(prompt: str) -> Dict[str, Any]:
@@ -71,115 +73,115 @@ async def design_workflow(prompt: str) -> Dict[str, Any]:
         """
         
         # 使用 Gemini 生成工作流程
-        async with httpx.AsyncClient() as client:
-            try:
-                # Gemini API 端點和認證方式
-                gemini_model = "gemini-2.0-flash" # 參考 test.json 中的模型，您也可以使用 "gemini-pro" 或其他版本
-                response = await client.post(
-                    f"https://generativelanguage.googleapis.com/v1beta/models/{gemini_model}:generateContent",
-                    headers={
-                        "x-goog-api-key": GEMINI_API_KEY, # Gemini 使用 x-goog-api-key
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "contents": [
-                            {
-                                "role": "user",
-                                "parts": [{"text": full_prompt_for_gemini}]
-                            }
-                        ],
-                        "generationConfig": {
-                            "temperature": 0.7
+        client = get_http_client()
+        try:
+            # Gemini API 端點和認證方式
+            gemini_model = "gemini-2.0-flash" # 參考 test.json 中的模型，您也可以使用 "gemini-pro" 或其他版本
+            response = await client.post(
+                f"https://generativelanguage.googleapis.com/v1beta/models/{gemini_model}:generateContent",
+                headers={
+                    "x-goog-api-key": GEMINI_API_KEY, # Gemini 使用 x-goog-api-key
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "contents": [
+                        {
+                            "role": "user",
+                            "parts": [{"text": full_prompt_for_gemini}]
                         }
-                    },
-                    timeout=180 # 增加超時時間，給模型更多生成時間
-                )
-                
-                response.raise_for_status() # 檢查HTTP錯誤 (例如 4xx, 5xx)
-
-            except httpx.HTTPStatusError as e:
-                # 捕獲 HTTP 狀態錯誤
-                error_detail = ""
-                try:
-                    # 嘗試解析 Gemini 返回的錯誤 JSON
-                    error_json = e.response.json()
-                    error_detail = json.dumps(error_json, indent=2)
-                except json.JSONDecodeError:
-                    # 如果不是 JSON，則直接使用響應文本
-                    error_detail = e.response.text
-                
-                logger.error(f"Gemini API 請求失敗 - HTTP 錯誤: {e.response.status_code}, 詳細: {error_detail}")
-                return {
-                    "status": "error",
-                    "message": f"呼叫Gemini API失敗 (HTTP {e.response.status_code})。詳細訊息: {error_detail}"
-                }
-            except httpx.RequestError as e:
-                # 捕獲網路相關錯誤
-                logger.error(f"Gemini API 請求失敗 - 網路錯誤: {str(e)}")
-                return {
-                    "status": "error",
-                    "message": f"呼叫Gemini API失敗 (網路錯誤): {str(e)}"
-                }
-            except Exception as e:
-                # 捕獲 httpx 請求過程中其他未預期的錯誤
-                logger.error(f"Gemini API 請求時發生未知錯誤: {str(e)}")
-                return {
-                    "status": "error",
-                    "message": f"呼叫Gemini API時發生未知錯誤: {str(e)}"
-                }
-            
-            # --- 繼續處理成功的響應 ---
-            try:
-                gemini_response_data = response.json()
-                # 檢查 Gemini 響應結構
-                if not gemini_response_data or "candidates" not in gemini_response_data or not gemini_response_data["candidates"]:
-                    logger.error(f"Gemini API 返回非預期結構或空響應: {response.text}")
-                    return {
-                        "status": "error",
-                        "message": f"Gemini API 返回非預期結構或空響應。原始響應: {response.text[:200]}..."
+                    ],
+                    "generationConfig": {
+                        "temperature": 0.7
                     }
-                
-                # 從 Gemini 響應中提取生成的內容
-                workflow_json_content = gemini_response_data["candidates"][0]["content"]["parts"][0]["text"]
+                },
+                timeout=180 # 增加超時時間，給模型更多生成時間
+            )
+            
+            response.raise_for_status() # 檢查HTTP錯誤 (例如 4xx, 5xx)
 
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.error(f"解析Gemini響應或提取內容失敗: {str(e)}, 原始響應: {response.text}")
+        except httpx.HTTPStatusError as e:
+            # 捕獲 HTTP 狀態錯誤
+            error_detail = ""
+            try:
+                # 嘗試解析 Gemini 返回的錯誤 JSON
+                error_json = e.response.json()
+                error_detail = json.dumps(error_json, indent=2)
+            except json.JSONDecodeError:
+                # 如果不是 JSON，則直接使用響應文本
+                error_detail = e.response.text
+            
+            logger.error(f"Gemini API 請求失敗 - HTTP 錯誤: {e.response.status_code}, 詳細: {error_detail}")
+            return {
+                "status": "error",
+                "message": f"呼叫Gemini API失敗 (HTTP {e.response.status_code})。詳細訊息: {error_detail}"
+            }
+        except httpx.RequestError as e:
+            # 捕獲網路相關錯誤
+            logger.error(f"Gemini API 請求失敗 - 網路錯誤: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"呼叫Gemini API失敗 (網路錯誤): {str(e)}"
+            }
+        except Exception as e:
+            # 捕獲 httpx 請求過程中其他未預期的錯誤
+            logger.error(f"Gemini API 請求時發生未知錯誤: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"呼叫Gemini API時發生未知錯誤: {str(e)}"
+            }
+        
+        # --- 繼續處理成功的響應 ---
+        try:
+            gemini_response_data = response.json()
+            # 檢查 Gemini 響應結構
+            if not gemini_response_data or "candidates" not in gemini_response_data or not gemini_response_data["candidates"]:
+                logger.error("Gemini API 返回非預期結構或空響應: %s", truncate(response.text))
                 return {
                     "status": "error",
-                    "message": f"解析Gemini響應失敗: {str(e)}。原始響應: {response.text[:200]}..."
+                    "message": f"Gemini API 返回非預期結構或空響應。原始響應: {response.text[:200]}..."
                 }
             
-            # 模型有時會在JSON前後添加額外文字，嘗試提取JSON
-            if workflow_json_content.startswith("```json"):
-                workflow_json_content = workflow_json_content.strip("```json\n").strip("```")
-            
-            # 驗證並格式化工作流程JSON
-            try:
-                workflow_data = json.loads(workflow_json_content)
+            # 從 Gemini 響應中提取生成的內容
+            workflow_json_content = gemini_response_data["candidates"][0]["content"]["parts"][0]["text"]
+
+        except (json.JSONDecodeError, KeyError) as e:
+            logger.error("解析Gemini響應或提取內容失敗: %s, 原始響應: %s", e, truncate(response.text))
+            return {
+                "status": "error",
+                "message": f"解析Gemini響應失敗: {str(e)}。原始響應: {response.text[:200]}..."
+            }
+        
+        # 模型有時會在JSON前後添加額外文字，嘗試提取JSON
+        if workflow_json_content.startswith("```json"):
+            workflow_json_content = workflow_json_content.strip("```json\n").strip("```")
+        
+        # 驗證並格式化工作流程JSON
+        try:
+            workflow_data = json.loads(workflow_json_content)
 
-                # 再次檢查和修正基本結構 (保險措施)
-                if "nodes" not in workflow_data:
-                    workflow_data["nodes"] = []
-                if "connections" not in workflow_data:
-                    workflow_data["connections"] = {}
-                if "name" not in workflow_data:
-                    workflow_data["name"] = "Generated Workflow" # 提供預設名稱
-                if "active" not in workflow_data:
-                    workflow_data["active"] = False # 預設為非啟用
-                if "settings" not in workflow_data:
-                    workflow_data["settings"] = {"executionOrder": "v1"} # 提供預設設定
-                
-                # --- 核心修改：直接返回 workflow_data ---
-                return workflow_data 
-                # --- 核心修改結束 ---
+            # 再次檢查和修正基本結構 (保險措施)
+            if "nodes" not in workflow_data:
+                workflow_data["nodes"] = []
+            if "connections" not in workflow_data:
+                workflow_data["connections"] = {}
+            if "name" not in workflow_data:
+                workflow_data["name"] = "Generated Workflow" # 提供預設名稱
+            if "active" not in workflow_data:
+                workflow_data["active"] = False # 預設為非啟用
+            if "settings" not in workflow_data:
+                workflow_data["settings"] = {"executionOrder": "v1"} # 提供預設設定
+            
+            # --- 核心修改：直接返回 workflow_data ---
+            return workflow_data 
+            # --- 核心修改結束 ---
 
-            except json.JSONDecodeError:
-                logger.error(f"生成的工作流程JSON格式無效: {workflow_json_content}")
-                return {
-                    "status": "error",
-                    "message": f"生成的工作流程格式無效，無法解析為JSON。原始響應: {workflow_json_content[:200]}..." # 顯示部分響應
-                }
-                
+        except json.JSONDecodeError:
+            logger.error("生成的工作流程JSON格式無效: %s", truncate(workflow_json_content))
+            return {
+                "status": "error",
+                "message": f"生成的工作流程格式無效，無法解析為JSON。原始響應: {workflow_json_content[:200]}..." # 顯示部分響應
+            }
+            
     except Exception as e: # 捕獲外層 try 區塊中任何其他未預期的錯誤
         logger.error(f"設計工作流程時發生未知錯誤 (外層捕捉): {str(e)}")
         return {
@@ -199,7 +201,14 @@ async def create_workflow(workflow_data: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: 創建結果
     """
     try:
-        logger.info(f"create_workflow 接收到的原始數據: {json.dumps(workflow_data, indent=2)}")
+        # 完整的工作流程可能很大，只在 DEBUG 等級時序列化並截斷
+        logger.info(
+            "create_workflow 接收到工作流程: %s（%d 個節點）",
+            workflow_data.get("name") if isinstance(workflow_data, dict) else None,
+            len(workflow_data.get("nodes") or []) if isinstance(workflow_data, dict) else 0,
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("create_workflow 接收到的原始數據: %s", truncate(json.dumps(workflow_data, ensure_ascii=False)))
 
         if not N8N_API_URL or not N8N_API_KEY:
             logger.error("N8N_API_URL 或 N8N_API_KEY 環境變數未設置")
@@ -261,52 +270,53 @@ async def create_workflow(workflow_data: Dict[str, Any]) -> Dict[str, Any]:
                     node["position"] = [0, 0]
         # --- 新增結束 ---
 
-        logger.info(f"create_workflow 發送給 n8n API 的數據 (已清理): {json.dumps(cleaned_workflow_data, indent=2)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("create_workflow 發送給 n8n API 的數據 (已清理): %s", truncate(json.dumps(cleaned_workflow_data, ensure_ascii=False)))
         # --- 核心修改結束 ---
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{N8N_API_URL}/workflows",
-                    headers={"X-N8N-API-KEY": N8N_API_KEY},
-                    json=cleaned_workflow_data,
-                    timeout=30
-                )
-                
-                response.raise_for_status()
+        client = get_http_client()
+        try:
+            response = await client.post(
+                f"{N8N_API_URL}/workflows",
+                headers={"X-N8N-API-KEY": N8N_API_KEY},
+                json=cleaned_workflow_data,
+                timeout=30
+            )
+            
+            response.raise_for_status()
 
-            except httpx.HTTPStatusError as e:
-                error_detail = ""
-                try:
-                    error_json = e.response.json()
-                    error_detail = json.dumps(error_json, indent=2)
-                except json.JSONDecodeError:
-                    error_detail = e.response.text
-                
-                logger.error(f"n8n API 創建工作流程失敗 - HTTP 錯誤: {e.response.status_code}, 詳細: {error_detail}")
-                return {
-                    "status": "error",
-                    "message": f"呼叫n8n API創建工作流程失敗 (HTTP {e.response.status_code})。詳細訊息: {error_detail}"
-                }
-            except httpx.RequestError as e:
-                logger.error(f"n8n API 創建工作流程失敗 - 網路錯誤: {str(e)}")
-                return {
-                    "status": "error",
-                    "message": f"呼叫n8n API創建工作流程失敗 (網路錯誤): {str(e)}"
-                }
-            except Exception as e:
-                logger.error(f"n8n API 請求時發生未知錯誤: {str(e)}")
-                return {
-                    "status": "error",
-                    "message": f"呼叫n8n API創建工作流程時發生未知錯誤: {str(e)}"
-                }
+        except httpx.HTTPStatusError as e:
+            error_detail = ""
+            try:
+                error_json = e.response.json()
+                error_detail = json.dumps(error_json, indent=2)
+            except json.JSONDecodeError:
+                error_detail = e.response.text
             
+            logger.error(f"n8n API 創建工作流程失敗 - HTTP 錯誤: {e.response.status_code}, 詳細: {error_detail}")
             return {
-                "status": "success",
-                "data": response.json(),
-                "message": "工作流程已成功創建"
+                "status": "error",
+                "message": f"呼叫n8n API創建工作流程失敗 (HTTP {e.response.status_code})。詳細訊息: {error_detail}"
             }
-                
+        except httpx.RequestError as e:
+            logger.error(f"n8n API 創建工作流程失敗 - 網路錯誤: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"呼叫n8n API創建工作流程失敗 (網路錯誤): {str(e)}"
+            }
+        except Exception as e:
+            logger.error(f"n8n API 請求時發生未知錯誤: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"呼叫n8n API創建工作流程時發生未知錯誤: {str(e)}"
+            }
+        
+        return {
+            "status": "success",
+            "data": response.json(),
+            "message": "工作流程已成功創建"
+        }
+            
     except Exception as e:
         logger.error(f"創建工作流程時發生未知錯誤 (外層捕捉): {str(e)}")
         return {
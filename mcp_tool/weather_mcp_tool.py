@@ -1,19 +1,21 @@
 import os
 import httpx
+from http_client import get_http_client, http_client_lifespan
+from log_setup import setup_logging
 import logging
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 from mcp.server import FastMCP
 
 # 設置日誌
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # 載入環境變數
 load_dotenv()
 
 # 創建一個 MCP 服務器
-mcp = FastMCP("天氣查詢服務")
+mcp = FastMCP("天氣查詢服務", lifespan=http_client_lifespan)
 
 @mcp.tool()
 async def get_weather(city: str) -> str:
@@ -48,20 +50,20 @@ async def get_weather(city: str) -> str:
         logger.info(f"正在查詢 {city} 的天氣信息...")
         
         # 發送請求
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                api_url, 
-                headers=headers, 
-                params=params, 
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                error_text = response.text
-                logger.error(f"API 請求錯誤：狀態碼 {response.status_code}, 回應: {error_text}")
-                return f"API 請求錯誤：無法獲取 {city} 的天氣信息"
-            
-            data = response.json()
+        client = get_http_client()
+        response = await client.get(
+            api_url, 
+            headers=headers, 
+            params=params, 
+            timeout=10
+        )
+        
+        if response.status_code != 200:
+            error_text = response.text
+            logger.error(f"API 請求錯誤：狀態碼 {response.status_code}, 回應: {error_text}")
+            return f"API 請求錯誤：無法獲取 {city} 的天氣信息"
+        
+        data = response.json()
         
         # 解析回應
         weather_text = data['current']['condition']['text']
@@ -136,20 +138,20 @@ async def get_forecast(city: str, days: int = 3) -> str:
         logger.info(f"正在查詢 {city} 的 {days} 天天氣預報...")
         
         # 發送請求
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                api_url, 
-                headers=headers, 
-                params=params, 
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                error_text = response.text
-                logger.error(f"API 請求錯誤：狀態碼 {response.status_code}, 回應: {error_text}")
-                return f"API 請求錯誤：無法獲取 {city} 的天氣預報"
-            
-            data = response.json()
+        client = get_http_client()
+        response = await client.get(
+            api_url, 
+            headers=headers, 
+            params=params, 
+            timeout=10
+        )
+        
+        if response.status_code != 200:
+            error_text = response.text
+            logger.error(f"API 請求錯誤：狀態碼 {response.status_code}, 回應: {error_text}")
+            return f"API 請求錯誤：無法獲取 {city} 的天氣預報"
+        
+        data = response.json()
         
         # 解析回應
         forecast_days = data['forecast']['forecastday']
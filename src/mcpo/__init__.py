@@ -24,7 +24,11 @@ def main(
     ] = ["*"],
     api_key: Annotated[
         Optional[str],
-        typer.Option("--api-key", "-k", help="API key for authentication"),
+        typer.Option(
+            "--api-key",
+            "-k",
+            help="API key for authentication; separate several keys with commas",
+        ),
     ] = None,
     strict_auth: Annotated[
         Optional[bool],
@@ -61,6 +65,84 @@ def main(
     path_prefix: Annotated[
         Optional[str], typer.Option("--path-prefix", help="URL prefix")
     ] = None,
+    fast_json: Annotated[
+        Optional[bool],
+        typer.Option(
+            "--fast-json",
+            help="Use orjson and pass JSON tool output through undecoded",
+        ),
+    ] = False,
+    hot_reload: Annotated[
+        Optional[bool],
+        typer.Option(
+            "--hot-reload",
+            help="Apply changes to the config file's servers without restarting",
+        ),
+    ] = False,
+    tool_cache: Annotated[
+        Optional[str],
+        typer.Option(
+            "--tool-cache",
+            help="File to keep each server's tool list in, to start faster next time",
+        ),
+    ] = None,
+    blobs: Annotated[
+        Optional[bool],
+        typer.Option(
+            "--blobs",
+            help="Serve images and binary tool output from /_blobs/{id} instead of inline base64",
+        ),
+    ] = False,
+    blob_ttl: Annotated[
+        Optional[int], typer.Option("--blob-ttl", help="Seconds a blob stays available")
+    ] = 3600,
+    blob_memory_mb: Annotated[
+        Optional[int],
+        typer.Option("--blob-memory-mb", help="Memory for small blobs; the rest spill to disk"),
+    ] = 64,
+    blob_disk_mb: Annotated[
+        Optional[int],
+        typer.Option("--blob-disk-mb", help="Disk space for spilled blobs"),
+    ] = 1024,
+    blob_dir: Annotated[
+        Optional[str],
+        typer.Option("--blob-dir", help="Directory for spilled blobs (default: a temp dir)"),
+    ] = None,
+    blob_url: Annotated[
+        Optional[str],
+        typer.Option(
+            "--blob-url",
+            help="Public base URL for blob links, e.g. http://localhost:8000",
+        ),
+    ] = None,
+    public_blobs: Annotated[
+        Optional[bool],
+        typer.Option(
+            "--public-blobs",
+            help="Serve /_blobs/ without the API key even with --strict-auth",
+        ),
+    ] = False,
+    workers: Annotated[
+        Optional[int],
+        typer.Option(
+            "--workers",
+            help="HTTP worker processes; MCP servers still run once, in a shared broker",
+        ),
+    ] = 1,
+    log_level: Annotated[
+        Optional[str], typer.Option("--log-level", help="Log level, e.g. INFO or DEBUG")
+    ] = "INFO",
+    log_format: Annotated[
+        Optional[str],
+        typer.Option("--log-format", help="Log format: 'text' or 'json' (one object per line)"),
+    ] = "text",
+    log_sample: Annotated[
+        Optional[str],
+        typer.Option(
+            "--log-sample",
+            help="Fraction of records to keep per level, e.g. 'info=0.1,debug=0.01'",
+        ),
+    ] = None,
 ):
     server_command = None
     if not config_path:
@@ -131,6 +213,20 @@ def main(
             ssl_certfile=ssl_certfile,
             ssl_keyfile=ssl_keyfile,
             path_prefix=path_prefix,
+            fast_json=fast_json,
+            tool_cache=tool_cache,
+            hot_reload=hot_reload,
+            blobs=blobs,
+            blob_ttl=blob_ttl,
+            blob_memory_mb=blob_memory_mb,
+            blob_disk_mb=blob_disk_mb,
+            blob_dir=blob_dir,
+            blob_url=blob_url,
+            public_blobs=public_blobs,
+            workers=workers,
+            log_level=log_level,
+            log_format=log_format,
+            log_sample=log_sample,
         )
     )
 
@@ -1,14 +1,21 @@
-import json
+import asyncio
+import multiprocessing
 import os
 import logging
+import shutil
+import signal
 import socket
-from contextlib import AsyncExitStack, asynccontextmanager
-from typing import Optional
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
 
+import anyio
 import uvicorn
-from fastapi import Depends, FastAPI
+from fastapi import APIRouter, Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from mcp import ClientSession, StdioServerParameters
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+from mcp import StdioServerParameters, types
 from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
 from mcp.client.streamable_http import streamablehttp_client
@@ -17,12 +24,101 @@ from starlette.routing import Mount
 logger = logging.getLogger(__name__)
 
 
-from mcpo.utils.main import get_model_fields, get_tool_handler
+from mcpo.utils import fastjson
+from mcpo.utils.main import (
+    get_batch_handler,
+    get_model,
+    get_tool_handler,
+    schema_hash,
+    warm_model_cache,
+)
 from mcpo.utils.auth import get_verify_api_key, APIKeyMiddleware
+from mcpo.utils.blobs import BlobStore
+from mcpo.utils.broker import Broker, BrokerClient, wait_for_workers
+from mcpo.utils.cache import ResponseCache
+from mcpo.utils.health import health_response, readiness, server_health
+from mcpo.utils.limits import ServerLimits
+from mcpo.utils.logs import RequestIdMiddleware, setup_logging
+from mcpo.utils.metrics import (
+    ProxyMetrics,
+    RequestTimer,
+    collect_blobs,
+    collect_servers,
+)
+from mcpo.utils.notifications import NotificationRouter
+from mcpo.utils.openapi import OpenAPICache, OpenAPIMiddleware
+from mcpo.utils.pool import SessionPool, SupervisedSession
+from mcpo.utils.reload import ConfigReloader, describe_servers, load_servers
+from mcpo.utils.resources import (
+    ResourceCache,
+    get_resource_handler,
+    get_resources_handler,
+    watch_resources,
+)
+from mcpo.utils.runner import ServerDispatchMiddleware, ServerRunner
+from mcpo.utils.singleflight import SingleFlight
+from mcpo.utils.tool_store import ToolListStore, server_fingerprint
+
+
+def _tool_hash(tool: types.Tool) -> str:
+    return schema_hash(tool.model_dump(mode="json", exclude_none=True))
+
+
+async def _store_tools(app: FastAPI, tools: List[types.Tool]):
+    tool_store: Optional[ToolListStore] = getattr(app.state, "tool_store", None)
+    if tool_store is not None:
+        await tool_store.save(
+            app.state.tool_store_key,
+            [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        )
+
+
+def _warm_openapi(app: FastAPI):
+    openapi: Optional[OpenAPICache] = getattr(app.state, "openapi", None)
+    if openapi is not None:
+        openapi.warm(app)
+
+
+def _tool_route(app: FastAPI, tool: types.Tool, api_dependency=None) -> APIRoute:
+    """The ``POST /{tool}`` route for a tool, not yet added to the app."""
+    endpoint_name = tool.name
+    inputSchema = tool.inputSchema
+    outputSchema = getattr(tool, "outputSchema", None)
+
+    # Compiled once per schema for the whole process (see get_model)
+    form_model = get_model(f"{endpoint_name}_form_model", inputSchema)
+    response_model = (
+        get_model(f"{endpoint_name}_response_model", outputSchema)
+        if outputSchema
+        else None
+    )
+
+    tool_handler = get_tool_handler(
+        app.state.session,
+        endpoint_name,
+        form_model=form_model,
+        response_model=response_model,
+        cache=getattr(app.state, "cache", None),
+        singleflight=getattr(app.state, "singleflight", None),
+        notifications=getattr(app.state, "notifications", None),
+        limits=getattr(app.state, "limits", None),
+        metrics=getattr(app.state, "metrics", None),
+        blobs=getattr(app.state, "blobs", None),
+    )
+
+    router = APIRouter()
+    router.post(
+        f"/{endpoint_name}",
+        summary=endpoint_name.replace("_", " ").title(),
+        description=tool.description,
+        response_model_exclude_none=True,
+        dependencies=[Depends(api_dependency)] if api_dependency else [],
+    )(tool_handler)
+    return router.routes[0]
 
 
 async def create_dynamic_endpoints(app: FastAPI, api_dependency=None):
-    session: ClientSession = app.state.session
+    session: SessionPool = app.state.session
     if not session:
         raise ValueError("Session is not initialized in the app state.")
 
@@ -37,44 +133,188 @@ async def create_dynamic_endpoints(app: FastAPI, api_dependency=None):
 
     tools_result = await session.list_tools()
     tools = tools_result.tools
+    await _store_tools(app, tools)
+
+    # Kept on the app so refresh_dynamic_endpoints can patch them in place
+    form_models = {}
+    app.state.form_models = form_models
+    app.state.tool_hashes = {}
 
     for tool in tools:
-        endpoint_name = tool.name
-        endpoint_description = tool.description
+        route = _tool_route(app, tool, api_dependency)
+        app.router.routes.append(route)
+        form_models[tool.name] = route.endpoint.form_model
+        app.state.tool_hashes[tool.name] = _tool_hash(tool)
+
+    app.post(
+        "/_batch",
+        summary="Batch",
+        description="Call several tools of this server concurrently. Results are "
+        "returned in request order, with per-item errors.",
+        dependencies=[Depends(api_dependency)] if api_dependency else [],
+    )(
+        get_batch_handler(
+            session,
+            form_models,
+            cache=getattr(app.state, "cache", None),
+            singleflight=getattr(app.state, "singleflight", None),
+            max_concurrency=getattr(app.state, "batch_concurrency", 8),
+            max_items=getattr(app.state, "batch_max", 100),
+            limits=getattr(app.state, "limits", None),
+            metrics=getattr(app.state, "metrics", None),
+            blobs=getattr(app.state, "blobs", None),
+        )
+    )
 
-        inputSchema = tool.inputSchema
-        outputSchema = getattr(tool, "outputSchema", None)
+    limits: Optional[ServerLimits] = getattr(app.state, "limits", None)
+    if limits is not None:
 
-        form_model_fields = get_model_fields(
-            f"{endpoint_name}_form_model",
-            inputSchema.get("properties", {}),
-            inputSchema.get("required", []),
-            inputSchema.get("$defs", {}),
+        @app.get(
+            "/_limits",
+            summary="Concurrency Limits",
+            description="Active calls, queue depth and queue wait times of this "
+            "server's concurrency limits.",
+            dependencies=[Depends(api_dependency)] if api_dependency else [],
         )
+        async def get_limits():
+            return limits.stats()
+
+    capabilities = getattr(result, "capabilities", None)
+    resources = getattr(capabilities, "resources", None)
+    if resources is not None:
+        # Cached only if the server can tell us when a resource changes
+        resource_cache = None
+        cache_config = getattr(app.state, "resource_cache_config", {})
+        if resources.subscribe and cache_config is not False:
+            resource_cache = ResourceCache.from_config(cache_config or {})
+            watch_resources(app.state.notifications, resource_cache)
+        app.state.resource_cache = resource_cache
+
+        app.get(
+            "/_resources",
+            summary="List Resources",
+            description="Resources this server exposes, with their URIs and media types.",
+            dependencies=[Depends(api_dependency)] if api_dependency else [],
+        )(get_resources_handler(session))
+        app.get(
+            "/_resources/read",
+            summary="Read Resource",
+            description="Contents of a resource, in its own media type. Resources "
+            "with several parts are returned as JSON.",
+            dependencies=[Depends(api_dependency)] if api_dependency else [],
+        )(get_resource_handler(session, resource_cache))
+
+    @app.get(
+        "/_health",
+        summary="Health",
+        description="Status of this server's sessions and the round-trip time of "
+        "their last MCP ping. 503 while the server can't take calls.",
+        dependencies=[Depends(api_dependency)] if api_dependency else [],
+    )
+    async def get_health():
+        return health_response(server_health(app))
+
+    # Routes may differ from a previous run of this server
+    app.openapi_schema = None
+    _warm_openapi(app)
+
+
+async def refresh_dynamic_endpoints(app: FastAPI, api_dependency=None):
+    """
+    Re-list the server's tools and add, replace or remove only the routes of
+    tools that appeared, changed (by schema hash) or went away, on the same
+    session. The route list is swapped in one step.
+    """
+    tools = (await app.state.session.list_tools()).tools
+    await _store_tools(app, tools)
+
+    old_hashes: Dict[str, str] = app.state.tool_hashes
+    hashes = {tool.name: _tool_hash(tool) for tool in tools}
+    removed = [name for name in old_hashes if name not in hashes]
+    updated = {
+        tool.name: _tool_route(app, tool, api_dependency)
+        for tool in tools
+        if old_hashes.get(tool.name) != hashes[tool.name]
+    }
+    if not (removed or updated):
+        return
+
+    tool_paths = {f"/{name}": name for name in old_hashes}
+    pending = dict(updated)
+    routes = []
+    for route in app.router.routes:
+        name = tool_paths.get(route.path) if isinstance(route, APIRoute) else None
+        if name in removed:
+            continue
+        if name in pending:
+            routes.append(pending.pop(name))
+            continue
+        if isinstance(route, APIRoute) and route.path == "/_batch":
+            # New tools go after the existing ones
+            routes.extend(pending.values())
+            pending.clear()
+        routes.append(route)
+    routes.extend(pending.values())
+    app.router.routes = routes
+
+    form_models = app.state.form_models
+    cache: Optional[ResponseCache] = getattr(app.state, "cache", None)
+    for name in removed:
+        form_models.pop(name, None)
+    for name, route in updated.items():
+        form_models[name] = route.endpoint.form_model
+    if cache is not None:
+        for name in removed + list(updated):
+            cache.invalidate(name)
+    app.state.tool_hashes = hashes
+    # Regenerated now rather than on the next request to /openapi.json
+    app.openapi_schema = None
+    _warm_openapi(app)
+
+    added = [name for name in updated if name not in old_hashes]
+    changed = [name for name in updated if name in old_hashes]
+    logger.info(
+        f"Tools of '{app.title}' changed: added {added}, removed {removed}, "
+        f"changed {changed}"
+    )
 
-        response_model_fields = None
-        if outputSchema:
-            response_model_fields = get_model_fields(
-                f"{endpoint_name}_response_model",
-                outputSchema.get("properties", {}),
-                outputSchema.get("required", []),
-                outputSchema.get("$defs", {}),
-            )
 
-        tool_handler = get_tool_handler(
-            session,
-            endpoint_name,
-            form_model_fields,
-            response_model_fields,
-        )
+def watch_tool_list(app: FastAPI, api_dependency=None):
+    """Refresh the routes whenever the server sends tools/list_changed."""
+    state = {"task": None, "again": False}
+
+    async def refresh():
+        while True:
+            state["again"] = False
+            try:
+                await refresh_dynamic_endpoints(app, api_dependency)
+            except Exception as e:
+                logger.error(f"Could not refresh the tools of '{app.title}': {e}")
+            if not state["again"]:
+                break
+        state["task"] = None
+
+    async def on_list_changed(notification):
+        # Listing tools needs the session's receive loop this runs on, so
+        # refresh in a task; notifications during a refresh trigger one more
+        if state["task"] is not None:
+            state["again"] = True
+            return
+        state["task"] = asyncio.ensure_future(refresh())
+
+    app.state.notifications.subscribe(
+        "notifications/tools/list_changed", on_list_changed
+    )
 
-        app.post(
-            f"/{endpoint_name}",
-            summary=endpoint_name.replace("_", " ").title(),
-            description=endpoint_description,
-            response_model_exclude_none=True,
-            dependencies=[Depends(api_dependency)] if api_dependency else [],
-        )(tool_handler)
+
+def _mounted_runners(app: FastAPI) -> List[ServerRunner]:
+    return [
+        route.app.state.runner
+        for route in app.routes
+        if isinstance(route, Mount)
+        and isinstance(route.app, FastAPI)
+        and getattr(route.app.state, "runner", None)
+    ]
 
 
 @asynccontextmanager
@@ -91,51 +331,138 @@ async def lifespan(app: FastAPI):
         server_type == "sse" and not args[0]
     ):
         # Main app lifespan (when config_path is provided)
-        async with AsyncExitStack() as stack:
-            for route in app.routes:
-                if isinstance(route, Mount) and isinstance(route.app, FastAPI):
-                    await stack.enter_async_context(
-                        route.app.router.lifespan_context(route.app),  # noqa
-                    )
-            yield
+        runners = _mounted_runners(app)
+        reloader: Optional[ConfigReloader] = getattr(app.state, "reloader", None)
+        async with anyio.create_task_group() as tg:
+            for runner in runners:
+                runner.bind(tg)
+
+            # Start eager servers concurrently in the background and serve right
+            # away: requests to a server still starting wait for it (up to its
+            # startupTimeout) in ServerDispatchMiddleware, the others don't.
+            # A failed one is logged and retried on its next request.
+            async def start_eager():
+                async with anyio.create_task_group() as startup:
+                    for runner in runners:
+                        if not runner.lazy:
+                            startup.start_soon(runner.start)
+                _warm_openapi(app)
+
+            tg.start_soon(start_eager)
+            if reloader is not None:
+                reloader.bind(tg)
+            try:
+                yield
+            finally:
+                if reloader is not None:
+                    reloader.close()
+                # Mounts may have changed since startup if the config was reloaded
+                for runner in _mounted_runners(app):
+                    await runner.stop()
     else:
-        if server_type == "stdio":
-            server_params = StdioServerParameters(
-                command=command,
-                args=args,
-                env={**env},
+        # Compile the models stored from the previous run while the server starts
+        warm_up = None
+        tool_store: Optional[ToolListStore] = getattr(app.state, "tool_store", None)
+        if tool_store is not None:
+            app.state.tool_store_key = server_fingerprint(server_type, command, args)
+            stored_tools = tool_store.load(app.state.tool_store_key)
+            if stored_tools:
+                warm_up = asyncio.ensure_future(
+                    anyio.to_thread.run_sync(warm_model_cache, stored_tools)
+                )
+
+        # In the broker, notifications are also passed on to the workers
+        notifications = NotificationRouter(
+            forward=getattr(app.state, "forward_notifications", None)
+        )
+        app.state.notifications = notifications
+
+        broker: Optional[BrokerClient] = getattr(app.state, "broker", None)
+        if broker is not None:
+            # Worker process: the broker owns the sessions and caches resources
+            runner = getattr(app.state, "runner", None)
+            app.state.resource_cache_config = False
+            app.state.session = broker.session(
+                runner.name if runner is not None else "default", notifications
             )
+            if warm_up is not None:
+                await warm_up
+            await create_dynamic_endpoints(app, api_dependency=api_dependency)
+            watch_tool_list(app, api_dependency=api_dependency)
+            yield
+            return
+
+        pool_config = getattr(app.state, "pool", None) or {}
+        # Periodic MCP ping per session; false disables it
+        health_check = getattr(app.state, "health_check", {})
+        if health_check is False:
+            health_check = {"interval": None}
+        async with SessionPool(
+            lambda: connect_session(
+                server_type, command, args, env, message_handler=notifications
+            ),
+            min_size=pool_config.get("min", 1),
+            max_size=pool_config.get("max", pool_config.get("min", 1)),
+            idle_timeout=pool_config.get("idleTimeout", 300),
+            name=app.title,
+            restart_delay=pool_config.get("restartDelay", 1),
+            max_restart_delay=pool_config.get("maxRestartDelay", 60),
+            ping_interval=health_check.get("interval", 30),
+            ping_timeout=health_check.get("timeout", 5),
+            unhealthy_after=health_check.get("unhealthyAfter", 3),
+        ) as session:
+            app.state.session = session
+            if warm_up is not None:
+                await warm_up
+            await create_dynamic_endpoints(app, api_dependency=api_dependency)
+            watch_tool_list(app, api_dependency=api_dependency)
+            yield
 
-            async with stdio_client(server_params) as (reader, writer):
-                async with ClientSession(reader, writer) as session:
-                    app.state.session = session
-                    await create_dynamic_endpoints(app, api_dependency=api_dependency)
-                    yield
-        if server_type == "sse":
-            async with sse_client(url=args[0], sse_read_timeout=None) as (
-                reader,
-                writer,
-            ):
-                async with ClientSession(reader, writer) as session:
-                    app.state.session = session
-                    await create_dynamic_endpoints(app, api_dependency=api_dependency)
-                    yield
-        if server_type == "streamablehttp" or server_type == "streamable_http":
-            # Ensure URL has trailing slash to avoid redirects
-            url = args[0]
-            if not url.endswith("/"):
-                url = f"{url}/"
-
-            # Connect using streamablehttp_client from the SDK, similar to sse_client
-            async with streamablehttp_client(url=url) as (
-                reader,
-                writer,
-                _,  # get_session_id callback not needed for ClientSession
-            ):
-                async with ClientSession(reader, writer) as session:
-                    app.state.session = session
-                    await create_dynamic_endpoints(app, api_dependency=api_dependency)
-                    yield
+
+@asynccontextmanager
+async def connect_session(
+    server_type: str, command: str, args: list, env: dict, message_handler=None
+):
+    """Open a single session to an MCP server over the given transport."""
+    if server_type == "stdio":
+        server_params = StdioServerParameters(
+            command=command,
+            args=args,
+            env={**env},
+        )
+
+        async with stdio_client(server_params) as (reader, writer):
+            async with SupervisedSession(
+                reader, writer, message_handler=message_handler
+            ) as session:
+                yield session
+    elif server_type == "sse":
+        async with sse_client(url=args[0], sse_read_timeout=None) as (
+            reader,
+            writer,
+        ):
+            async with SupervisedSession(
+                reader, writer, message_handler=message_handler
+            ) as session:
+                yield session
+    elif server_type == "streamablehttp" or server_type == "streamable_http":
+        # Ensure URL has trailing slash to avoid redirects
+        url = args[0]
+        if not url.endswith("/"):
+            url = f"{url}/"
+
+        # Connect using streamablehttp_client from the SDK, similar to sse_client
+        async with streamablehttp_client(url=url) as (
+            reader,
+            writer,
+            _,  # get_session_id callback not needed for ClientSession
+        ):
+            async with SupervisedSession(
+                reader, writer, message_handler=message_handler
+            ) as session:
+                yield session
+    else:
+        raise ValueError(f"Unsupported server type: {server_type}")
 
 
 async def run(
@@ -145,9 +472,30 @@ async def run(
     cors_allow_origins=["*"],
     **kwargs,
 ):
-    # Server API Key
-    api_dependency = get_verify_api_key(api_key) if api_key else None
+    # Everything a worker process needs to build the same apps
+    run_kwargs = {
+        "host": host,
+        "port": port,
+        "api_key": api_key,
+        "cors_allow_origins": cors_allow_origins,
+        **kwargs,
+    }
+
+    # With several workers this process is the broker owning the MCP sessions,
+    # and each worker (started with broker_path) serves HTTP through it
+    workers = kwargs.get("workers") or 1
+    broker_path = kwargs.get("broker_path")
+    is_broker = workers > 1 and not broker_path
+    broker = BrokerClient(broker_path) if broker_path else None
+    if is_broker and not hasattr(socket, "AF_UNIX"):
+        raise ValueError("Multiple workers need Unix domain sockets")
+
+    # Server API Key(s), comma-separated
     strict_auth = kwargs.get("strict_auth", False)
+    # Under strict auth the middleware on the main app already covers every route
+    api_dependency = (
+        get_verify_api_key(api_key) if api_key and not strict_auth else None
+    )
 
     # MCP Server
     server_type = kwargs.get(
@@ -169,9 +517,15 @@ async def run(
     ssl_keyfile = kwargs.get("ssl_keyfile")
     path_prefix = kwargs.get("path_prefix") or "/"
 
-    # Configure basic logging
-    logging.basicConfig(
-        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    # Optional file with each server's last tool list, to precompile models
+    tool_cache = kwargs.get("tool_cache")
+    tool_store = ToolListStore(tool_cache) if tool_cache else None
+
+    # Formatted and written off the event loop, see setup_logging
+    log_listener = setup_logging(
+        level=kwargs.get("log_level") or "INFO",
+        fmt=kwargs.get("log_format") or "text",
+        sample=kwargs.get("log_sample"),
     )
     logger.info("Starting MCPO Server...")
     logger.info(f"  Name: {name}")
@@ -186,6 +540,33 @@ async def run(
     if ssl_keyfile:
         logger.info(f"  SSL Key File: {ssl_keyfile}")
     logger.info(f"  Path Prefix: {path_prefix}")
+    if tool_cache:
+        logger.info(f"  Tool Cache: {tool_cache}")
+
+    # Optional store serving binary tool output at /_blobs/{id}
+    blob_store = None
+    if kwargs.get("blobs"):
+        blob_url = (kwargs.get("blob_url") or "").rstrip("/")
+        blob_store = BlobStore(
+            ttl=kwargs.get("blob_ttl") or 3600,
+            max_memory=(kwargs.get("blob_memory_mb") or 64) * 1024 * 1024,
+            max_disk=(kwargs.get("blob_disk_mb") or 1024) * 1024 * 1024,
+            spill_dir=kwargs.get("blob_dir"),
+            url_prefix=f"{blob_url}{path_prefix}_blobs/",
+            # Any worker may be asked for a blob another one stored
+            shared=workers > 1,
+        )
+        run_kwargs["blob_dir"] = blob_store.spill_dir
+        logger.info(f"  Blobs: {blob_store.url_prefix} (spill to {blob_store.spill_dir})")
+
+    if kwargs.get("fast_json"):
+        if fastjson.enable():
+            logger.info("  Fast JSON: orjson")
+        else:
+            logger.warning(
+                "  Fast JSON requested but orjson is not installed "
+                "(pip install 'mcpo[fast]'); using the standard json module"
+            )
 
     main_app = FastAPI(
         title=name,
@@ -196,6 +577,38 @@ async def run(
         lifespan=lifespan,
     )
 
+    # The one middleware stack, shared by every mounted server. Sub-apps get
+    # none of their own; last added runs first.
+    runners = {}
+    if config_path:
+        main_app.add_middleware(
+            ServerDispatchMiddleware, runners=runners, path_prefix=path_prefix
+        )
+
+    # Server name -> app serving its tools, for the specs and scrape-time
+    # health metrics
+    server_apps = {}
+    # Specs served pre-serialized with ETags; inside auth, outside dispatch
+    openapi = OpenAPICache(main_app, server_apps, path_prefix=path_prefix)
+    main_app.state.openapi = openapi
+    main_app.add_middleware(OpenAPIMiddleware, cache=openapi)
+
+    # Add middleware to protect also documentation and spec, including every
+    # mounted server's
+    if api_key and strict_auth:
+        main_app.add_middleware(
+            APIKeyMiddleware,
+            api_key=api_key,
+            public_paths=["/healthz", "/readyz"],
+            # Blobs hold tool output too; only --public-blobs opens them up
+            public_prefixes=(
+                [f"{path_prefix}_blobs/"]
+                if blob_store is not None and kwargs.get("public_blobs")
+                else None
+            ),
+        )
+
+    # Outside auth, so error responses carry CORS headers too
     main_app.add_middleware(
         CORSMiddleware,
         allow_origins=cors_allow_origins or ["*"],
@@ -204,9 +617,46 @@ async def run(
         allow_headers=["*"],
     )
 
-    # Add middleware to protect also documentation and spec
-    if api_key and strict_auth:
-        main_app.add_middleware(APIKeyMiddleware, api_key=api_key)
+    # Ids every request's log records, and its response's X-Request-ID
+    main_app.add_middleware(RequestIdMiddleware)
+
+    # Outermost, so the validation phase includes everything before the handler
+    main_app.add_middleware(RequestTimer)
+
+    metrics = ProxyMetrics()
+    metrics.add_collector(lambda: collect_servers(server_apps, metrics.totals))
+    if blob_store is not None:
+        metrics.add_collector(lambda: collect_blobs(blob_store))
+
+    @main_app.get(
+        "/metrics",
+        include_in_schema=False,
+        dependencies=[Depends(api_dependency)] if api_dependency else [],
+    )
+    async def get_metrics():
+        return PlainTextResponse(
+            metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+    # Probes for Docker and load balancers, open even under strict auth
+    @main_app.get("/healthz", include_in_schema=False)
+    async def get_healthz():
+        return {"status": "ok"}
+
+    @main_app.get("/readyz", include_in_schema=False)
+    async def get_readyz():
+        ready = readiness(server_apps)
+        return JSONResponse(
+            status_code=200 if ready["status"] == "ready" else 503, content=ready
+        )
+
+    if blob_store is not None:
+        # Unguessable ids make the URL itself the credential, so clients that
+        # only follow links (e.g. to render an image) can fetch them; under
+        # --strict-auth they need the API key unless --public-blobs is set
+        @main_app.get(f"{path_prefix}_blobs/{{blob_id}}", include_in_schema=False)
+        async def get_blob(blob_id: str, request: Request):
+            return await blob_store.response(request, blob_id)
 
     if server_type == "sse":
         logger.info(
@@ -233,13 +683,11 @@ async def run(
         main_app.state.api_dependency = api_dependency
     elif config_path:
         logger.info(f"Loading MCP server configurations from: {config_path}")
-        with open(config_path, "r") as f:
-            config_data = json.load(f)
-
-        mcp_servers = config_data.get("mcpServers", {})
-        if not mcp_servers:
-            logger.error(f"No 'mcpServers' found in config file: {config_path}")
-            raise ValueError("No 'mcpServers' found in config file.")
+        try:
+            mcp_servers = load_servers(config_path)
+        except ValueError as e:
+            logger.error(f"Invalid config file {config_path}: {e}")
+            raise
 
         logger.info("Configured MCP Servers:")
         for server_name_cfg, server_cfg_details in mcp_servers.items():
@@ -274,8 +722,7 @@ async def run(
                     f"  Unknown configuration for MCP server: {server_name_cfg}"
                 )
 
-        main_app.description += "\n\n- **available tools**："
-        for server_name, server_cfg in mcp_servers.items():
+        def build_server(server_name: str, server_cfg: dict) -> FastAPI:
             sub_app = FastAPI(
                 title=f"{server_name}",
                 description=f"{server_name} MCP Server\n\n- [back to tool list](/docs)",
@@ -283,13 +730,20 @@ async def run(
                 lifespan=lifespan,
             )
 
-            sub_app.add_middleware(
-                CORSMiddleware,
-                allow_origins=cors_allow_origins or ["*"],
-                allow_credentials=True,
-                allow_methods=["*"],
-                allow_headers=["*"],
+            # Started by the main app lifespan, or on first request when "lazy";
+            # failed starts back off like the pool's session restarts
+            pool_cfg = server_cfg.get("pool") or {}
+            runner = ServerRunner(
+                sub_app,
+                server_name,
+                startup_timeout=server_cfg.get("startupTimeout", 60),
+                lazy=server_cfg.get("lazy", False),
+                restart_delay=pool_cfg.get("restartDelay", 1),
+                max_restart_delay=pool_cfg.get("maxRestartDelay", 60),
             )
+            sub_app.state.runner = runner
+
+            sub_app.state.metrics = metrics.server(server_name)
 
             if server_cfg.get("command"):
                 # stdio
@@ -318,18 +772,85 @@ async def run(
                 sub_app.state.server_type = "sse"
                 sub_app.state.args = server_cfg["url"]
 
-            # Add middleware to protect also documentation and spec
-            if api_key and strict_auth:
-                sub_app.add_middleware(APIKeyMiddleware, api_key=api_key)
+            # Optional pool of sessions, e.g. {"min": 2, "max": 8, "idleTimeout": 300}
+            if server_cfg.get("pool"):
+                sub_app.state.pool = server_cfg["pool"]
+
+            # Optional ping settings, e.g. {"interval": 15, "timeout": 5, "unhealthyAfter": 3}
+            if "healthCheck" in server_cfg:
+                sub_app.state.health_check = server_cfg["healthCheck"]
+
+            # Options for the cache of subscribed resources, or false to disable it
+            if "resourceCache" in server_cfg:
+                sub_app.state.resource_cache_config = server_cfg["resourceCache"]
+
+            # Optional response cache for idempotent tools
+            if server_cfg.get("cache"):
+                sub_app.state.cache = ResponseCache.from_config(server_cfg["cache"])
+
+            # Max concurrent calls per request to /_batch
+            if server_cfg.get("batchConcurrency"):
+                sub_app.state.batch_concurrency = server_cfg["batchConcurrency"]
+            if server_cfg.get("maxBatch"):
+                sub_app.state.batch_max = server_cfg["maxBatch"]
+
+            # Optional concurrency limits with a bounded wait queue, e.g.
+            # {"maxConcurrent": 8, "tools": {"generate_flux_image": {"maxConcurrent": 2}}}
+            if server_cfg.get("limits"):
+                sub_app.state.limits = ServerLimits.from_config(
+                    server_cfg["limits"], name=server_name
+                )
+
+            # Optional coalescing of concurrent identical calls: true or tool names
+            if server_cfg.get("coalesce"):
+                sub_app.state.singleflight = SingleFlight.from_config(
+                    server_cfg["coalesce"]
+                )
 
             sub_app.state.api_dependency = api_dependency
+            sub_app.state.tool_store = tool_store
+            sub_app.state.blobs = blob_store
+            sub_app.state.openapi = openapi
+            sub_app.state.broker = broker
+
+            return sub_app
 
+        for server_name, server_cfg in mcp_servers.items():
+            sub_app = build_server(server_name, server_cfg)
+            runners[server_name] = sub_app.state.runner
+            server_apps[server_name] = sub_app
             main_app.mount(f"{path_prefix}{server_name}", sub_app)
-            main_app.description += f"\n    - [{server_name}](/{server_name}/docs)"
+
+        # Applies config changes on SIGHUP, or when the file changes if enabled.
+        # Broker and workers would have to swap servers in step, so not with workers
+        if workers > 1:
+            if kwargs.get("hot_reload"):
+                logger.warning("--hot-reload is not supported with --workers; ignored")
+        else:
+            main_app.state.reloader = ConfigReloader(
+                main_app,
+                config_path,
+                mcp_servers,
+                runners,
+                build_server,
+                path_prefix=path_prefix,
+                server_apps=server_apps,
+                description=main_app.description,
+                poll_interval=2 if kwargs.get("hot_reload") else None,
+            )
+        main_app.description = describe_servers(main_app.description, mcp_servers)
     else:
         logger.error("MCPO server_command or config_path must be provided.")
         raise ValueError("You must provide either server_command or config.")
 
+    if not server_apps:
+        # Single server served by the main app itself
+        main_app.state.metrics = metrics.server("default")
+        main_app.state.tool_store = tool_store
+        main_app.state.blobs = blob_store
+        main_app.state.broker = broker
+        server_apps["default"] = main_app
+
     logger.info("Uvicorn server starting...")
     config = uvicorn.Config(
         app=main_app,
@@ -337,8 +858,72 @@ async def run(
         port=port,
         ssl_certfile=ssl_certfile,
         ssl_keyfile=ssl_keyfile,
-        log_level="info",
+        log_level=(kwargs.get("log_level") or "INFO").lower(),
+        # Keep uvicorn's own and access logs on the queue set up above
+        log_config=None,
     )
     server = uvicorn.Server(config)
-
-    await server.serve()
+    if broker is not None:
+        # A worker can't serve anything once the broker is gone
+        broker.on_close = lambda: setattr(server, "should_exit", True)
+
+    try:
+        if is_broker:
+            await _serve_workers(main_app, server_apps, config, workers, run_kwargs)
+        else:
+            await server.serve(sockets=kwargs.get("sockets"))
+    finally:
+        if broker is not None:
+            await broker.close()
+        if blob_store is not None:
+            blob_store.close()
+        log_listener.stop()
+
+
+def _run_worker(run_kwargs: dict, sockets: List[socket.socket]):
+    """Entry point of an HTTP worker process started by ``_serve_workers``."""
+    asyncio.run(run(**run_kwargs, sockets=sockets))
+
+
+async def _serve_workers(
+    app: FastAPI,
+    server_apps: Dict[str, FastAPI],
+    config: uvicorn.Config,
+    count: int,
+    run_kwargs: dict,
+):
+    """
+    Serve HTTP from ``count`` worker processes sharing one listening socket,
+    while this process runs the MCP servers once for all of them as their
+    ``Broker``. Workers that exit are replaced until SIGINT or SIGTERM.
+    """
+    sock = config.bind_socket()
+    broker_dir = tempfile.mkdtemp(prefix="mcpo-broker-")
+    # Before the lifespan starts the servers, so their notifications reach it
+    broker = Broker(server_apps, os.path.join(broker_dir, "broker.sock"))
+    worker_kwargs = {**run_kwargs, "broker_path": broker.path}
+    context = multiprocessing.get_context("spawn")
+
+    def spawn():
+        process = context.Process(target=_run_worker, args=(worker_kwargs, [sock]))
+        process.start()
+        return process
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        async with app.router.lifespan_context(app):
+            await broker.start()
+            logger.info(f"MCP broker listening on {broker.path}")
+            logger.info(f"Starting {count} workers on {config.host}:{config.port}")
+            processes = [spawn() for _ in range(count)]
+            await wait_for_workers(processes, stop, spawn)
+            logger.info("Shutting down MCP broker...")
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        await broker.close()
+        sock.close()
+        shutil.rmtree(broker_dir, ignore_errors=True)
@@ -0,0 +1,102 @@
+import base64
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from mcpo.utils.auth import APIKeyMiddleware, parse_api_keys
+
+
+def make_client(api_key="key-one, key-two"):
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk {i}\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(APIKeyMiddleware, api_key=api_key)
+    return TestClient(app)
+
+
+def basic(password, username="anyone"):
+    return "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()
+
+
+def test_parse_api_keys():
+    assert parse_api_keys("a, b,,c") == ["a", "b", "c"]
+    assert parse_api_keys(["a", " "]) == ["a"]
+
+
+def test_accepts_any_configured_bearer_or_basic_key():
+    client = make_client()
+    for authorization in (
+        "Bearer key-one",
+        "Bearer key-two",
+        basic("key-two"),
+        basic("key-one", username=""),
+    ):
+        response = client.get("/ping", headers={"Authorization": authorization})
+        assert response.status_code == 200, authorization
+
+
+def test_rejects_missing_wrong_and_malformed_credentials():
+    client = make_client()
+    response = client.get("/ping")
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer, Basic"
+
+    assert client.get("/ping", headers={"Authorization": "Bearer key"}).status_code == 403
+    assert client.get("/ping", headers={"Authorization": basic("nope")}).status_code == 403
+    assert client.get("/ping", headers={"Authorization": "Basic !!"}).status_code == 401
+    assert client.get("/ping", headers={"Authorization": "Token x"}).status_code == 401
+
+
+def test_preflight_and_streaming_pass_through():
+    client = make_client()
+    assert client.options("/ping").status_code != 401
+
+    response = client.get("/stream", headers={"Authorization": "Bearer key-one"})
+    assert response.text == "chunk 0\nchunk 1\nchunk 2\n"
+
+
+@pytest.mark.parametrize("public_blobs", [False, True])
+def test_strict_auth_protects_blobs_unless_public(tmp_path, monkeypatch, public_blobs):
+    import anyio
+    import uvicorn
+
+    from mcpo.main import run
+
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"mcpServers": {"s": {"command": "true"}}}))
+    apps = []
+
+    async def serve(self, sockets=None):
+        apps.append(self.config.app)
+
+    monkeypatch.setattr(uvicorn.Server, "serve", serve)
+    anyio.run(
+        lambda: run(
+            config_path=str(config_path),
+            api_key="secret",
+            strict_auth=True,
+            blobs=True,
+            public_blobs=public_blobs,
+        )
+    )
+
+    client = TestClient(apps[0])
+    unknown = "/_blobs/unknown"
+    assert client.get(unknown).status_code == (404 if public_blobs else 401)
+    headers = {"Authorization": "Bearer secret"}
+    assert client.get(unknown, headers=headers).status_code == 404
+    assert client.get("/s/docs").status_code == 401
@@ -0,0 +1,94 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mcp import types
+
+from mcpo.utils.main import get_batch_handler, get_model_fields, get_tool_handler
+
+
+class FakeSession:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def call_tool(self, name, arguments=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        if name == "fail":
+            return types.CallToolResult(
+                content=[types.TextContent(type="text", text="tool blew up")],
+                isError=True,
+            )
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=f'{{"echo": "{arguments.get("text", "")}"}}')]
+        )
+
+
+def make_client(session, max_concurrency=8, max_items=100):
+    form_models = {}
+    for name, properties in [
+        ("echo", {"text": {"type": "string"}}),
+        ("fail", {}),
+    ]:
+        fields = get_model_fields(f"{name}_form_model", properties, list(properties))
+        form_models[name] = get_tool_handler(session, name, fields).form_model
+
+    app = FastAPI()
+    app.post("/_batch")(
+        get_batch_handler(
+            session, form_models, max_concurrency=max_concurrency, max_items=max_items
+        )
+    )
+    return TestClient(app)
+
+
+def test_batch_returns_results_in_order_with_per_item_errors():
+    client = make_client(FakeSession())
+    response = client.post(
+        "/_batch",
+        json=[
+            {"tool": "echo", "arguments": {"text": "a"}},
+            {"tool": "missing"},
+            {"tool": "echo", "arguments": {}},
+            {"tool": "fail"},
+            {"tool": "echo", "arguments": {"text": "b"}},
+        ],
+    )
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0] == {"tool": "echo", "ok": True, "result": {"echo": "a"}}
+    assert results[1]["status"] == 404
+    assert results[2]["status"] == 422
+    assert results[2]["error"][0]["loc"] == ["text"]
+    assert results[3] == {
+        "tool": "fail",
+        "ok": False,
+        "status": 500,
+        "error": {"message": "tool blew up"},
+    }
+    assert results[4]["result"] == {"echo": "b"}
+
+
+def test_batch_bounds_concurrency():
+    session = FakeSession()
+    client = make_client(session, max_concurrency=2)
+    response = client.post(
+        "/_batch",
+        json=[{"tool": "echo", "arguments": {"text": str(i)}} for i in range(6)],
+    )
+    assert [r["result"]["echo"] for r in response.json()] == [str(i) for i in range(6)]
+    assert session.max_active == 2
+
+
+def test_batch_over_the_limit_is_rejected_whole():
+    session = FakeSession()
+    client = make_client(session, max_items=3)
+    items = [{"tool": "echo", "arguments": {"text": str(i)}} for i in range(4)]
+
+    response = client.post("/_batch", json=items)
+    assert response.status_code == 413
+    assert session.max_active == 0
+    assert client.post("/_batch", json=items[:3]).status_code == 200
@@ -0,0 +1,141 @@
+import base64
+import os
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from mcp import types
+
+from mcpo.utils.blobs import BlobStore
+from mcpo.utils.main import execute_tool
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def blob_app(store: BlobStore) -> httpx.AsyncClient:
+    app = FastAPI()
+
+    @app.get("/_blobs/{blob_id}")
+    async def get_blob(blob_id: str, request: Request):
+        return await store.response(request, blob_id)
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://proxy"
+    )
+
+
+class ImageSession:
+    def __init__(self, image: bytes):
+        self.image = image
+
+    async def call_tool(self, name, arguments=None):
+        return types.CallToolResult(
+            content=[
+                types.TextContent(type="text", text="a chart"),
+                types.ImageContent(type="image", data=b64(self.image), mimeType="image/png"),
+                types.ImageContent(type="image", data="not base64!", mimeType="image/png"),
+            ]
+        )
+
+
+@pytest.mark.anyio
+async def test_images_are_served_from_blob_urls_with_ranges(tmp_path):
+    image = os.urandom(300_000)
+    store = BlobStore(spill_threshold=1024, spill_dir=str(tmp_path))
+
+    text, url, inline = await execute_tool(ImageSession(image), "chart", {}, blobs=store)
+    assert text == "a chart"
+    assert url.startswith("/_blobs/") and len(url) < 40
+    assert inline.startswith("data:image/png;base64,")
+    # Spilled to disk, not held in memory
+    assert store.stats() == {"blobs": 1, "memory_bytes": 0, "disk_bytes": 300_000}
+
+    async with blob_app(store) as client:
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["content-length"] == "300000"
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.content == image
+
+        response = await client.get(url, headers={"Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.headers["content-range"] == "bytes 100-199/300000"
+        assert response.content == image[100:200]
+
+        response = await client.get(url, headers={"Range": "bytes=-10"})
+        assert response.content == image[-10:]
+        response = await client.get(url, headers={"Range": "bytes=400000-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */300000"
+
+        assert (await client.get("/_blobs/unknown")).status_code == 404
+
+    store.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.anyio
+async def test_blobs_expire_and_memory_stays_within_budget():
+    store = BlobStore(ttl=60, max_memory=250, spill_threshold=200)
+    urls = [await store.put(b64(bytes([i]) * 100), "application/octet-stream") for i in range(3)]
+    # The oldest one made room for the third
+    assert store.stats()["memory_bytes"] == 200
+    assert store.get(urls[0].rsplit("/", 1)[1]) is None
+
+    async with blob_app(store) as client:
+        response = await client.get(urls[2])
+        assert response.content == bytes([2]) * 100
+
+        for blob in store._blobs.values():
+            blob.expires = time.monotonic() - 1
+        assert (await client.get(urls[2])).status_code == 404
+    assert store.stats() == {"blobs": 0, "memory_bytes": 0, "disk_bytes": 0}
+    store.close()
+
+
+@pytest.mark.anyio
+async def test_concurrent_spills_stay_within_the_disk_budget(tmp_path):
+    import anyio
+
+    store = BlobStore(spill_threshold=0, max_disk=250_000, spill_dir=str(tmp_path))
+    stored, failed = [], []
+
+    async def put():
+        try:
+            stored.append(await store.put(b64(os.urandom(100_000)), "image/png"))
+        except ValueError:
+            failed.append(True)
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(put)
+    assert len(stored) + len(failed) == 5
+    assert store.stats()["disk_bytes"] <= 250_000
+    assert sum(f.stat().st_size for f in tmp_path.iterdir()) <= 250_000
+    store.close()
+
+
+@pytest.mark.anyio
+async def test_responses_with_blob_links_are_not_cached(tmp_path):
+    from mcpo.utils.cache import ResponseCache
+
+    store = BlobStore(spill_dir=str(tmp_path))
+    cache = ResponseCache({"chart": None})
+    session = ImageSession(b"png")
+
+    first = await execute_tool(session, "chart", {}, cache=cache, blobs=store)
+    store.close()
+    second = await execute_tool(session, "chart", {}, cache=cache, blobs=store)
+    # Stored again rather than served from the cache with a dead link
+    assert first[1] != second[1]
+    assert store.get(second[1].rsplit("/", 1)[1]) is not None
+    assert cache.stats()["entries"] == 0
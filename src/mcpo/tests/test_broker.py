@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from mcp import types
+from mcp.shared.exceptions import McpError
+
+from mcpo.utils.broker import Broker, BrokerClient
+from mcpo.utils.notifications import NotificationRouter
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakePool:
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self.cancelled = asyncio.Event()
+
+    async def initialize(self):
+        return types.InitializeResult(
+            protocolVersion="2025-03-26",
+            capabilities=types.ServerCapabilities(),
+            serverInfo=types.Implementation(name="fake", version="1.0"),
+        )
+
+    async def call_tool(
+        self, name, arguments=None, read_timeout_seconds=None, progress_token=None
+    ):
+        if name == "invalid":
+            raise McpError(types.ErrorData(code=-32602, message="Bad arguments"))
+        if name == "down":
+            raise HTTPException(503, "MCP server is down", headers={"Retry-After": "3"})
+        if name == "slow":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                self.cancelled.set()
+                raise
+        if progress_token is not None:
+            await self.app.state.notifications(
+                types.ServerNotification(
+                    types.ProgressNotification(
+                        method="notifications/progress",
+                        params=types.ProgressNotificationParams(
+                            progressToken=progress_token, progress=1, total=2
+                        ),
+                    )
+                )
+            )
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=f"{name} {arguments}")]
+        )
+
+    def health(self):
+        return {"status": "ok"}
+
+    def stats(self):
+        return {"size": 1, "available": 1, "in_flight": 0, "restarts": 0,
+                "circuit": "closed", "latency": 0.001}
+
+
+@pytest.mark.anyio
+async def test_workers_call_the_brokers_pool(tmp_path):
+    app = FastAPI()
+    app.state.session = FakePool(app)
+    broker = Broker({"default": app}, str(tmp_path / "broker.sock"))
+    app.state.notifications = NotificationRouter(
+        forward=app.state.forward_notifications
+    )
+    await broker.start()
+
+    client = BrokerClient(broker.path)
+    worker_notifications = NotificationRouter()
+    session = client.session("default", worker_notifications)
+    try:
+        assert (await session.initialize()).serverInfo.name == "fake"
+        results = await asyncio.gather(
+            *(session.call_tool("echo", arguments={"n": n}) for n in range(20))
+        )
+        assert [r.content[0].text for r in results] == [
+            f"echo {{'n': {n}}}" for n in range(20)
+        ]
+
+        with pytest.raises(McpError) as e:
+            await session.call_tool("invalid")
+        assert e.value.error.code == -32602
+        with pytest.raises(HTTPException) as e:
+            await session.call_tool("down")
+        assert (e.value.status_code, e.value.headers) == (503, {"Retry-After": "3"})
+
+        # Progress goes to the worker that asked for it
+        progress = []
+        with worker_notifications.progress("token-1", progress.append):
+            await session.call_tool("report", progress_token="token-1")
+        assert [(p.progress, p.total) for p in progress] == [(1, 2)]
+
+        # Other notifications reach every worker
+        changed = []
+
+        async def on_list_changed(notification):
+            changed.append(notification)
+
+        worker_notifications.subscribe("notifications/tools/list_changed", on_list_changed)
+        await app.state.notifications(
+            types.ServerNotification(
+                types.ToolListChangedNotification(
+                    method="notifications/tools/list_changed"
+                )
+            )
+        )
+        for _ in range(100):
+            if changed:
+                break
+            await asyncio.sleep(0.01)
+        assert len(changed) == 1
+
+        # A worker giving up on a call cancels it in the broker
+        call = asyncio.ensure_future(session.call_tool("slow"))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        await asyncio.wait_for(app.state.session.cancelled.wait(), 1)
+
+        assert session.health() == {"status": "ok"}
+        assert session.stats()["available"] == 1
+    finally:
+        await client.close()
+        await broker.close()
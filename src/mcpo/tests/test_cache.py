@@ -0,0 +1,71 @@
+import time
+
+from mcpo.utils.cache import MISSING, ResponseCache, canonical_key
+
+
+def test_canonical_key_ignores_argument_order():
+    assert canonical_key("t", {"a": 1, "b": [1, 2]}) == canonical_key(
+        "t", {"b": [1, 2], "a": 1}
+    )
+    assert canonical_key("t", {"a": 1}) != canonical_key("u", {"a": 1})
+
+
+def test_from_config_accepts_list_and_mapping():
+    cache = ResponseCache.from_config({"tools": ["get_weather"]})
+    assert cache.enabled_for("get_weather")
+    assert not cache.enabled_for("create_workflow")
+
+    cache = ResponseCache.from_config(
+        {"ttl": 10, "tools": {"get_forecast": {"ttl": 600}, "exa_search": None}}
+    )
+    assert cache.tools == {"get_forecast": 600, "exa_search": None}
+    assert cache.ttl == 10
+
+
+def test_hit_miss_counters():
+    cache = ResponseCache({"get_weather": None})
+    assert cache.get("get_weather", {"city": "Taipei"}) is MISSING
+    cache.set("get_weather", {"city": "Taipei"}, "sunny")
+    assert cache.get("get_weather", {"city": "Taipei"}) == "sunny"
+    assert cache.get("get_weather", {"city": "Tokyo"}) is MISSING
+    assert cache.stats()["hits"] == {"get_weather": 1}
+    assert cache.stats()["misses"] == {"get_weather": 2}
+
+
+def test_cached_none_is_a_hit():
+    cache = ResponseCache({"t": None})
+    cache.set("t", {}, None)
+    assert cache.get("t", {}) is None
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache({"t": 0.05})
+    cache.set("t", {}, "value")
+    assert cache.get("t", {}) == "value"
+    time.sleep(0.1)
+    assert cache.get("t", {}) is MISSING
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_by_entries():
+    cache = ResponseCache({"t": None}, max_entries=2)
+    cache.set("t", {"i": 1}, 1)
+    cache.set("t", {"i": 2}, 2)
+    cache.get("t", {"i": 1})  # 1 is now most recently used
+    cache.set("t", {"i": 3}, 3)
+    assert cache.get("t", {"i": 2}) is MISSING
+    assert cache.get("t", {"i": 1}) == 1
+    assert cache.get("t", {"i": 3}) == 3
+    assert cache.evictions == 1
+
+
+def test_eviction_by_bytes_and_oversized_values():
+    cache = ResponseCache({"t": None}, max_bytes=30)
+    cache.set("t", {"i": 1}, "x" * 10)
+    cache.set("t", {"i": 2}, "y" * 10)
+    cache.set("t", {"i": 3}, "z" * 10)
+    assert cache.stats()["bytes"] <= 30
+    assert cache.get("t", {"i": 1}) is MISSING
+
+    cache.set("t", {"i": 4}, "w" * 100)
+    assert cache.get("t", {"i": 4}) is MISSING
@@ -0,0 +1,43 @@
+import asyncio
+
+from mcpo.utils.main import CLIENT_CLOSED_REQUEST, cancel_on_disconnect
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after=None):
+        self.disconnect_after = disconnect_after
+        self.url = type("URL", (), {"path": "/tool"})()
+
+    async def receive(self):
+        if self.disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.disconnect_after)
+        return {"type": "http.disconnect"}
+
+
+def test_cancel_on_disconnect_returns_result():
+    async def call():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    assert asyncio.run(cancel_on_disconnect(FakeRequest(), call())) == "done"
+
+
+def test_cancel_on_disconnect_cancels_pending_call():
+    cancelled = []
+
+    async def call():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        response = await cancel_on_disconnect(FakeRequest(0.01), call())
+        await asyncio.sleep(0)
+        return response
+
+    response = asyncio.run(main())
+    assert response.status_code == CLIENT_CLOSED_REQUEST
+    assert cancelled == [True]
@@ -0,0 +1,89 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mcp import types
+
+from mcpo.utils import fastjson
+from mcpo.utils.cache import ResponseCache
+from mcpo.utils.main import get_batch_handler, get_model_fields, get_tool_handler
+
+pytestmark = pytest.mark.skipif(not fastjson.available(), reason="orjson not installed")
+
+PAYLOAD = '{\n  "items": [1, 2.5, "é"],\n  "ok": true\n}\n'
+
+
+@pytest.fixture(autouse=True)
+def fast_json():
+    fastjson.enable()
+    yield
+    fastjson.disable()
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = 0
+
+    async def call_tool(self, name, arguments=None):
+        self.calls += 1
+        texts = {
+            "object": [PAYLOAD],
+            "array": ["[1, 2]"],
+            "text": ["[INFO] done [ok]"],
+            "nan": ["NaN"],
+            "repr": ["{'city': 'Taipei', 'temp': 21}"],
+            "two": ['{"a": 1}', "plain"],
+        }[name]
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=text) for text in texts]
+        )
+
+
+def make_client(session, cache=None):
+    app = FastAPI()
+    form_models = {}
+    for name in ("object", "array", "text", "nan", "repr", "two"):
+        fields = get_model_fields(f"{name}_form_model", {}, [])
+        handler = get_tool_handler(session, name, fields, cache=cache)
+        form_models[name] = handler.form_model
+        app.post(f"/{name}")(handler)
+    app.post("/_batch")(get_batch_handler(session, form_models, cache=cache))
+    return TestClient(app)
+
+
+def test_single_json_object_is_passed_through_byte_for_byte():
+    client = make_client(FakeSession())
+    response = client.post("/object", json={})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.text == PAYLOAD
+
+
+def test_other_output_is_decoded_as_before():
+    client = make_client(FakeSession())
+    assert client.post("/array", json={}).json() == [1, 2]
+    assert client.post("/text", json={}).json() == "[INFO] done [ok]"
+    assert client.post("/two", json={}).json() == [{"a": 1}, "plain"]
+    # Decoded by the json module (orjson rejects it), then encoded as valid JSON
+    assert client.post("/nan", json={}).text == "null"
+
+
+def test_text_that_only_looks_like_an_object_is_sent_as_a_string():
+    client = make_client(FakeSession())
+    response = client.post("/repr", json={})
+    assert response.status_code == 200
+    assert response.json() == "{'city': 'Taipei', 'temp': 21}"
+
+
+def test_batch_and_cache_decode_raw_results():
+    session = FakeSession()
+    cache = ResponseCache({"object": None, "array": None})
+    client = make_client(session, cache=cache)
+
+    assert client.post("/object", json={}).text == PAYLOAD
+    response = client.post("/_batch", json=[{"tool": "object"}, {"tool": "array"}])
+    assert [item["result"] for item in response.json()] == [
+        {"items": [1, 2.5, "é"], "ok": True},
+        [1, 2],
+    ]
+    # The batch call for "object" was served from the cached raw response
+    assert session.calls == 2
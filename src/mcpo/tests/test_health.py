@@ -0,0 +1,155 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mcpo.utils.auth import APIKeyMiddleware
+from mcpo.utils.health import readiness
+from mcpo.utils.pool import SessionPool
+from mcpo.utils.runner import ServerDispatchMiddleware
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class PingSession:
+    def __init__(self):
+        self.hang = False
+        self.calls = 0
+
+    async def initialize(self):
+        return "initialized"
+
+    async def send_ping(self):
+        if self.hang:
+            await anyio.sleep(10)
+
+    async def call_tool(self, name, arguments=None, read_timeout_seconds=None):
+        self.calls += 1
+        return name
+
+
+@pytest.mark.anyio
+async def test_pool_routes_around_and_restarts_unresponsive_sessions():
+    sessions = []
+
+    @asynccontextmanager
+    async def connect():
+        session = PingSession()
+        sessions.append(session)
+        yield session
+
+    async with SessionPool(
+        connect,
+        min_size=2,
+        max_size=2,
+        restart_delay=0.1,
+        ping_interval=0.05,
+        ping_timeout=0.05,
+        unhealthy_after=3,
+    ) as pool:
+        await anyio.sleep(0.1)
+        health = pool.health()
+        assert health["status"] == "ok"
+        assert all(s["latency_ms"] is not None for s in health["sessions"])
+        assert pool.stats()["latency"] is not None
+
+        stuck = sessions[0]
+        stuck.hang = True
+        with anyio.fail_after(1):
+            while not pool.health()["status"] == "degraded":
+                await anyio.sleep(0.01)
+        for _ in range(4):
+            await pool.call_tool("echo")
+        assert stuck.calls == 0
+
+        # Replaced after missing three pings in a row
+        with anyio.fail_after(2):
+            while len(sessions) < 3 or pool.health()["status"] != "ok":
+                await anyio.sleep(0.02)
+        assert pool.restarts == 1
+        assert stuck not in [m.session for m in pool._members]
+
+
+class StubRunner:
+    def __init__(self, app, name, status, lazy=False):
+        self.app = app
+        self.name = name
+        self.status = status
+        self.lazy = lazy
+        self.error = "cannot spawn" if status == "failed" else None
+        self.retry_after = 7 if status == "failed" else None
+        self.active = 0
+        self.started = False
+
+    @property
+    def running(self):
+        return self.status == "running"
+
+    async def start(self):
+        self.started = True
+        return self.running
+
+
+def test_health_endpoints_report_without_starting_servers():
+    main_app = FastAPI()
+    runners = {}
+    server_apps = {}
+    for name, status, lazy in [
+        ("up", "running", False),
+        ("later", "stopped", True),
+        ("down", "failed", False),
+    ]:
+        sub_app = FastAPI()
+        sub_app.state.session = SimpleNamespace(
+            health=lambda: {"status": "ok", "latency_ms": 1.5}
+        )
+
+        @sub_app.get("/_health")
+        async def get_health():
+            return {"status": "ok", "from": "sub-app"}
+
+        main_app.mount(f"/{name}", sub_app)
+        runners[name] = sub_app.state.runner = StubRunner(sub_app, name, status, lazy)
+        server_apps[name] = sub_app
+
+    @main_app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @main_app.get("/readyz")
+    async def readyz():
+        return readiness(server_apps)
+
+    main_app.add_middleware(ServerDispatchMiddleware, runners=runners)
+    main_app.add_middleware(
+        APIKeyMiddleware, api_key="secret", public_paths=["/healthz", "/readyz"]
+    )
+    client = TestClient(main_app)
+    auth = {"Authorization": "Bearer secret"}
+
+    assert client.get("/healthz").json() == {"status": "ok"}
+    assert client.get("/up/_health").status_code == 401
+    assert client.get("/up/_health", headers=auth).json()["from"] == "sub-app"
+
+    response = client.get("/later/_health", headers=auth)
+    assert (response.status_code, response.json()) == (200, {"status": "idle"})
+    response = client.get("/down/_health", headers=auth)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "7"
+    assert response.json()["error"] == "cannot spawn"
+    assert not any(runner.started for runner in runners.values())
+
+    servers = client.get("/readyz").json()["servers"]
+    assert {name: s["status"] for name, s in servers.items()} == {
+        "up": "ok",
+        "later": "idle",
+        "down": "failed",
+    }
+    assert readiness({"up": server_apps["up"]})["status"] == "ready"
+    assert readiness(server_apps)["status"] == "unavailable"
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from mcp import types
+
+from mcpo.utils.limits import ConcurrencyLimiter, ServerLimits
+from mcpo.utils.main import execute_tool
+
+
+async def hold(limiter, seconds, log=None, tag=None):
+    async with limiter.slot():
+        if log is not None:
+            log.append(tag)
+        await asyncio.sleep(seconds)
+
+
+def test_limiter_queues_then_rejects_with_429():
+    async def main():
+        limiter = ConcurrencyLimiter(1, max_queue=1, queue_timeout=5)
+        first = asyncio.ensure_future(hold(limiter, 0.05))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(hold(limiter, 0))
+        await asyncio.sleep(0)
+        assert (limiter.active, limiter.queued) == (1, 1)
+
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire()
+        assert exc.value.status_code == 429
+        assert int(exc.value.headers["Retry-After"]) >= 1
+
+        await asyncio.gather(first, second)
+        return limiter.stats()
+
+    stats = asyncio.run(main())
+    assert stats["active"] == 0
+    assert stats["admitted"] == 2
+    assert stats["rejected"] == 1
+    assert stats["waitSecondsMax"] > 0
+
+
+def test_limiter_queue_timeout_returns_503():
+    async def main():
+        limiter = ConcurrencyLimiter(1, max_queue=4, queue_timeout=0.05)
+        first = asyncio.ensure_future(hold(limiter, 0.2))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc:
+            await limiter.acquire()
+        await first
+        return limiter, exc.value
+
+    limiter, error = asyncio.run(main())
+    assert error.status_code == 503
+    assert "Retry-After" in error.headers
+    assert limiter.timed_out == 1
+    assert (limiter.active, limiter.queued) == (0, 0)
+
+
+def test_limiter_serves_waiters_in_order_and_skips_cancelled():
+    async def main():
+        limiter = ConcurrencyLimiter(1, max_queue=4)
+        log = []
+        first = asyncio.ensure_future(hold(limiter, 0.05, log, "first"))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(hold(limiter, 0, log, "cancelled"))
+        waiting = asyncio.ensure_future(hold(limiter, 0, log, "waiting"))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.gather(first, waiting)
+        return limiter, log
+
+    limiter, log = asyncio.run(main())
+    assert log == ["first", "waiting"]
+    assert (limiter.active, limiter.queued) == (0, 0)
+
+
+class SlowSession:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def call_tool(self, name, arguments=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        return types.CallToolResult(content=[types.TextContent(type="text", text="ok")])
+
+
+def test_server_limits_bound_tool_and_server_concurrency():
+    limits = ServerLimits.from_config(
+        {"maxConcurrent": 3, "tools": {"image": {"maxConcurrent": 1}}}, name="flux"
+    )
+    image, other = SlowSession(), SlowSession()
+
+    async def main():
+        await asyncio.gather(
+            *(execute_tool(image, "image", {}, limits=limits) for _ in range(4)),
+            *(execute_tool(other, "text", {}, limits=limits) for _ in range(6)),
+        )
+
+    asyncio.run(main())
+    assert image.max_active == 1
+    assert other.max_active <= 3
+    stats = limits.stats()
+    assert stats["tools"]["image"]["admitted"] == 4
+    assert stats["server"]["admitted"] == 10
+    assert stats["server"]["active"] == 0
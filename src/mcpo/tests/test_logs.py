@@ -0,0 +1,94 @@
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from mcpo.utils.logs import (
+    JSONFormatter,
+    RequestIdFilter,
+    RequestIdMiddleware,
+    SamplingFilter,
+    Truncated,
+    request_id,
+    setup_logging,
+    truncate_values,
+)
+
+
+def test_truncate_values_shortens_large_arguments():
+    args = {
+        "prompt": "x" * 500,
+        "image": b"\x00" * 1024,
+        "items": list(range(30)),
+        "nested": {"a": {"b": {"c": {"d": {"e": "deep"}}}}},
+    }
+    short = truncate_values(args, limit=10)
+    assert short["prompt"] == "xxxxxxxxxx…(+490 chars)"
+    assert short["image"] == "<1024 bytes>"
+    assert short["items"][-1] == "…+10 more" and len(short["items"]) == 21
+    assert short["nested"]["a"]["b"]["c"] == "<dict of 1>"
+    assert str(Truncated({"q": "hello world"}, limit=5)) == "{'q': 'hello…(+6 chars)'}"
+
+
+def test_sampling_filter_keeps_a_fraction_per_level():
+    sampling = SamplingFilter.parse("info=0.1, debug=0")
+    info = logging.makeLogRecord({"levelno": logging.INFO})
+    debug = logging.makeLogRecord({"levelno": logging.DEBUG})
+    error = logging.makeLogRecord({"levelno": logging.ERROR})
+    kept = sum(sampling.filter(info) for _ in range(2000))
+    assert 100 < kept < 300
+    assert not any(sampling.filter(debug) for _ in range(100))
+    assert all(sampling.filter(error) for _ in range(100))
+
+
+def test_requests_get_an_id_in_logs_and_response():
+    logger = logging.getLogger("mcpo.tests.request_id")
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    handler.addFilter(RequestIdFilter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    app = FastAPI()
+
+    @app.get("/hello")
+    async def hello():
+        logger.info("handling %s", Truncated("y" * 300, limit=3))
+        return request_id.get()
+
+    app.add_middleware(RequestIdMiddleware)
+    client = TestClient(app)
+    try:
+        response = client.get("/hello")
+        generated = response.headers["x-request-id"]
+        assert response.json() == generated
+        response = client.get("/hello", headers={"X-Request-ID": "abc-123"})
+        assert response.headers["x-request-id"] == "abc-123"
+    finally:
+        logger.removeHandler(handler)
+
+    assert [r.request_id for r in records] == [generated, "abc-123"]
+    assert records[0].getMessage() == "handling yyy…(+297 chars)"
+
+    entry = json.loads(JSONFormatter().format(records[1]))
+    assert entry["request_id"] == "abc-123"
+    assert entry["level"] == "INFO"
+    assert request_id.get() is None
+
+
+def test_setup_logging_writes_from_a_background_thread(capsys):
+    root = logging.getLogger()
+    saved = (list(root.handlers), root.level)
+    listener = setup_logging(level="INFO", fmt="json")
+    try:
+        logging.getLogger("mcpo.tests").info("queued %d", 1, extra={"tool": "echo"})
+    finally:
+        listener.stop()
+        root.handlers[:] = saved[0]
+        root.setLevel(saved[1])
+
+    [line] = capsys.readouterr().err.strip().splitlines()
+    entry = json.loads(line)
+    assert (entry["message"], entry["tool"]) == ("queued 1", "echo")
@@ -2,7 +2,7 @@ import pytest
 from pydantic import BaseModel, Field
 from typing import Any, List, Dict, Union
 
-from mcpo.utils.main import _process_schema_property
+from mcpo.utils.main import _process_schema_property, get_model
 
 
 _model_cache = {}
@@ -216,25 +216,73 @@ def test_model_caching():
     result_type1, _ = _process_schema_property(
         _model_cache, schema, "cache_test", "obj1", True
     )
-    model_name = "cache_test_obj1_model"
-    assert model_name in _model_cache
-    assert _model_cache[model_name] == result_type1
+    assert result_type1.__name__ == "cache_test_obj1_model"
+    assert list(_model_cache.values()) == [result_type1]
 
-    # Second call with same structure but different prefix/prop name (should generate new)
+    # Same name and structure: the model is shared
     result_type2, _ = _process_schema_property(
-        _model_cache, schema, "cache_test", "obj2", True
+        _model_cache, dict(schema), "cache_test", "obj1", False
     )
-    model_name2 = "cache_test_obj2_model"
-    assert model_name2 in _model_cache
-    assert _model_cache[model_name2] == result_type2
-    assert result_type1 != result_type2  # Different models
+    assert result_type2 is result_type1
 
-    # Third call identical to the first (should return cached model)
+    # Same structure under another name keeps its own name
     result_type3, _ = _process_schema_property(
-        _model_cache, schema, "cache_test", "obj1", True
+        _model_cache, dict(schema), "other_tool", "obj2", False
+    )
+    assert result_type3 is not result_type1
+    assert result_type3.__name__ == "other_tool_obj2_model"
+
+    # A different structure compiles a new model
+    result_type4, _ = _process_schema_property(
+        _model_cache,
+        {**schema, "properties": {"id": {"type": "string"}}},
+        "cache_test",
+        "obj1",
+        True,
+    )
+    assert result_type4 is not result_type1
+    assert len(_model_cache) == 3  # Only three unique models created
+
+
+def test_model_cache_keeps_the_most_recently_used():
+    from mcpo.utils.main import _ModelCache
+
+    cache = _ModelCache(max_size=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+    cache["c"] = 3
+    assert list(cache) == ["a", "c"]
+    assert cache.get("b") is None
+
+
+def test_get_model_is_shared_per_name_and_schema():
+    schema = {
+        "type": "object",
+        "properties": {"city": {"type": "string"}},
+        "required": ["city"],
+    }
+    model = get_model("weather_form_model", schema)
+    assert get_model("weather_form_model", dict(schema)) is model
+    assert get_model("forecast_form_model", schema) is not model
+    assert model.model_fields["city"].is_required()
+    assert get_model("ping_form_model", {"type": "object"}) is None
+
+
+def test_nested_models_keep_each_tools_name():
+    address = {
+        "type": "object",
+        "properties": {"city": {"type": "string"}},
+    }
+    schema = {"type": "object", "properties": {"address": address}}
+    first = get_model("ship_form_model", schema)
+    second = get_model("bill_form_model", schema)
+    assert first.model_fields["address"].annotation.__name__ == (
+        "ship_form_model_address_model"
+    )
+    assert second.model_fields["address"].annotation.__name__ == (
+        "bill_form_model_address_model"
     )
-    assert result_type3 == result_type1  # Should be the same cached object
-    assert len(_model_cache) == 2  # Only two unique models created
 
 
 def test_multi_type_property_with_list():
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from mcp import types
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_PARAMS, ErrorData
+
+from mcpo.utils.main import execute_tool
+from mcpo.utils.metrics import MetricsRegistry, ProxyMetrics
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls", "Calls.", ("tool",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    calls.labels('say "hi"').inc(2)
+    latency.labels().observe(0.1)
+    latency.labels().observe(0.5)
+    latency.labels().observe(5)
+
+    assert registry.render().splitlines() == [
+        "# HELP calls Calls.",
+        "# TYPE calls counter",
+        'calls_total{tool="say \\"hi\\""} 2',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.6",
+        "latency_seconds_count 3",
+    ]
+
+
+class Session:
+    async def call_tool(self, name, arguments=None):
+        if name == "bad_args":
+            raise McpError(ErrorData(code=INVALID_PARAMS, message="bad"))
+        if name == "fails":
+            return types.CallToolResult(
+                content=[types.TextContent(type="text", text="nope")], isError=True
+            )
+        return types.CallToolResult(content=[types.TextContent(type="text", text="ok")])
+
+
+def test_tool_calls_record_phases_and_error_classes():
+    metrics = ProxyMetrics()
+    server = metrics.server("weather")
+
+    async def main():
+        await execute_tool(Session(), "ok", {}, metrics=server.tool("ok"))
+        for name in ("bad_args", "fails"):
+            with pytest.raises(HTTPException):
+                await execute_tool(Session(), name, {}, metrics=server.tool(name))
+
+    asyncio.run(main())
+    text = metrics.render()
+    assert (
+        'mcpo_tool_phase_duration_seconds_count{server="weather",tool="ok",phase="mcp"} 1'
+        in text
+    )
+    assert (
+        'mcpo_tool_phase_duration_seconds_count{server="weather",tool="ok",phase="processing"} 1'
+        in text
+    )
+    assert (
+        'mcpo_tool_errors_total{server="weather",tool="bad_args",status="422",class="invalid_params"} 1'
+        in text
+    )
+    assert (
+        'mcpo_tool_errors_total{server="weather",tool="fails",status="500",class="tool_error"} 1'
+        in text
+    )
+    assert 'mcpo_tool_in_flight{server="weather",tool="ok"} 0' in text
+
+
+def test_rejected_calls_are_counted_by_reason():
+    from mcpo.utils.limits import Rejected, ServerLimits
+
+    class DownSession:
+        async def call_tool(self, name, arguments=None):
+            raise Rejected(503, "circuit_open", "MCP server 'weather' is down", 5)
+
+    metrics = ProxyMetrics()
+    server = metrics.server("weather")
+    limits = ServerLimits.from_config(
+        {"maxQueue": 0, "tools": {"slow": {"maxConcurrent": 1}}}
+    )
+
+    async def main():
+        # Holds the only slot, with no queue, so the next call is turned away
+        async with limits.slot("slow"):
+            with pytest.raises(HTTPException) as e:
+                await execute_tool(
+                    Session(), "slow", {}, limits=limits, metrics=server.tool("slow")
+                )
+            assert e.value.status_code == 429
+        with pytest.raises(HTTPException) as e:
+            await execute_tool(DownSession(), "ok", {}, metrics=server.tool("ok"))
+        assert e.value.headers == {"Retry-After": "5"}
+
+    asyncio.run(main())
+    text = metrics.render()
+    assert (
+        'mcpo_tool_errors_total{server="weather",tool="slow",status="429",class="queue_full"} 1'
+        in text
+    )
+    assert (
+        'mcpo_tool_errors_total{server="weather",tool="ok",status="503",class="circuit_open"} 1'
+        in text
+    )
+
+
+def test_collected_counters_survive_a_replaced_pool():
+    from fastapi import FastAPI
+
+    from mcpo.utils.metrics import CounterTotals, collect_servers
+
+    class Pool:
+        def __init__(self, restarts):
+            self.restarts = restarts
+
+        def stats(self):
+            return {
+                "size": 1,
+                "available": 1,
+                "in_flight": 0,
+                "restarts": self.restarts,
+                "circuit": "closed",
+                "latency": None,
+            }
+
+    def restarts(metrics):
+        restarts = next(m for m in metrics if m.name == "mcpo_server_restarts")
+        return restarts.labels("weather", "session").value
+
+    app = FastAPI()
+    app.state.session = Pool(restarts=3)
+    apps = {"weather": app}
+    totals = CounterTotals()
+    assert restarts(collect_servers(apps, totals)) == 3
+    app.state.session.restarts = 4
+    assert restarts(collect_servers(apps, totals)) == 4
+    # A reload or restart builds a new pool that counts from zero
+    app.state.session = Pool(restarts=1)
+    assert restarts(collect_servers(apps, totals)) == 5
+    assert restarts(collect_servers(apps, totals)) == 5
@@ -0,0 +1,87 @@
+import gzip
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from mcpo.utils.openapi import OpenAPICache, OpenAPIMiddleware
+
+
+def server_app(title, field_type):
+    # Same model name in both servers, different schemas
+    Form = type("Form", (BaseModel,), {"__annotations__": {"value": field_type}})
+    app = FastAPI(title=title, description=f"{title} MCP Server")
+
+    @app.post("/lookup")
+    async def lookup(form: Form):
+        return form
+
+    return app
+
+
+def make_proxy():
+    main_app = FastAPI(title="Proxy")
+    server_apps = {"weather": server_app("weather", str), "search": server_app("search", int)}
+    for name, app in server_apps.items():
+        main_app.mount(f"/{name}", app)
+    cache = OpenAPICache(main_app, server_apps)
+    main_app.add_middleware(OpenAPIMiddleware, cache=cache)
+    return main_app, server_apps, cache
+
+
+def test_combined_spec_prefixes_paths_and_renames_clashing_components():
+    main_app, _, cache = make_proxy()
+    client = TestClient(main_app)
+
+    spec = client.get("/openapi.json").json()
+    assert set(spec["paths"]) == {"/weather/lookup", "/search/lookup"}
+    weather = spec["paths"]["/weather/lookup"]["post"]
+    search = spec["paths"]["/search/lookup"]["post"]
+    assert weather["tags"] == ["weather"]
+    assert weather["operationId"] != search["operationId"]
+
+    schemas = spec["components"]["schemas"]
+    assert schemas["Form"]["properties"]["value"]["type"] == "string"
+    assert schemas["search__Form"]["properties"]["value"]["type"] == "integer"
+    body = search["requestBody"]["content"]["application/json"]["schema"]
+    assert body["$ref"] == "#/components/schemas/search__Form"
+    # Identical components are shared
+    assert "search__HTTPValidationError" not in schemas
+
+    server_spec = client.get("/search/openapi.json").json()
+    assert set(server_spec["paths"]) == {"/lookup"}
+    assert server_spec["servers"] == [{"url": "/search"}]
+
+
+def test_etags_304_gzip_and_rebuild_only_on_change():
+    main_app, server_apps, cache = make_proxy()
+    cache.warm()
+    builds = cache.builds
+    client = TestClient(main_app)
+
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+
+    plain = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["etag"] != etag
+    assert gzip.decompress(cache.combined().gzip_body) == plain.content
+    assert json.loads(plain.content) == response.json()
+
+    for tag in (etag, plain.headers["etag"], f"W/{etag}"):
+        response = client.get("/openapi.json", headers={"If-None-Match": tag})
+        assert response.status_code == 304
+        assert response.content == b""
+    assert cache.builds == builds
+
+    # A tool refresh resets the app's schema; only then is a spec rebuilt
+    weather = server_apps["weather"]
+    weather.post("/forecast")(lambda: None)
+    weather.openapi_schema = None
+    response = client.get("/openapi.json", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "/weather/forecast" in response.json()["paths"]
+    assert cache.builds == builds + 1
@@ -0,0 +1,185 @@
+from contextlib import asynccontextmanager
+
+import anyio
+import pytest
+from fastapi import HTTPException
+from mcp.shared.exceptions import McpError
+
+from mcpo.utils.pool import CONNECTION_CLOSED, SessionPool, SupervisedSession
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeSession:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def initialize(self):
+        return "initialized"
+
+    async def call_tool(self, name, arguments=None, read_timeout_seconds=None):
+        self.calls += 1
+        await anyio.sleep(self.delay)
+        return name
+
+
+def fake_connect(sessions, delay=0.0):
+    @asynccontextmanager
+    async def connect():
+        session = FakeSession(delay)
+        sessions.append(session)
+        yield session
+
+    return connect
+
+
+@pytest.mark.anyio
+async def test_pool_opens_min_sessions():
+    sessions = []
+    async with SessionPool(fake_connect(sessions), min_size=2, max_size=4) as pool:
+        assert pool.size == 2
+        assert await pool.initialize() == "initialized"
+    assert len(sessions) == 2
+
+
+@pytest.mark.anyio
+async def test_pool_grows_when_busy_and_dispatches_least_busy():
+    sessions = []
+    async with SessionPool(
+        fake_connect(sessions, delay=0.2), min_size=1, max_size=3
+    ) as pool:
+        async with anyio.create_task_group() as tg:
+            for _ in range(6):
+                tg.start_soon(pool.call_tool, "echo")
+                await anyio.sleep(0.02)
+        assert pool.size > 1
+        assert pool.size <= 3
+        assert sum(session.calls for session in sessions) == 6
+        assert all(session.calls > 0 for session in sessions)
+
+
+@pytest.mark.anyio
+async def test_pool_reaps_idle_sessions_down_to_min():
+    sessions = []
+    async with SessionPool(
+        fake_connect(sessions, delay=0.1), min_size=1, max_size=2, idle_timeout=0.1
+    ) as pool:
+        async with anyio.create_task_group() as tg:
+            for _ in range(3):
+                tg.start_soon(pool.call_tool, "echo")
+                await anyio.sleep(0.02)
+        assert pool.size == 2
+        await anyio.sleep(1.5)
+        assert pool.size == 1
+
+
+@pytest.mark.anyio
+async def test_pool_startup_failure_raises():
+    @asynccontextmanager
+    async def connect():
+        raise ConnectionError("boom")
+        yield
+
+    with pytest.raises(RuntimeError, match="boom"):
+        async with SessionPool(connect, name="broken"):
+            pass
+
+
+class UninitializedSession(SupervisedSession):
+    async def initialize(self):
+        return "initialized"
+
+
+@pytest.mark.anyio
+async def test_pool_cancelled_call_notifies_server():
+    client_send, server_receive = anyio.create_memory_object_stream(10)
+    server_send, client_receive = anyio.create_memory_object_stream(10)
+
+    @asynccontextmanager
+    async def connect():
+        async with UninitializedSession(client_receive, client_send) as session:
+            yield session
+
+    async with SessionPool(connect) as pool:
+        for name in ("first", "second"):
+            with anyio.move_on_after(0.1):
+                await pool.call_tool(name)
+        messages = [server_receive.receive_nowait().message.root for _ in range(4)]
+    for request_id, (call, cancelled) in enumerate(zip(messages[::2], messages[1::2])):
+        assert call.method == "tools/call" and call.id == request_id
+        assert cancelled.method == "notifications/cancelled"
+        assert cancelled.params["requestId"] == request_id
+
+
+class DyingSession(FakeSession):
+    def __init__(self):
+        super().__init__()
+        self.disconnected = anyio.Event()
+
+
+@pytest.mark.anyio
+async def test_pool_restarts_dead_sessions_with_backoff_and_fails_fast():
+    sessions = []
+    fail_next = []
+
+    @asynccontextmanager
+    async def connect():
+        if fail_next:
+            fail_next.pop()
+            raise ConnectionError("bad env var")
+        session = DyingSession()
+        sessions.append(session)
+        yield session
+
+    async with SessionPool(connect, name="flaky", restart_delay=0.2) as pool:
+        fail_next.append(True)
+        sessions[0].disconnected.set()
+        await anyio.sleep(0.05)
+
+        # Circuit open: no live session and the restart isn't due yet
+        with pytest.raises(HTTPException) as exc:
+            await pool.call_tool("echo")
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"] == "1"
+        assert pool.stats()["circuit"] == "open"
+
+        # First restart fails, the second one (0.4s later) succeeds
+        await anyio.sleep(0.8)
+        assert await pool.call_tool("echo") == "echo"
+        assert len(sessions) == 2
+        stats = pool.stats()
+        assert (stats["restarts"], stats["failures"], stats["circuit"]) == (
+            2,
+            2,
+            "closed",
+        )
+
+
+@pytest.mark.anyio
+async def test_supervised_session_fails_pending_requests_when_server_exits():
+    client_send, server_receive = anyio.create_memory_object_stream(10)
+    server_send, client_receive = anyio.create_memory_object_stream(10)
+
+    async with SupervisedSession(client_receive, client_send) as session:
+
+        async def server_exits():
+            await server_receive.receive()
+            await server_send.aclose()
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(server_exits)
+            with anyio.fail_after(2), pytest.raises(McpError) as exc:
+                await session.send_ping()
+        assert exc.value.error.code == CONNECTION_CLOSED
+        assert session.disconnected.is_set()
+
+
+def test_pool_rejects_invalid_bounds():
+    with pytest.raises(ValueError):
+        SessionPool(fake_connect([]), min_size=0)
+    with pytest.raises(ValueError):
+        SessionPool(fake_connect([]), min_size=3, max_size=2)
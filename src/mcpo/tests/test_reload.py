@@ -0,0 +1,225 @@
+import json
+from contextlib import asynccontextmanager
+
+import anyio
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from mcpo.utils.limits import ServerLimits
+from mcpo.utils.reload import ConfigReloader, diff_servers
+from mcpo.utils.runner import ServerDispatchMiddleware, ServerRunner
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_diff_servers():
+    old = {"a": {"command": "a"}, "b": {"command": "b"}, "c": {"command": "c"}}
+    new = {"a": {"command": "a"}, "c": {"command": "c2"}, "d": {"command": "d"}}
+    assert diff_servers(old, new) == (["d"], ["b"], ["c"])
+
+
+class Proxy:
+    """A main app whose servers answer with the command they were built from."""
+
+    def __init__(self, config_path, servers):
+        self.stopped = []
+        self.runners = {}
+        self.app = FastAPI()
+        self.app.add_middleware(ServerDispatchMiddleware, runners=self.runners)
+        for name, cfg in servers.items():
+            sub_app = self.build_server(name, cfg)
+            self.runners[name] = sub_app.state.runner
+            self.app.mount(f"/{name}", sub_app)
+        self.reloader = ConfigReloader(
+            self.app, config_path, servers, self.runners, self.build_server
+        )
+
+    def build_server(self, name, cfg):
+        @asynccontextmanager
+        async def lifespan(app):
+            if cfg.get("broken"):
+                raise RuntimeError(f"{cfg['command']}: command not found")
+            try:
+                yield
+            finally:
+                self.stopped.append(cfg["command"])
+
+        sub_app = FastAPI(lifespan=lifespan)
+        sub_app.state.limits = ServerLimits.from_config(cfg.get("limits", {}), name)
+
+        @sub_app.get("/whoami")
+        async def whoami(delay: float = 0):
+            await anyio.sleep(delay)
+            return cfg["command"]
+
+        sub_app.state.runner = ServerRunner(sub_app, name)
+        return sub_app
+
+
+@pytest.mark.anyio
+async def test_reload_swaps_only_changed_servers(tmp_path):
+    config_path = tmp_path / "config.json"
+    servers = {
+        "keep": {"command": "keep"},
+        "edit": {"command": "v1"},
+        "drop": {"command": "drop"},
+    }
+    config_path.write_text(json.dumps({"mcpServers": servers}))
+    proxy = Proxy(str(config_path), servers)
+    transport = httpx.ASGITransport(app=proxy.app)
+
+    async with anyio.create_task_group() as tg, httpx.AsyncClient(
+        transport=transport, base_url="http://proxy"
+    ) as client:
+        for runner in proxy.runners.values():
+            runner.bind(tg)
+            await runner.start()
+        proxy.reloader.bind(tg)
+        keep = proxy.runners["keep"]
+
+        # A slow request to the edited server is still in flight during the reload
+        slow = []
+
+        async def slow_call():
+            slow.append((await client.get("/edit/whoami?delay=0.3")).json())
+
+        tg.start_soon(slow_call)
+        await anyio.sleep(0.1)
+
+        config_path.write_text(
+            json.dumps(
+                {
+                    "mcpServers": {
+                        "keep": {"command": "keep"},
+                        "edit": {"command": "v2"},
+                        "new": {"command": "new"},
+                    }
+                }
+            )
+        )
+        assert await proxy.reloader.reload() == {
+            "added": ["new"],
+            "removed": ["drop"],
+            "changed": ["edit"],
+        }
+
+        assert slow == ["v1"]
+        assert proxy.runners["keep"] is keep
+        assert (await client.get("/edit/whoami")).json() == "v2"
+        assert (await client.get("/new/whoami")).json() == "new"
+        assert (await client.get("/drop/whoami")).status_code == 404
+        await anyio.sleep(0.05)
+        assert sorted(proxy.stopped) == ["drop", "v1"]
+
+        proxy.reloader.close()
+        for runner in proxy.runners.values():
+            await runner.stop()
+
+
+@pytest.mark.anyio
+async def test_unreadable_config_keeps_current_servers(tmp_path):
+    config_path = tmp_path / "config.json"
+    servers = {"keep": {"command": "keep"}}
+    config_path.write_text(json.dumps({"mcpServers": servers}))
+    proxy = Proxy(str(config_path), servers)
+
+    config_path.write_text("{")
+    assert await proxy.reloader.reload() == {"added": [], "removed": [], "changed": []}
+    assert list(proxy.runners) == ["keep"]
+
+
+@pytest.mark.anyio
+async def test_invalid_server_entry_keeps_current_servers(tmp_path):
+    config_path = tmp_path / "config.json"
+    servers = {"keep": {"command": "keep"}, "edit": {"command": "v1"}}
+    config_path.write_text(json.dumps({"mcpServers": servers}))
+    proxy = Proxy(str(config_path), servers)
+    transport = httpx.ASGITransport(app=proxy.app)
+
+    async with anyio.create_task_group() as tg, httpx.AsyncClient(
+        transport=transport, base_url="http://proxy"
+    ) as client:
+        for runner in proxy.runners.values():
+            runner.bind(tg)
+            await runner.start()
+        proxy.reloader.bind(tg)
+        edit = proxy.runners["edit"]
+
+        # A per-tool limit without maxConcurrent can't be built
+        config_path.write_text(
+            json.dumps(
+                {
+                    "mcpServers": {
+                        "keep": {"command": "keep"},
+                        "edit": {"command": "v2"},
+                        "new": {"command": "new", "limits": {"tools": {"t": {}}}},
+                    }
+                }
+            )
+        )
+        assert await proxy.reloader.reload() == {
+            "added": [],
+            "removed": [],
+            "changed": [],
+        }
+        assert proxy.runners["edit"] is edit
+        assert (await client.get("/keep/whoami")).json() == "keep"
+        assert (await client.get("/edit/whoami")).json() == "v1"
+        assert (await client.get("/new/whoami")).status_code == 404
+
+        config_path.write_text(json.dumps({"mcpServers": {"keep": "not an object"}}))
+        await proxy.reloader.reload()
+        assert (await client.get("/edit/whoami")).json() == "v1"
+
+        proxy.reloader.close()
+        for runner in proxy.runners.values():
+            await runner.stop()
+
+
+@pytest.mark.anyio
+async def test_server_that_fails_to_start_keeps_current_servers(tmp_path):
+    config_path = tmp_path / "config.json"
+    servers = {"edit": {"command": "v1"}}
+    config_path.write_text(json.dumps({"mcpServers": servers}))
+    proxy = Proxy(str(config_path), servers)
+    transport = httpx.ASGITransport(app=proxy.app)
+
+    async with anyio.create_task_group() as tg, httpx.AsyncClient(
+        transport=transport, base_url="http://proxy"
+    ) as client:
+        for runner in proxy.runners.values():
+            runner.bind(tg)
+            await runner.start()
+        proxy.reloader.bind(tg)
+        edit = proxy.runners["edit"]
+
+        # Edited to a command that doesn't run
+        config_path.write_text(
+            json.dumps(
+                {
+                    "mcpServers": {
+                        "edit": {"command": "v2", "broken": True},
+                        "new": {"command": "new"},
+                    }
+                }
+            )
+        )
+        assert await proxy.reloader.reload() == {
+            "added": [],
+            "removed": [],
+            "changed": [],
+        }
+        assert proxy.runners["edit"] is edit and edit.running
+        assert (await client.get("/edit/whoami")).json() == "v1"
+        assert (await client.get("/new/whoami")).status_code == 404
+        # The new server that did start is stopped again
+        await anyio.sleep(0.05)
+        assert proxy.stopped == ["new"]
+
+        proxy.reloader.close()
+        for runner in proxy.runners.values():
+            await runner.stop()
@@ -0,0 +1,259 @@
+import asyncio
+import base64
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mcp import types
+from mcp.shared.exceptions import McpError
+
+from mcpo.main import create_dynamic_endpoints
+from mcpo.utils.main import process_tool_response
+from mcpo.utils.notifications import NotificationRouter
+from mcpo.utils.pool import SessionPool
+from mcpo.utils.resources import RESOURCE_NOT_FOUND, ResourceCache
+
+
+def updated(uri):
+    return types.ServerNotification(
+        types.ResourceUpdatedNotification(
+            method="notifications/resources/updated",
+            params=types.ResourceUpdatedNotificationParams(uri=uri),
+        )
+    )
+
+
+class ResourceSession:
+    """Pool-like session whose resources can be changed by the test."""
+
+    def __init__(self, subscribe=True):
+        self.subscribe = subscribe
+        self.texts = {"file:///notes.md": "v1"}
+        self.blobs = {"file:///logo.png": base64.b64encode(b"\x89PNG" * 1000).decode()}
+        self.subscriptions = set()
+        self.reads = 0
+
+    async def initialize(self):
+        return SimpleNamespace(
+            serverInfo=None,
+            capabilities=types.ServerCapabilities(
+                resources=types.ResourcesCapability(subscribe=self.subscribe)
+            ),
+        )
+
+    async def list_tools(self):
+        return SimpleNamespace(tools=[])
+
+    async def list_resources(self):
+        return types.ListResourcesResult(
+            resources=[
+                types.Resource(uri=uri, name=uri.rsplit("/", 1)[1])
+                for uri in [*self.texts, *self.blobs]
+            ]
+        )
+
+    def subscribed(self, uri):
+        return uri in self.subscriptions
+
+    async def read_resource(self, uri, subscribe=False):
+        if subscribe:
+            self.subscriptions.add(uri)
+        self.reads += 1
+        await asyncio.sleep(0.01)
+        if uri in self.texts:
+            contents = [
+                types.TextResourceContents(
+                    uri=uri, mimeType="text/markdown", text=self.texts[uri]
+                )
+            ]
+        elif uri in self.blobs:
+            contents = [
+                types.BlobResourceContents(
+                    uri=uri, mimeType="image/png", blob=self.blobs[uri]
+                )
+            ]
+        else:
+            raise McpError(
+                types.ErrorData(code=RESOURCE_NOT_FOUND, message="Resource not found")
+            )
+        return types.ReadResourceResult(contents=contents)
+
+
+def make_app(session):
+    app = FastAPI()
+    app.state.session = session
+    app.state.notifications = NotificationRouter()
+    asyncio.run(create_dynamic_endpoints(app))
+    return app
+
+
+def test_resources_are_listed_and_streamed():
+    app = make_app(ResourceSession())
+    client = TestClient(app)
+
+    listed = client.get("/_resources").json()
+    assert [r["name"] for r in listed] == ["notes.md", "logo.png"]
+
+    response = client.get("/_resources/read", params={"uri": "file:///notes.md"})
+    assert response.headers["content-type"].startswith("text/markdown")
+    assert response.headers["content-length"] == "2"
+    assert response.text == "v1"
+
+    response = client.get("/_resources/read", params={"uri": "file:///logo.png"})
+    assert response.headers["content-type"] == "image/png"
+    assert response.content == b"\x89PNG" * 1000
+
+    response = client.get("/_resources/read", params={"uri": "file:///missing"})
+    assert response.status_code == 404
+
+
+def test_cached_until_the_server_reports_an_update():
+    session = ResourceSession()
+    app = make_app(session)
+    cache = app.state.resource_cache
+    uri = "file:///notes.md"
+
+    async def main():
+        # Concurrent misses share one read, later reads are hits
+        results = await asyncio.gather(*(cache.read(session, uri) for _ in range(5)))
+        assert {r.contents[0].text for r in results} == {"v1"}
+        await cache.read(session, uri)
+        assert session.reads == 1
+
+        session.texts[uri] = "v2"
+        await app.state.notifications(updated(uri))
+        assert (await cache.read(session, uri)).contents[0].text == "v2"
+        assert session.reads == 2
+
+        # An update during a read keeps that read out of the cache
+        session.texts[uri] = "v3"
+        await app.state.notifications(updated(uri))
+        read = asyncio.ensure_future(cache.read(session, uri))
+        await asyncio.sleep(0)
+        await app.state.notifications(updated(uri))
+        await read
+        await cache.read(session, uri)
+        assert session.reads == 4
+
+        # Lost subscriptions (e.g. a restarted session) mean misses
+        session.subscriptions.clear()
+        await cache.read(session, uri)
+        assert session.reads == 5
+
+    asyncio.run(main())
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_no_cache_without_subscribe_support():
+    session = ResourceSession(subscribe=False)
+    app = make_app(session)
+    client = TestClient(app)
+
+    assert app.state.resource_cache is None
+    for _ in range(2):
+        client.get("/_resources/read", params={"uri": "file:///notes.md"})
+    assert session.reads == 2
+    assert session.subscriptions == set()
+
+
+def test_embedded_resources_in_tool_results():
+    result = types.CallToolResult(
+        content=[
+            types.EmbeddedResource(
+                type="resource",
+                resource=types.TextResourceContents(uri="file:///a.txt", text="hello"),
+            ),
+            types.EmbeddedResource(
+                type="resource",
+                resource=types.BlobResourceContents(
+                    uri="file:///a.bin", mimeType="image/gif", blob="R0lG"
+                ),
+            ),
+        ]
+    )
+    assert process_tool_response(result) == ["hello", "data:image/gif;base64,R0lG"]
+
+
+class PagedServer:
+    """MCP client session stand-in, for a server that pages ``resources/list``."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.subscriptions = set()
+
+    async def initialize(self):
+        return None
+
+    async def list_resources(self):
+        return self._page(None)
+
+    async def send_request(self, request, result_type):
+        params = request.model_dump(by_alias=True, mode="json")["params"]
+        return self._page(params["cursor"])
+
+    def _page(self, cursor):
+        index = int(cursor or 0)
+        last = index == len(self.pages) - 1
+        return types.ListResourcesResult(
+            resources=[types.Resource(uri=uri, name=uri) for uri in self.pages[index]],
+            nextCursor=None if last else str(index + 1),
+        )
+
+    async def subscribe_resource(self, uri):
+        self.subscriptions.add(str(uri))
+
+    async def unsubscribe_resource(self, uri):
+        self.subscriptions.discard(str(uri))
+
+    async def read_resource(self, uri):
+        return types.ReadResourceResult(
+            contents=[types.TextResourceContents(uri=uri, text=uri)]
+        )
+
+
+def serve(server):
+    @asynccontextmanager
+    async def connect():
+        yield server
+
+    return SessionPool(connect)
+
+
+def test_listing_follows_next_cursor():
+    server = PagedServer([["file:///a"], ["file:///b", "file:///c"], ["file:///d"]])
+
+    async def main():
+        async with serve(server) as pool:
+            return await pool.list_resources()
+
+    result = asyncio.run(main())
+    assert [str(r.uri) for r in result.resources] == [
+        "file:///a",
+        "file:///b",
+        "file:///c",
+        "file:///d",
+    ]
+    assert result.nextCursor is None
+
+
+def test_evicted_resources_are_unsubscribed():
+    server = PagedServer([[]])
+    # Contents are the URI itself, 9 bytes for file:///a
+    cache = ResourceCache(max_entries=2, max_bytes=20)
+    big = "file:///" + "x" * 20
+
+    async def main():
+        async with serve(server) as pool:
+            for name in ("a", "b", "c"):
+                await cache.read(pool, f"file:///{name}")
+            # Too big to cache at all
+            await cache.read(pool, big)
+            assert not pool.subscribed("file:///a")
+            # Subscribed again when read again
+            await cache.read(pool, "file:///a")
+            assert pool.subscribed("file:///a")
+
+    asyncio.run(main())
+    assert server.subscriptions == {"file:///c", "file:///a"}
+    assert cache.stats()["entries"] == 2
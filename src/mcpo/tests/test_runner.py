@@ -0,0 +1,222 @@
+from contextlib import asynccontextmanager
+
+import anyio
+import pytest
+from fastapi import FastAPI, Request
+
+from mcpo.utils.runner import ServerRunner
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def make_app(delay=0.0, fail=False):
+    @asynccontextmanager
+    async def lifespan(app):
+        await anyio.sleep(delay)
+        if fail:
+            raise ConnectionError("cannot spawn")
+        yield
+
+    return FastAPI(lifespan=lifespan)
+
+
+@pytest.mark.anyio
+async def test_runners_start_concurrently():
+    runners = [ServerRunner(make_app(delay=0.3), f"server{i}") for i in range(4)]
+    async with anyio.create_task_group() as tg:
+        for runner in runners:
+            runner.bind(tg)
+        start = anyio.current_time()
+        async with anyio.create_task_group() as startup:
+            for runner in runners:
+                startup.start_soon(runner.start)
+        assert anyio.current_time() - start < 1.0
+        assert all(runner.running for runner in runners)
+        for runner in runners:
+            await runner.stop()
+
+
+@pytest.mark.anyio
+async def test_runner_startup_timeout_and_failure():
+    slow = ServerRunner(make_app(delay=5), "slow", startup_timeout=0.1)
+    broken = ServerRunner(make_app(fail=True), "broken")
+    async with anyio.create_task_group() as tg:
+        slow.bind(tg)
+        broken.bind(tg)
+        assert not await slow.start()
+        assert slow.status == "failed"
+        assert "timed out" in slow.error
+        assert not await broken.start()
+        assert broken.status == "failed"
+        assert "cannot spawn" in broken.error
+
+
+@pytest.mark.anyio
+async def test_failed_runner_backs_off_before_restarting():
+    attempts = []
+
+    @asynccontextmanager
+    async def lifespan(app):
+        attempts.append(anyio.current_time())
+        if len(attempts) < 3:
+            raise ConnectionError("bad env var")
+        yield
+
+    runner = ServerRunner(FastAPI(lifespan=lifespan), "flaky", restart_delay=0.2)
+    async with anyio.create_task_group() as tg:
+        runner.bind(tg)
+        assert not await runner.start()
+        # Fails fast while backing off, without spawning again
+        assert not await runner.start()
+        assert runner.retry_after == 1
+        assert len(attempts) == 1
+
+        while not await runner.start():
+            await anyio.sleep(0.05)
+        assert len(attempts) == 3
+        # 0.2s, then 0.4s between attempts
+        assert attempts[2] - attempts[1] >= 0.4
+        assert (runner.restarts, runner.failures) == (2, 0)
+        await runner.stop()
+
+
+@pytest.mark.anyio
+async def test_runner_without_task_group_does_not_start():
+    runner = ServerRunner(make_app(), "lazy", lazy=True)
+    assert not await runner.start()
+    assert runner.status == "stopped"
+
+
+class StubRunner:
+    def __init__(self, app, name, running=True):
+        self.app = app
+        self.name = name
+        self.running = running
+        self.error = "cannot spawn"
+        self.active = 0
+        self.retry_after = None if running else 5
+
+    async def start(self):
+        return self.running
+
+
+def test_dispatch_routes_by_server_name_and_reports_unavailable():
+    from fastapi.testclient import TestClient
+
+    from mcpo.utils.runner import ServerDispatchMiddleware
+
+    main_app = FastAPI()
+    runners = {}
+    for name, running in [("up", True), ("down", False)]:
+        sub_app = FastAPI()
+
+        @sub_app.get("/where")
+        async def where(request: Request):
+            return {"root_path": request.scope["root_path"]}
+
+        main_app.mount(f"/api/{name}", sub_app)
+        runners[name] = StubRunner(sub_app, name, running)
+    main_app.add_middleware(
+        ServerDispatchMiddleware, runners=runners, path_prefix="/api/"
+    )
+
+    client = TestClient(main_app)
+    assert client.get("/api/up/where").json() == {"root_path": "/api/up"}
+    response = client.get("/api/down/where")
+    assert response.status_code == 503
+    assert response.json()["detail"] == "MCP server 'down' is unavailable: cannot spawn"
+    assert response.headers["retry-after"] == "5"
+    assert client.get("/api/missing/where").status_code == 404
+
+
+@pytest.mark.anyio
+async def test_hung_eager_server_does_not_delay_the_others():
+    import httpx
+
+    from mcpo.main import lifespan
+    from mcpo.utils.runner import ServerDispatchMiddleware
+
+    hung = anyio.Event()
+
+    @asynccontextmanager
+    async def never_ready(app):
+        await hung.wait()
+        yield
+
+    main_app = FastAPI(lifespan=lifespan)
+    runners = {}
+    for name, sub_app in [("hung", FastAPI(lifespan=never_ready)), ("up", make_app())]:
+
+        @sub_app.get("/ping")
+        async def ping():
+            return "pong"
+
+        sub_app.state.runner = ServerRunner(sub_app, name)
+        runners[name] = sub_app.state.runner
+        main_app.mount(f"/{name}", sub_app)
+    main_app.add_middleware(ServerDispatchMiddleware, runners=runners)
+
+    transport = httpx.ASGITransport(app=main_app)
+    with anyio.fail_after(5):
+        async with main_app.router.lifespan_context(main_app), httpx.AsyncClient(
+            transport=transport, base_url="http://proxy"
+        ) as client:
+            assert (await client.get("/up/ping")).json() == "pong"
+            assert runners["hung"].status == "starting"
+
+            # Requests to the server still starting wait for it
+            async with anyio.create_task_group() as tg:
+                responses = []
+
+                async def call():
+                    responses.append(await client.get("/hung/ping"))
+
+                tg.start_soon(call)
+                await anyio.sleep(0.1)
+                assert not responses
+                hung.set()
+            assert responses[0].json() == "pong"
+
+
+def test_server_start_backoff_is_read_from_pool_config(tmp_path, monkeypatch):
+    import json
+
+    import uvicorn
+
+    from mcpo.main import run
+
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "mcpServers": {
+                    "tuned": {
+                        "command": "true",
+                        "pool": {"restartDelay": 5, "maxRestartDelay": 120},
+                    },
+                    "default": {"command": "true"},
+                }
+            }
+        )
+    )
+    apps = []
+
+    async def serve(self, sockets=None):
+        apps.append(self.config.app)
+
+    monkeypatch.setattr(uvicorn.Server, "serve", serve)
+    anyio.run(lambda: run(config_path=str(config_path)))
+
+    runners = {
+        route.path.strip("/"): route.app.state.runner
+        for route in apps[0].routes
+        if hasattr(getattr(route, "app", None), "state")
+    }
+    delays = {
+        name: (runner.restart_delay, runner.max_restart_delay)
+        for name, runner in runners.items()
+    }
+    assert delays == {"tuned": (5, 120), "default": (1, 60)}
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from mcpo.utils.singleflight import SingleFlight
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_identical_calls_share_one_call():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": calls}
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+        assert flight.in_flight == 0
+        return flight, results
+
+    flight, results = run(main())
+    assert calls == 1
+    assert results == [{"value": 1}] * 5
+    assert flight.coalesced == 4
+
+
+def test_different_keys_are_not_coalesced():
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b"))
+        )
+
+    assert run(main()) == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_errors_are_shared_and_not_remembered():
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("backend down")
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            *(flight.do("k", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+        assert calls == 1
+        with pytest.raises(ValueError):
+            await flight.do("k", fail)
+        assert calls == 2
+
+    run(main())
+
+
+def test_one_cancelled_caller_does_not_cancel_the_others():
+    cancelled = False
+
+    async def fetch():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(0.1)
+            return "done"
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def main():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+        assert not cancelled
+
+        only = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0.01)
+        only.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled
+        assert flight.in_flight == 0
+
+    run(main())
+
+
+def test_enabled_for():
+    assert SingleFlight.from_config(True).enabled_for("anything")
+    flight = SingleFlight.from_config(["get_weather"])
+    assert flight.enabled_for("get_weather")
+    assert not flight.enabled_for("create_workflow")
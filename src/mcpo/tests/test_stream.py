@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mcp import types
+
+from mcpo.utils.main import get_model_fields, get_tool_handler
+from mcpo.utils.notifications import NotificationRouter
+
+
+class ProgressSession:
+    def __init__(self, notifications):
+        self.notifications = notifications
+
+    async def call_tool(self, name, arguments=None, progress_token=None):
+        if name == "fail":
+            return types.CallToolResult(
+                content=[types.TextContent(type="text", text="nope")], isError=True
+            )
+        for i in range(2 if progress_token is not None else 0):
+            await self.notifications(
+                types.ServerNotification(
+                    types.ProgressNotification(
+                        method="notifications/progress",
+                        params=types.ProgressNotificationParams(
+                            progressToken=progress_token, progress=i + 1, total=2
+                        ),
+                    )
+                )
+            )
+            await asyncio.sleep(0.01)
+        return types.CallToolResult(
+            content=[
+                types.TextContent(type="text", text='{"a": 1}'),
+                types.TextContent(type="text", text="plain"),
+            ]
+        )
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def make_client():
+    notifications = NotificationRouter()
+    session = ProgressSession(notifications)
+    app = FastAPI()
+    for name in ("work", "fail"):
+        fields = get_model_fields(
+            f"{name}_form_model", {"x": {"type": "integer"}}, []
+        )
+        app.post(f"/{name}")(
+            get_tool_handler(session, name, fields, notifications=notifications)
+        )
+    return TestClient(app)
+
+
+def test_stream_forwards_progress_and_content_items():
+    client = make_client()
+    response = client.post("/work?stream=1", json={})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_events(response.text) == [
+        ("progress", {"progress": 1.0, "total": 2.0}),
+        ("progress", {"progress": 2.0, "total": 2.0}),
+        ("content", {"a": 1}),
+        ("content", "plain"),
+        ("done", {}),
+    ]
+
+
+def test_stream_via_accept_header_reports_errors():
+    client = make_client()
+    response = client.post("/fail", json={}, headers={"Accept": "text/event-stream"})
+    assert parse_events(response.text) == [
+        ("error", {"status": 500, "detail": {"message": "nope"}})
+    ]
+
+
+def test_without_stream_returns_json():
+    client = make_client()
+    assert client.post("/work", json={}).json() == [{"a": 1}, "plain"]
@@ -0,0 +1,59 @@
+import anyio
+
+from mcpo.utils.main import _MODEL_CACHE, get_model, warm_model_cache
+from mcpo.utils.tool_store import ToolListStore, server_fingerprint
+
+TOOLS = [
+    {
+        "name": "store_test_search",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "filters": {
+                    "type": "object",
+                    "properties": {"site": {"type": "string"}},
+                },
+            },
+            "required": ["query"],
+        },
+    },
+    {"name": "store_test_ping", "inputSchema": {"type": "object"}},
+]
+
+
+def test_store_round_trips_through_the_file(tmp_path):
+    path = tmp_path / "cache" / "tools.json"
+    key = server_fingerprint("stdio", "uvx", ["mcp-server-time"])
+    assert key != server_fingerprint("stdio", "uvx", ["mcp-server-fetch"])
+
+    store = ToolListStore(str(path))
+    assert store.load(key) is None
+    anyio.run(store.save, key, TOOLS)
+
+    assert ToolListStore(str(path)).load(key) == TOOLS
+    assert [p.name for p in path.parent.iterdir()] == ["tools.json"]
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    # A directory where the file should be: the final rename fails
+    path = tmp_path / "tools.json"
+    path.mkdir()
+    store = ToolListStore(str(path))
+    anyio.run(store.save, "key", TOOLS)
+    assert store.load("key") == TOOLS
+    assert [p.name for p in tmp_path.iterdir()] == ["tools.json"]
+
+
+def test_unreadable_store_is_ignored(tmp_path):
+    path = tmp_path / "tools.json"
+    path.write_text("{not json")
+    assert ToolListStore(str(path)).load("anything") is None
+
+
+def test_warm_up_precompiles_the_models():
+    warm_model_cache(TOOLS)
+    compiled = len(_MODEL_CACHE)
+    model = get_model("store_test_search_form_model", dict(TOOLS[0]["inputSchema"]))
+    assert len(_MODEL_CACHE) == compiled
+    assert set(model.model_fields) == {"query", "filters"}
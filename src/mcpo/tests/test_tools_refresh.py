@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mcp import types
+
+from mcpo.main import create_dynamic_endpoints, watch_tool_list
+from mcpo.utils.cache import MISSING, ResponseCache
+from mcpo.utils.notifications import NotificationRouter
+
+
+def tool(name, **properties):
+    return types.Tool(
+        name=name,
+        description=f"The {name} tool",
+        inputSchema={"type": "object", "properties": properties},
+    )
+
+
+class ToolsSession:
+    def __init__(self, tools):
+        self.tools = tools
+        self.list_calls = 0
+
+    async def initialize(self):
+        return SimpleNamespace(serverInfo=None)
+
+    async def list_tools(self):
+        self.list_calls += 1
+        return SimpleNamespace(tools=list(self.tools))
+
+    async def call_tool(self, name, arguments=None):
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=f"{name} {sorted(arguments)}")]
+        )
+
+
+def test_tools_list_changed_refreshes_only_affected_routes():
+    session = ToolsSession(
+        [
+            tool("keep", text={"type": "string"}),
+            tool("edit", a={"type": "string"}),
+            tool("drop"),
+        ]
+    )
+    app = FastAPI()
+    app.state.session = session
+    app.state.notifications = NotificationRouter()
+    app.state.cache = ResponseCache({"keep": None, "edit": None})
+    changed = types.ServerNotification(
+        types.ToolListChangedNotification(method="notifications/tools/list_changed")
+    )
+
+    async def main():
+        await create_dynamic_endpoints(app)
+        watch_tool_list(app)
+        keep_route = next(r for r in app.routes if r.path == "/keep")
+        app.state.cache.set("edit", {"a": "x"}, "stale")
+        app.openapi()
+
+        session.tools = [
+            tool("keep", text={"type": "string"}),
+            tool("edit", a={"type": "string"}, b={"type": "integer"}),
+            tool("new"),
+        ]
+        # Several sessions of a pool may each announce the change
+        await app.state.notifications(changed)
+        await app.state.notifications(changed)
+        for _ in range(100):
+            if app.openapi_schema is None:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        return keep_route
+
+    keep_route = asyncio.run(main())
+    # Once at startup, then at most one refresh per burst of notifications
+    assert session.list_calls in (2, 3)
+
+    paths = [route.path for route in app.routes]
+    assert paths.index("/new") < paths.index("/_batch")
+    assert "/drop" not in paths
+    assert next(r for r in app.routes if r.path == "/keep") is keep_route
+    assert app.state.cache.get("edit", {"a": "x"}) is MISSING
+
+    client = TestClient(app)
+    assert client.post("/edit", json={"a": "x", "b": 1}).json() == "edit ['a', 'b']"
+    assert client.post("/drop", json={}).status_code == 404
+    assert "/new" in client.get("/openapi.json").json()["paths"]
+
+    response = client.post("/_batch", json=[{"tool": "edit", "arguments": {"b": "x"}}])
+    assert response.json()[0]["status"] == 422
@@ -1,14 +1,15 @@
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
 import base64
+import binascii
+import hmac
 
 from passlib.context import CryptContext
 from datetime import UTC, datetime, timedelta
 
 import jwt
-from typing import Optional, Union, List, Dict
+from typing import Optional, Union, List, Dict, Tuple
 
 
 ALGORITHM = "HS256"
@@ -16,7 +17,25 @@ ALGORITHM = "HS256"
 bearer_security = HTTPBearer(auto_error=False)
 
 
-def get_verify_api_key(api_key: str):
+def parse_api_keys(api_key: Union[str, List[str]]) -> List[str]:
+    """Accepted keys: a list, or a comma-separated string such as ``"key1,key2"``."""
+    if isinstance(api_key, str):
+        api_key = api_key.split(",")
+    return [key.strip() for key in api_key if key and key.strip()]
+
+
+def _matches_any(candidate: bytes, accepted: List[bytes]) -> bool:
+    # Compare against every value, so timing reveals neither which key nor how
+    # much of it matched
+    matched = False
+    for value in accepted:
+        matched |= hmac.compare_digest(candidate, value)
+    return matched
+
+
+def get_verify_api_key(api_key: Union[str, List[str]]):
+    accepted = [key.encode() for key in parse_api_keys(api_key)]
+
     async def verify_api_key(
         authorization: HTTPAuthorizationCredentials = Depends(bearer_security),
     ):
@@ -27,7 +46,7 @@ def get_verify_api_key(api_key: str):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         token = authorization.credentials
-        if token != api_key:
+        if not _matches_any(token.encode(), accepted):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Invalid API key",
@@ -36,73 +55,85 @@ def get_verify_api_key(api_key: str):
     return verify_api_key
 
 
-class APIKeyMiddleware(BaseHTTPMiddleware):
+class APIKeyMiddleware:
     """
-    Middleware that enforces Basic or Bearer token authentication for all requests.
+    Pure ASGI middleware that enforces Basic or Bearer token authentication for
+    all requests. Any Basic username is accepted; the password must be an API key.
+
+    The accepted ``Bearer`` header values are precomputed, and every comparison is
+    constant-time. Unlike ``BaseHTTPMiddleware`` this neither spawns a task per
+    request nor wraps the response stream, so streaming responses pass through
+    untouched. Add it once, to the outermost app.
     """
-    def __init__(self, app, api_key: str):
-        super().__init__(app)
-        self.api_key = api_key
-
-    async def dispatch(self, request: Request, call_next):
-        # Skip authentication for OPTIONS requests
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        # Get authorization header
-        authorization = request.headers.get("Authorization")
-
-        # Verify API key
-        try:
-            # Use the same function that the dependency uses
-            if not authorization:
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Missing or invalid Authorization header"},
-                    headers={"WWW-Authenticate": "Bearer, Basic"}
-                )
-
-            # Handle Bearer token auth
-            if authorization.startswith("Bearer "):
-                token = authorization[7:]  # Remove "Bearer " prefix
-                if token != self.api_key:
-                    return JSONResponse(
-                        status_code=403,
-                        content={"detail": "Invalid API key"}
-                    )
-            # Handle Basic auth
-            elif authorization.startswith("Basic "):
-                # Decode the base64 credentials
-                credentials = authorization[6:]  # Remove "Basic " prefix
-                try:
-                    decoded = base64.b64decode(credentials).decode('utf-8')
-                    # Basic auth format is username:password
-                    username, password = decoded.split(':', 1)
-                    # Any username is allowed, but password must match api_key
-                    if password != self.api_key:
-                        return JSONResponse(
-                            status_code=403,
-                            content={"detail": "Invalid credentials"}
-                        )
-                except Exception:
-                    return JSONResponse(
-                        status_code=401,
-                        content={"detail": "Invalid Basic Authentication format"},
-                        headers={"WWW-Authenticate": "Bearer, Basic"}
-                    )
-            else:
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Unsupported authorization method"},
-                    headers={"WWW-Authenticate": "Bearer, Basic"}
-                )
-
-            return await call_next(request)
-        except Exception as e:
-            return JSONResponse(
-                status_code=500,
-                content={"detail": str(e)}
-            )
+
+    def __init__(
+        self,
+        app,
+        api_key: Union[str, List[str]],
+        public_paths: Optional[List[str]] = None,
+        public_prefixes: Optional[List[str]] = None,
+    ):
+        self.app = app
+        # Exact paths served without a key, e.g. health probes
+        self.public_paths = frozenset(public_paths or ())
+        # Path prefixes served without a key, e.g. unguessable blob URLs
+        self.public_prefixes = tuple(public_prefixes or ())
+        self.api_keys = [key.encode() for key in parse_api_keys(api_key)]
+        self.bearer_values = [b"Bearer " + key for key in self.api_keys]
+
+    async def __call__(self, scope, receive, send):
+        # Skip authentication for OPTIONS (CORS preflight) requests
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in self.public_paths
+            or (self.public_prefixes and scope["path"].startswith(self.public_prefixes))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+                break
+
+        error = self._check(authorization)
+        if error is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code, detail = error
+        headers = {"WWW-Authenticate": "Bearer, Basic"} if status_code == 401 else None
+        response = JSONResponse(
+            status_code=status_code, content={"detail": detail}, headers=headers
+        )
+        await response(scope, receive, send)
+
+    def _check(self, authorization: Optional[bytes]) -> Optional[Tuple[int, str]]:
+        """``None`` if authorized, otherwise the status code and detail to return."""
+        if not authorization:
+            return 401, "Missing or invalid Authorization header"
+
+        # Handle Bearer token auth
+        if authorization.startswith(b"Bearer "):
+            if not _matches_any(authorization, self.bearer_values):
+                return 403, "Invalid API key"
+            return None
+
+        # Handle Basic auth
+        if authorization.startswith(b"Basic "):
+            try:
+                decoded = base64.b64decode(authorization[6:])
+                # Basic auth format is username:password
+                _, password = decoded.split(b":", 1)
+            except (binascii.Error, ValueError):
+                return 401, "Invalid Basic Authentication format"
+            if not _matches_any(password, self.api_keys):
+                return 403, "Invalid credentials"
+            return None
+
+        return 401, "Unsupported authorization method"
 
 
 # def create_token(data: dict, expires_delta: Union[timedelta, None] = None) -> str:
@@ -0,0 +1,353 @@
+import base64
+import binascii
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from mcp import types
+
+logger = logging.getLogger(__name__)
+
+# Base64 characters decoded at a time; a multiple of 4, ~768 KB of output
+DECODE_CHUNK = 1024 * 1024
+READ_CHUNK = 256 * 1024
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+_BLOB_ID = re.compile(r"[A-Za-z0-9_-]+$")
+
+
+class Blob:
+    __slots__ = ("id", "mime_type", "size", "expires", "data", "path")
+
+    def __init__(
+        self,
+        blob_id: str,
+        mime_type: str,
+        size: int,
+        expires: float,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+    ):
+        self.id = blob_id
+        self.mime_type = mime_type
+        self.size = size
+        self.expires = expires
+        self.data = data
+        self.path = path
+
+
+class BlobStore:
+    """
+    Binary tool output (images, blob resources) kept out of JSON responses,
+    which carry a short ``/_blobs/{id}`` URL instead of a base64 data URI.
+
+    Blobs up to ``spill_threshold`` bytes stay in memory while they fit in
+    ``max_memory``; bigger ones are decoded chunk by chunk straight into files
+    under ``spill_dir`` (at most ``max_disk`` bytes in total), so memory use
+    doesn't grow with the size of an image. Every blob expires ``ttl`` seconds
+    after it was stored; when a budget is full the oldest blobs go first.
+
+    With ``shared``, several processes (the HTTP workers) use one
+    ``spill_dir``: every blob goes to disk next to a small metadata file, so
+    any of them can serve a blob another one stored.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600,
+        max_memory: int = 64 * 1024 * 1024,
+        spill_threshold: int = 256 * 1024,
+        max_disk: int = 1024 * 1024 * 1024,
+        spill_dir: Optional[str] = None,
+        url_prefix: str = "/_blobs/",
+        shared: bool = False,
+    ):
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self.spill_threshold = spill_threshold
+        self.max_disk = max_disk
+        self.url_prefix = url_prefix
+        self.shared = shared
+
+        self._own_dir = spill_dir is None
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="mcpo-blobs-")
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        # Insertion order is expiry order, since every blob gets the same ttl
+        self._blobs: "OrderedDict[str, Blob]" = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "blobs": len(self._blobs),
+            "memory_bytes": self.memory_bytes,
+            "disk_bytes": self.disk_bytes,
+        }
+
+    def url(self, blob_id: str) -> str:
+        return f"{self.url_prefix}{blob_id}"
+
+    async def put(self, data: str, mime_type: str) -> str:
+        """Store base64 ``data``; returns the blob's URL."""
+        self._expire()
+        # Exact for unpadded input, at most 2 bytes over otherwise
+        estimate = len(data) * 3 // 4
+        blob_id = secrets.token_urlsafe(16)
+        expires = time.monotonic() + self.ttl
+
+        if (
+            not self.shared
+            and estimate <= self.spill_threshold
+            and estimate <= self.max_memory
+        ):
+            decoded = base64.b64decode(data, validate=True)
+            self._evict(memory=len(decoded))
+            blob = Blob(blob_id, mime_type, len(decoded), expires, data=decoded)
+            self.memory_bytes += blob.size
+        else:
+            if estimate > self.max_disk:
+                raise ValueError(f"Blob of {estimate} bytes exceeds the disk budget")
+            path = os.path.join(self.spill_dir, blob_id)
+            self._evict(disk=estimate)
+            if self.disk_bytes + estimate > self.max_disk:
+                # The rest is reserved by spills still being written
+                raise ValueError("Disk budget for blobs is full")
+            # Reserved before decoding, so concurrent spills can't overshoot
+            self.disk_bytes += estimate
+            try:
+                size = await anyio.to_thread.run_sync(_decode_to_file, data, path)
+            except BaseException:
+                self.disk_bytes -= estimate
+                raise
+            self.disk_bytes += size - estimate
+            # Other blobs may have been stored meanwhile; keep expiry order
+            expires = time.monotonic() + self.ttl
+            blob = Blob(blob_id, mime_type, size, expires, path=path)
+            if self.shared:
+                meta = {"mime_type": mime_type, "expires_at": time.time() + self.ttl}
+                try:
+                    with open(f"{path}.meta", "w") as f:
+                        json.dump(meta, f)
+                except OSError:
+                    self._remove(blob)
+                    raise
+
+        self._blobs[blob_id] = blob
+        return self.url(blob_id)
+
+    async def offload(self, content: List) -> Dict[int, str]:
+        """
+        Store the binary items of a tool result; returns their URLs by index
+        in ``content``. Items that aren't valid base64 stay inline.
+        """
+        urls = {}
+        for index, item in enumerate(content):
+            if isinstance(item, types.ImageContent):
+                data, mime_type = item.data, item.mimeType
+            elif isinstance(item, types.EmbeddedResource) and isinstance(
+                item.resource, types.BlobResourceContents
+            ):
+                data = item.resource.blob
+                mime_type = item.resource.mimeType or "application/octet-stream"
+            else:
+                continue
+            try:
+                urls[index] = await self.put(data, mime_type)
+            except (binascii.Error, ValueError, OSError) as e:
+                logger.warning(f"Could not store blob, returning it inline: {e}")
+        return urls
+
+    def links_to(self, response: Any) -> bool:
+        """
+        Whether a processed tool response holds URLs of this store's blobs,
+        which stop working once the blobs expire or are evicted.
+        """
+        items = response if isinstance(response, list) else [response]
+        return any(
+            isinstance(item, str) and item.startswith(self.url_prefix) for item in items
+        )
+
+    def get(self, blob_id: str) -> Optional[Blob]:
+        self._expire()
+        blob = self._blobs.get(blob_id)
+        if blob is None and self.shared:
+            blob = self._load_shared(blob_id)
+        return blob
+
+    def _load_shared(self, blob_id: str) -> Optional[Blob]:
+        """A blob stored by another process sharing ``spill_dir``, if unexpired."""
+        if not _BLOB_ID.match(blob_id):
+            return None
+        path = os.path.join(self.spill_dir, blob_id)
+        try:
+            with open(f"{path}.meta") as f:
+                meta = json.load(f)
+            size = os.path.getsize(path)
+        except (OSError, ValueError):
+            return None
+        remaining = meta["expires_at"] - time.time()
+        if remaining <= 0:
+            return None
+        return Blob(
+            blob_id, meta["mime_type"], size, time.monotonic() + remaining, path=path
+        )
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._blobs:
+            blob = next(iter(self._blobs.values()))
+            if blob.expires > now:
+                break
+            self._remove(blob)
+
+    def _evict(self, memory: int = 0, disk: int = 0):
+        """Drop the oldest blobs of a kind until ``memory``/``disk`` more bytes fit."""
+        for blob in list(self._blobs.values()):
+            memory_full = memory and self.memory_bytes + memory > self.max_memory
+            disk_full = disk and self.disk_bytes + disk > self.max_disk
+            if not (memory_full or disk_full):
+                return
+            if (memory_full and blob.data is not None) or (
+                disk_full and blob.path is not None
+            ):
+                self._remove(blob)
+
+    def _remove(self, blob: Blob):
+        self._blobs.pop(blob.id, None)
+        if blob.data is not None:
+            self.memory_bytes -= blob.size
+        else:
+            self.disk_bytes -= blob.size
+            # Readers that already opened the file keep reading it
+            paths = [blob.path, f"{blob.path}.meta"] if self.shared else [blob.path]
+            for path in paths:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def close(self):
+        for blob in list(self._blobs.values()):
+            self._remove(blob)
+        if self._own_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    async def response(self, request: Request, blob_id: str) -> Response:
+        """The blob as a streamed response, honouring a single ``Range``."""
+        blob = self.get(blob_id)
+        if blob is None:
+            raise HTTPException(status_code=404, detail="Blob not found or expired")
+
+        max_age = max(int(blob.expires - time.monotonic()), 0)
+        headers = {
+            "Accept-Ranges": "bytes",
+            "Cache-Control": f"private, max-age={max_age}",
+            "ETag": f'"{blob.id}"',
+        }
+        start, end = 0, blob.size - 1
+        status_code = 200
+        byte_range = _parse_range(request.headers.get("range"), blob.size)
+        if byte_range is not None and request.headers.get("if-range") in (
+            None,
+            headers["ETag"],
+        ):
+            if byte_range == (-1, -1):
+                raise HTTPException(
+                    status_code=416,
+                    detail="Range not satisfiable",
+                    headers={"Content-Range": f"bytes */{blob.size}"},
+                )
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{blob.size}"
+        headers["Content-Length"] = str(end - start + 1)
+
+        # Opened now, so the blob expiring mid-download doesn't cut it short
+        f = None
+        if blob.path is not None:
+            try:
+                f = await anyio.open_file(blob.path, "rb")
+            except FileNotFoundError:
+                raise HTTPException(status_code=404, detail="Blob not found or expired")
+
+        return StreamingResponse(
+            _iter_blob(blob, f, start, end + 1),
+            status_code=status_code,
+            media_type=blob.mime_type,
+            headers=headers,
+        )
+
+
+def _decode_to_file(data: str, path: str) -> int:
+    """Decode base64 ``data`` into ``path`` a chunk at a time; returns the size."""
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            for offset in range(0, len(data), DECODE_CHUNK):
+                chunk = base64.b64decode(
+                    data[offset : offset + DECODE_CHUNK], validate=True
+                )
+                f.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        raise
+    return size
+
+
+def _parse_range(value: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    ``(start, end)`` of a single ``bytes=`` range, ``(-1, -1)`` if it can't be
+    satisfied, or ``None`` to serve the whole blob (no or unsupported range).
+    """
+    if not value:
+        return None
+    match = _RANGE.match(value.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return (-1, -1)
+        return (max(size - length, 0), size - 1)
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return (-1, -1)
+    return (start, end)
+
+
+async def _iter_blob(blob: Blob, f, start: int, stop: int) -> AsyncIterator[bytes]:
+    if f is None:
+        view = memoryview(blob.data)
+        for offset in range(start, stop, READ_CHUNK):
+            yield bytes(view[offset : min(offset + READ_CHUNK, stop)])
+        return
+
+    async with f:
+        await f.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = await f.read(min(READ_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
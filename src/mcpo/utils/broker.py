@@ -0,0 +1,515 @@
+import asyncio
+import json
+import logging
+import struct
+from contextlib import nullcontext
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from fastapi import FastAPI, HTTPException
+from mcp import types
+from mcp.shared.exceptions import McpError
+
+from mcpo.utils.health import server_health
+from mcpo.utils.limits import Rejected
+
+logger = logging.getLogger(__name__)
+
+# Length of the JSON envelope, then of the opaque payload that follows it
+_HEADER = struct.Struct(">II")
+
+# Seconds between the health snapshots the broker pushes to every worker
+HEALTH_INTERVAL = 2.0
+
+_EMPTY_STATS = {
+    "size": 0,
+    "available": 0,
+    "in_flight": 0,
+    "restarts": 0,
+    "circuit": "closed",
+    "latency": None,
+}
+
+
+def _encode(message: Dict[str, Any], payload: bytes = b"") -> bytes:
+    body = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode()
+    return _HEADER.pack(len(body), len(payload)) + body + payload
+
+
+async def _read(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    The next message and its payload, or ``None`` once the other side has gone
+    away. Only the small envelope is decoded here; the payload is left as is.
+    """
+    try:
+        length, payload_length = _HEADER.unpack(
+            await reader.readexactly(_HEADER.size)
+        )
+        frame = await reader.readexactly(length + payload_length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    return json.loads(frame[:length]), frame[length:]
+
+
+def _dump(model) -> Dict[str, Any]:
+    return model.model_dump(mode="json", by_alias=True, exclude_none=True)
+
+
+def _dump_json(model) -> bytes:
+    # Serialized by pydantic-core in one pass, and never decoded by the broker
+    return model.model_dump_json(by_alias=True, exclude_none=True).encode()
+
+
+def _error(e: BaseException) -> Dict[str, Any]:
+    if isinstance(e, HTTPException):
+        http = {
+            "status": e.status_code,
+            "detail": e.detail,
+            "headers": dict(e.headers or {}),
+        }
+        if isinstance(e, Rejected):
+            # So the worker counts it like a local rejection
+            http["reason"] = e.reason
+        return {"http": http}
+    if isinstance(e, McpError):
+        return {"mcp": _dump(e.error)}
+    return {"message": str(e)}
+
+
+def _raise(error: Dict[str, Any]):
+    if "http" in error:
+        http = error["http"]
+        if "reason" in http:
+            e = Rejected(http["status"], http["reason"], http["detail"])
+            e.headers = http.get("headers") or None
+            raise e
+        raise HTTPException(
+            status_code=http["status"],
+            detail=http["detail"],
+            headers=http.get("headers") or None,
+        )
+    if "mcp" in error:
+        raise McpError(types.ErrorData.model_validate(error["mcp"]))
+    raise RuntimeError(error.get("message", "MCP broker error"))
+
+
+class _Connection:
+    """One worker process connected to the broker."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        # Request id -> task serving it, so the worker can cancel it
+        self.tasks: Dict[int, asyncio.Task] = {}
+
+    def send(self, message: Dict[str, Any], payload: bytes = b""):
+        # Buffered by the transport; callable from sync notification handlers
+        if not self.writer.is_closing():
+            self.writer.write(_encode(message, payload))
+
+
+class Broker:
+    """
+    Owns every MCP server's session pool for a set of HTTP worker processes,
+    which call it over a Unix socket instead of each starting its own copy of
+    the servers.
+
+    Requests are multiplexed by id on one connection per worker and served
+    concurrently; a worker can cancel one, which cancels the MCP call (and
+    sends ``notifications/cancelled``) like an HTTP disconnect would. Server
+    notifications are fanned out to every worker, progress notifications only
+    to the worker that asked for them, and each server's health is pushed
+    every ``health_interval`` seconds for the workers' health endpoints.
+
+    Results travel as an opaque payload after a small JSON envelope: the
+    broker serializes each MCP result once, in pydantic-core, and only the
+    worker that asked for it parses it, straight into the result model.
+    """
+
+    def __init__(
+        self,
+        server_apps: Dict[str, FastAPI],
+        path: str,
+        health_interval: float = HEALTH_INTERVAL,
+    ):
+        self.server_apps = server_apps
+        self.path = path
+        self.health_interval = health_interval
+        self._connections: Set[_Connection] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+        for name, app in server_apps.items():
+            # Picked up by the lifespan when it creates the server's router
+            app.state.forward_notifications = self._forwarder(name)
+
+    def _forwarder(self, name: str):
+        async def forward(notification):
+            self.broadcast({"server": name, "notification": _dump(notification)})
+
+        return forward
+
+    def broadcast(self, message: Dict[str, Any]):
+        for connection in list(self._connections):
+            connection.send(message)
+
+    async def start(self):
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+        self._health_task = asyncio.ensure_future(self._push_health())
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+        if self._server is not None:
+            self._server.close()
+        for connection in list(self._connections):
+            for task in list(connection.tasks.values()):
+                task.cancel()
+            connection.writer.close()
+
+    def health(self) -> Dict[str, Any]:
+        snapshot = {}
+        for name, app in self.server_apps.items():
+            pool = getattr(app.state, "session", None)
+            runner = getattr(app.state, "runner", None)
+            running = runner is None or runner.running
+            snapshot[name] = {
+                "health": server_health(app),
+                "stats": (
+                    pool.stats()
+                    if running and pool is not None and hasattr(pool, "stats")
+                    else None
+                ),
+            }
+        return snapshot
+
+    async def _push_health(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            if self._connections:
+                self.broadcast({"health": self.health()})
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = _Connection(writer)
+        self._connections.add(connection)
+        connection.send({"health": self.health()})
+        try:
+            while True:
+                frame = await _read(reader)
+                if frame is None:
+                    break
+                message, _ = frame
+                if "cancel" in message:
+                    task = connection.tasks.get(message["cancel"])
+                    if task is not None:
+                        task.cancel()
+                    continue
+                request_id = message["id"]
+                task = asyncio.ensure_future(self._respond(connection, message))
+                connection.tasks[request_id] = task
+                task.add_done_callback(
+                    lambda _, request_id=request_id: connection.tasks.pop(
+                        request_id, None
+                    )
+                )
+        finally:
+            self._connections.discard(connection)
+            # The worker is gone; nobody is waiting for these
+            for task in list(connection.tasks.values()):
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, connection: _Connection, message: Dict[str, Any]):
+        request_id = message["id"]
+        try:
+            payload = await self._call(
+                connection,
+                message["server"],
+                message["method"],
+                message.get("params") or {},
+            )
+            connection.send({"id": request_id}, payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            connection.send({"id": request_id, "error": _error(e)})
+        try:
+            await connection.writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _call(
+        self, connection: _Connection, server: str, method: str, params: Dict[str, Any]
+    ) -> bytes:
+        """The MCP result as JSON, passed on to the worker without a JSON envelope."""
+        app = self.server_apps.get(server)
+        if app is None:
+            raise HTTPException(status_code=404, detail=f"Unknown MCP server '{server}'")
+        runner = getattr(app.state, "runner", None)
+        if runner is not None and not runner.running and not await runner.start():
+            retry_after = runner.retry_after
+            raise HTTPException(
+                status_code=503,
+                detail=f"MCP server '{server}' is unavailable: {runner.error}",
+                headers={"Retry-After": str(retry_after)} if retry_after else None,
+            )
+        pool = app.state.session
+
+        if method == "initialize":
+            return _dump_json(await pool.initialize())
+        if method == "list_tools":
+            return _dump_json(await pool.list_tools())
+        if method == "list_resources":
+            return _dump_json(await pool.list_resources())
+        if method == "read_resource":
+            # Cached here, once for every worker, and invalidated by the broker's
+            # own subscriptions
+            cache = getattr(app.state, "resource_cache", None)
+            if cache is not None:
+                return _dump_json(await cache.read(pool, params["uri"]))
+            return _dump_json(await pool.read_resource(params["uri"]))
+        if method == "call_tool":
+            token = params.get("progress_token")
+            timeout = params.get("read_timeout_seconds")
+            progress = nullcontext()
+            if token is not None:
+                progress = app.state.notifications.progress(
+                    token,
+                    lambda p: connection.send({"server": server, "progress": _dump(p)}),
+                )
+            with progress:
+                return _dump_json(
+                    await pool.call_tool(
+                        params["name"],
+                        arguments=params.get("arguments"),
+                        read_timeout_seconds=(
+                            timedelta(seconds=timeout) if timeout is not None else None
+                        ),
+                        progress_token=token,
+                    )
+                )
+        raise ValueError(f"Unknown broker method '{method}'")
+
+
+class BrokerClient:
+    """
+    A worker's connection to the ``Broker``, shared by every server's
+    ``BrokerSession``. Connects on first use; ``on_close`` is called if the
+    broker goes away, since the worker can't serve anything without it.
+    """
+
+    def __init__(self, path: str, on_close: Optional[Callable[[], None]] = None):
+        self.path = path
+        self.on_close = on_close
+        self.health: Dict[str, Dict[str, Any]] = {}
+        self._routers: Dict[str, Any] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    def session(self, name: str, notifications) -> "BrokerSession":
+        """Pool-like session for server ``name``, notifying ``notifications``."""
+        self._routers[name] = notifications
+        return BrokerSession(self, name)
+
+    async def _connect(self):
+        async with self._lock:
+            if self._writer is not None:
+                return
+            if self._closed:
+                raise HTTPException(status_code=503, detail="MCP broker is not available")
+            reader, self._writer = await asyncio.open_unix_connection(self.path)
+            self._reader_task = asyncio.ensure_future(self._read_loop(reader))
+
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                frame = await _read(reader)
+                if frame is None:
+                    break
+                try:
+                    await self._dispatch(*frame)
+                except Exception as e:
+                    logger.error(f"Bad message from the MCP broker: {e}")
+        finally:
+            self._closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        HTTPException(status_code=503, detail="MCP broker went away")
+                    )
+            if self._writer is not None:
+                self._writer.close()
+            logger.error("Lost the connection to the MCP broker")
+            if self.on_close is not None:
+                self.on_close()
+
+    async def _dispatch(self, message: Dict[str, Any], payload: bytes):
+        if "id" in message:
+            future = self._pending.get(message["id"])
+            if future is None or future.done():
+                return
+            if "error" in message:
+                try:
+                    _raise(message["error"])
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future.set_result(payload)
+        elif "health" in message:
+            self.health = message["health"]
+        elif "progress" in message:
+            router = self._routers.get(message["server"])
+            if router is not None:
+                await router(
+                    types.ServerNotification(
+                        types.ProgressNotification(
+                            method="notifications/progress",
+                            params=types.ProgressNotificationParams.model_validate(
+                                message["progress"]
+                            ),
+                        )
+                    )
+                )
+        elif "notification" in message:
+            router = self._routers.get(message["server"])
+            if router is not None:
+                await router(types.ServerNotification.model_validate(message["notification"]))
+
+    async def request(self, server: str, method: str, params: Dict[str, Any]) -> bytes:
+        """Call ``method`` on the broker's pool for ``server``; returns its JSON result."""
+        await self._connect()
+        if self._closed:
+            raise HTTPException(status_code=503, detail="MCP broker went away")
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(
+                _encode(
+                    {"id": request_id, "server": server, "method": method, "params": params}
+                )
+            )
+            await self._writer.drain()
+            return await future
+        except asyncio.CancelledError:
+            if not self._closed and not self._writer.is_closing():
+                self._writer.write(_encode({"cancel": request_id}))
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self):
+        self._closed = True
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+
+class BrokerSession:
+    """
+    Stand-in for a server's ``SessionPool`` in a worker process: the same
+    calls, answered by the broker's pool. Resources are cached by the broker,
+    so ``subscribed`` is always false here.
+    """
+
+    def __init__(self, client: BrokerClient, name: str):
+        self.client = client
+        self.name = name
+
+    async def _request(self, method: str, **params) -> bytes:
+        return await self.client.request(self.name, method, params)
+
+    async def initialize(self) -> types.InitializeResult:
+        return types.InitializeResult.model_validate_json(
+            await self._request("initialize")
+        )
+
+    async def list_tools(self) -> types.ListToolsResult:
+        return types.ListToolsResult.model_validate_json(
+            await self._request("list_tools")
+        )
+
+    async def list_resources(self) -> types.ListResourcesResult:
+        return types.ListResourcesResult.model_validate_json(
+            await self._request("list_resources")
+        )
+
+    def subscribed(self, uri: str) -> bool:
+        return False
+
+    async def unsubscribe(self, uri: str):
+        pass
+
+    async def read_resource(
+        self, uri: str, subscribe: bool = False
+    ) -> types.ReadResourceResult:
+        return types.ReadResourceResult.model_validate_json(
+            await self._request("read_resource", uri=uri)
+        )
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        read_timeout_seconds: timedelta | None = None,
+        progress_token: str | int | None = None,
+    ) -> types.CallToolResult:
+        return types.CallToolResult.model_validate_json(
+            await self._request(
+                "call_tool",
+                name=name,
+                arguments=arguments,
+                read_timeout_seconds=(
+                    read_timeout_seconds.total_seconds()
+                    if read_timeout_seconds is not None
+                    else None
+                ),
+                progress_token=progress_token,
+            )
+        )
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return self.client.health.get(self.name) or {}
+
+    def health(self) -> Dict[str, Any]:
+        """The server's health as last reported by the broker."""
+        return self._snapshot().get("health") or {"status": "starting"}
+
+    def stats(self) -> Dict[str, Any]:
+        return self._snapshot().get("stats") or dict(_EMPTY_STATS)
+
+
+async def wait_for_workers(processes, stop: asyncio.Event, spawn, poll: float = 1.0):
+    """
+    Keep ``processes`` (``multiprocessing`` workers) alive until ``stop`` is
+    set, replacing any that exit; then terminate and reap them all.
+    """
+    try:
+        while not stop.is_set():
+            for index, process in enumerate(processes):
+                if not process.is_alive():
+                    logger.warning(
+                        f"Worker {process.pid} exited with code {process.exitcode}, "
+                        "starting a new one"
+                    )
+                    processes[index] = spawn()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        loop = asyncio.get_running_loop()
+        for process in processes:
+            await loop.run_in_executor(None, process.join, 30)
+            if process.is_alive():
+                process.kill()
@@ -0,0 +1,135 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from mcpo.utils.fastjson import RawJSON
+
+MISSING = object()
+
+
+def canonical_key(tool_name: str, args: Dict[str, Any]) -> str:
+    """Stable key for a tool call, independent of argument order."""
+    return (
+        f"{tool_name}:"
+        f"{json.dumps(args, sort_keys=True, separators=(',', ':'), default=str)}"
+    )
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of processed tool responses for a single MCP server.
+
+    Only tools listed in ``tools`` are cached, since the proxy cannot know which
+    tools are idempotent. The cache is bounded both by entry count and by the
+    approximate JSON size of the stored responses.
+    """
+
+    def __init__(
+        self,
+        tools: Dict[str, Optional[float]],
+        ttl: float = 300,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+    ):
+        self.tools = tools
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # key -> (expires_at, size, value)
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ResponseCache":
+        """
+        Build a cache from a server's ``cache`` config, e.g.
+        ``{"ttl": 300, "maxEntries": 1024, "maxBytes": 16777216,
+        "tools": ["get_weather", "get_forecast"]}``.
+        ``tools`` may also map each name to options, e.g.
+        ``{"get_forecast": {"ttl": 600}}``.
+        """
+        tools_config = config.get("tools", [])
+        tools: Dict[str, Optional[float]] = {}
+        if isinstance(tools_config, dict):
+            for name, options in tools_config.items():
+                tools[name] = (options or {}).get("ttl")
+        else:
+            for name in tools_config:
+                tools[name] = None
+
+        return cls(
+            tools,
+            ttl=config.get("ttl", 300),
+            max_entries=config.get("maxEntries", 1024),
+            max_bytes=config.get("maxBytes", 16 * 1024 * 1024),
+        )
+
+    def enabled_for(self, tool_name: str) -> bool:
+        return tool_name in self.tools
+
+    def get(self, tool_name: str, args: Dict[str, Any]) -> Any:
+        """Return the cached response, or ``MISSING``."""
+        key = canonical_key(tool_name, args)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, size, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits[tool_name] = self.hits.get(tool_name, 0) + 1
+                return value
+            self._remove(key)
+        self.misses[tool_name] = self.misses.get(tool_name, 0) + 1
+        return MISSING
+
+    def set(self, tool_name: str, args: Dict[str, Any], value: Any):
+        try:
+            if isinstance(value, RawJSON):
+                size = len(value)
+            else:
+                size = len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return
+        if size > self.max_bytes:
+            return
+
+        key = canonical_key(tool_name, args)
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.tools.get(tool_name) or self.ttl
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, tool_name: str):
+        """Drop every cached response of one tool."""
+        prefix = f"{tool_name}:"
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "evictions": self.evictions,
+        }
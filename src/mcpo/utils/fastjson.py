@@ -0,0 +1,135 @@
+import json
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+_WHITESPACE = " \t\r\n"
+
+_enabled = False
+
+
+def available() -> bool:
+    return orjson is not None
+
+
+def enable() -> bool:
+    """
+    Switch the process to orjson decoding/encoding and raw JSON passthrough.
+    Returns False (and leaves stdlib json in place) if orjson is not installed.
+    """
+    global _enabled
+    _enabled = orjson is not None
+    return _enabled
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+class RawJSON:
+    """
+    A tool's JSON text, kept undecoded so it can be sent to the client as is.
+    Call ``decode()`` where the value itself is needed.
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def decode(self) -> Any:
+        return loads(self.text)
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __repr__(self) -> str:
+        return f"RawJSON({self.text[:40]!r}{'...' if len(self.text) > 40 else ''})"
+
+
+def looks_like_json_object(text: str) -> bool:
+    """
+    Cheap check on the first and last non-blank characters. Only objects are
+    passed through: plain text such as ``[INFO] ... [done]`` would pass the same
+    check for arrays.
+    """
+    start, end = 0, len(text) - 1
+    while start <= end and text[start] in _WHITESPACE:
+        start += 1
+    while end > start and text[end] in _WHITESPACE:
+        end -= 1
+    return start < end and text[start] == "{" and text[end] == "}"
+
+
+def raw_json_object(text: str) -> Optional[RawJSON]:
+    """
+    ``text`` kept as ``RawJSON`` if it is a valid JSON object, else ``None``.
+    Text that merely looks like one, e.g. a Python dict repr, must not reach
+    the client as ``application/json``.
+    """
+    if not _enabled or not looks_like_json_object(text):
+        return None
+    try:
+        orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return None
+    return RawJSON(text)
+
+
+def loads(text: str) -> Any:
+    """Decode JSON; raises ``json.JSONDecodeError`` like the stdlib."""
+    if _enabled:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity are accepted by json but not orjson; plain text
+            # fails on the first character in both, so this is cheap
+            pass
+    return json.loads(text)
+
+
+def materialize(value: Any) -> Any:
+    """Decode a ``RawJSON`` result; anything else is returned unchanged."""
+    if isinstance(value, RawJSON):
+        return value.decode()
+    return value
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a tool result as compact UTF-8 JSON."""
+    if isinstance(value, RawJSON):
+        return value.text.encode()
+    if _enabled:
+        try:
+            return orjson.dumps(
+                value, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits
+            pass
+    return json.dumps(
+        jsonable_encoder(value), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def json_response(value: Any) -> Response:
+    """
+    A ready-made response for ``value``, skipping FastAPI's ``jsonable_encoder``
+    pass. Responses (e.g. the 499 from ``cancel_on_disconnect``) pass through.
+    """
+    if isinstance(value, Response):
+        return value
+    return Response(content=dumps(value), media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,52 @@
+from typing import Any, Dict
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+# Statuses a server can take traffic in
+READY = ("ok", "degraded", "idle")
+
+
+def server_health(app: FastAPI) -> Dict[str, Any]:
+    """
+    Health of the server behind ``app``: its runner's status while it is not
+    running, then its session pool's, as measured by the periodic pings.
+    A lazy server that hasn't been started yet is ``idle``, which counts as
+    ready since it starts on its first request.
+    """
+    state = app.state
+    runner = getattr(state, "runner", None)
+    if runner is not None and not runner.running:
+        if runner.status == "stopped" and runner.lazy:
+            return {"status": "idle"}
+        health = {"status": runner.status}
+        if runner.error:
+            health["error"] = runner.error
+        if runner.retry_after:
+            health["retry_after"] = runner.retry_after
+        return health
+
+    pool = getattr(state, "session", None)
+    if pool is None:
+        return {"status": "starting"}
+    if not hasattr(pool, "health"):
+        return {"status": "ok"}
+    return pool.health()
+
+
+def health_response(health: Dict[str, Any]) -> JSONResponse:
+    """``200`` if the server can take traffic, otherwise ``503``."""
+    ready = health["status"] in READY
+    retry_after = health.get("retry_after")
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content=health,
+        headers={"Retry-After": str(retry_after)} if retry_after and not ready else None,
+    )
+
+
+def readiness(apps: Dict[str, FastAPI]) -> Dict[str, Any]:
+    """``ready`` once every server can take traffic, with each one's health."""
+    servers = {name: server_health(app) for name, app in apps.items()}
+    ready = all(health["status"] in READY for health in servers.values())
+    return {"status": "ready" if ready else "unavailable", "servers": servers}
@@ -0,0 +1,216 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+
+class Rejected(HTTPException):
+    """
+    A call turned away before it reached the MCP server, e.g. by a full queue
+    or an open circuit breaker. ``reason`` is what it is counted as in
+    ``mcpo_tool_errors``.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        reason: str,
+        detail: Any,
+        retry_after: Optional[int] = None,
+    ):
+        super().__init__(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)} if retry_after else None,
+        )
+        self.reason = reason
+
+
+class ConcurrencyLimiter:
+    """
+    Bounds the number of concurrent calls, with a bounded FIFO wait queue.
+
+    A call that finds every slot busy waits in the queue for up to
+    ``queue_timeout`` seconds and fails with ``503`` if no slot frees up in
+    time. A call that finds the queue full fails immediately with ``429``.
+    Both responses carry a ``Retry-After`` estimated from recent call times.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int = 0,
+        queue_timeout: float = 30,
+        name: str = "",
+    ):
+        if max_concurrent < 1:
+            raise ValueError("maxConcurrent must be at least 1")
+        if max_queue < 0:
+            raise ValueError("maxQueue must not be negative")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.name = name or "this server"
+
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # Moving average of how long a call holds its slot, for Retry-After
+        self._hold_avg: Optional[float] = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        hold = self._hold_avg if self._hold_avg is not None else 1.0
+        rounds = (self.queued + 1) / self.max_concurrent
+        return max(1, math.ceil(hold * rounds))
+
+    def _reject(self, status_code: int, reason: str, message: str):
+        raise Rejected(
+            status_code, reason, {"message": message}, self.retry_after()
+        )
+
+    async def acquire(self):
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            self._reject(429, "queue_full", f"Too many concurrent calls to {self.name}")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.monotonic()
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if waiter.done():
+                # The slot was handed over just as we were cancelled
+                self.release()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            waited = time.monotonic() - started
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+        if waiter.cancelled():
+            self.timed_out += 1
+            self._reject(
+                503,
+                "queue_timeout",
+                f"Timed out after {self.queue_timeout}s waiting for {self.name}",
+            )
+        self.admitted += 1
+
+    def release(self):
+        # Hand the slot straight to the next waiter, so newcomers can't overtake it
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            held = time.monotonic() - started
+            self._hold_avg = (
+                held if self._hold_avg is None else 0.8 * self._hold_avg + 0.2 * held
+            )
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "maxConcurrent": self.max_concurrent,
+            "maxQueue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timedOut": self.timed_out,
+            "waitSecondsAvg": (
+                self.wait_seconds_total / (self.admitted + self.timed_out)
+                if self.admitted + self.timed_out
+                else 0.0
+            ),
+            "waitSecondsMax": self.wait_seconds_max,
+        }
+
+
+class ServerLimits:
+    """Per-server and per-tool ``ConcurrencyLimiter``s of one MCP server."""
+
+    def __init__(
+        self,
+        server: Optional[ConcurrencyLimiter] = None,
+        tools: Optional[Dict[str, ConcurrencyLimiter]] = None,
+    ):
+        self.server = server
+        self.tools = tools or {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], name: str = "") -> "ServerLimits":
+        """
+        Build from a server's ``limits`` config, e.g.
+        ``{"maxConcurrent": 8, "maxQueue": 16, "queueTimeout": 30,
+        "tools": {"generate_flux_image": {"maxConcurrent": 2}}}``.
+        Tools inherit ``maxQueue`` and ``queueTimeout`` from the server.
+        """
+        max_queue = config.get("maxQueue", 32)
+        queue_timeout = config.get("queueTimeout", 30)
+
+        server = None
+        if config.get("maxConcurrent"):
+            server = ConcurrencyLimiter(
+                config["maxConcurrent"], max_queue, queue_timeout, name=name
+            )
+
+        tools = {}
+        for tool_name, options in config.get("tools", {}).items():
+            tools[tool_name] = ConcurrencyLimiter(
+                options["maxConcurrent"],
+                options.get("maxQueue", max_queue),
+                options.get("queueTimeout", queue_timeout),
+                name=f"{name}/{tool_name}" if name else tool_name,
+            )
+        return cls(server, tools)
+
+    @asynccontextmanager
+    async def slot(self, tool_name: str):
+        """Hold a slot of the tool's limiter, then of the server's, while active."""
+        tool = self.tools.get(tool_name)
+        async with tool.slot() if tool is not None else _no_limit():
+            async with self.server.slot() if self.server is not None else _no_limit():
+                yield
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "server": self.server.stats() if self.server is not None else None,
+            "tools": {name: limiter.stats() for name, limiter in self.tools.items()},
+        }
+
+
+@asynccontextmanager
+async def _no_limit():
+    yield
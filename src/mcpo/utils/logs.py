@@ -0,0 +1,219 @@
+import contextvars
+import copy
+import json
+import logging
+import queue
+import random
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+# Id of the HTTP request being served, stamped on every record logged for it
+request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "request_id", default=None
+)
+
+# Longest string (or number of items) a logged argument keeps
+MAX_VALUE_LENGTH = 200
+MAX_ITEMS = 20
+
+# Left out of JSON lines; uvicorn adds color_message for its own console output
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "request_id",
+    "color_message",
+}
+
+
+def truncate_values(value: Any, limit: int = MAX_VALUE_LENGTH, depth: int = 4) -> Any:
+    """A copy of ``value`` with long strings, bytes and collections cut short."""
+    if isinstance(value, str):
+        if len(value) > limit:
+            return f"{value[:limit]}…(+{len(value) - limit} chars)"
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, dict):
+        if depth <= 0:
+            return f"<dict of {len(value)}>"
+        items = {
+            key: truncate_values(item, limit, depth - 1)
+            for key, item in list(value.items())[:MAX_ITEMS]
+        }
+        if len(value) > MAX_ITEMS:
+            items["…"] = f"+{len(value) - MAX_ITEMS} more"
+        return items
+    if isinstance(value, (list, tuple, set)):
+        if depth <= 0:
+            return f"<{type(value).__name__} of {len(value)}>"
+        items = [
+            truncate_values(item, limit, depth - 1) for item in list(value)[:MAX_ITEMS]
+        ]
+        if len(value) > MAX_ITEMS:
+            items.append(f"…+{len(value) - MAX_ITEMS} more")
+        return items
+    return value
+
+
+class Truncated:
+    """
+    Log argument shortened with ``truncate_values`` only when the record is
+    formatted, i.e. on the listener thread, and not at all if it's dropped.
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int = MAX_VALUE_LENGTH):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return str(truncate_values(self.value, self.limit))
+
+    __repr__ = __str__
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the id of the request they were logged for."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of the records of each level, e.g. ``{"INFO": 0.1}``;
+    levels not listed are all kept.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = {
+            logging.getLevelName(level.upper()): rate for level, rate in rates.items()
+        }
+        self._random = random.Random()
+
+    @classmethod
+    def parse(cls, spec: str) -> "SamplingFilter":
+        """From ``"info=0.1,debug=0.01"``."""
+        rates = {}
+        for part in spec.split(","):
+            if not part.strip():
+                continue
+            level, _, rate = part.partition("=")
+            rates[level.strip()] = float(rate)
+        return cls(rates)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno)
+        return rate is None or self._random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with the request id and any ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        rid = getattr(record, "request_id", None)
+        return f"{line} [{rid}]" if rid else line
+
+
+class _QueueHandler(QueueHandler):
+    # The queue never leaves the process, so records needn't be formatted and
+    # flattened here, on the event loop; the listener thread does it instead
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return copy.copy(record)
+
+
+def setup_logging(
+    level: str = "INFO", fmt: str = "text", sample: Optional[str] = None
+) -> QueueListener:
+    """
+    Route every log record (uvicorn's included) through a queue, so
+    formatting and writing to stderr happen on a background thread. Returns
+    the started listener; stop it on shutdown to flush what's left.
+    """
+    handler = logging.StreamHandler()
+    if fmt == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(TextFormatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    queue_handler = _QueueHandler(queue.SimpleQueue())
+    if sample:
+        queue_handler.addFilter(SamplingFilter.parse(sample))
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logger = logging.getLogger(name)
+        logger.handlers.clear()
+        logger.propagate = True
+
+    listener = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware giving each request an id, from ``X-Request-ID``
+    when the client sent one, for the logs and the response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                rid = value.decode("latin-1")[:64]
+                break
+        rid = rid or uuid.uuid4().hex[:16]
+        token = request_id.set(rid)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"x-request-id", rid.encode("latin-1")),
+                    ],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
@@ -1,7 +1,16 @@
+import asyncio
+import hashlib
 import json
-from typing import Any, Dict, ForwardRef, List, Optional, Type, Union
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Awaitable, Dict, ForwardRef, List, Optional, Type, Union
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
 
 from mcp import ClientSession, types
 from mcp.types import (
@@ -15,27 +24,100 @@ from mcp.types import (
 
 from mcp.shared.exceptions import McpError
 
-from pydantic import Field, create_model
+from pydantic import BaseModel, Field, ValidationError, create_model
 from pydantic.fields import FieldInfo
 
+from mcpo.utils import fastjson
+from mcpo.utils.blobs import BlobStore
+from mcpo.utils.cache import MISSING, ResponseCache, canonical_key
+from mcpo.utils.limits import Rejected, ServerLimits
+from mcpo.utils.logs import Truncated
+from mcpo.utils.metrics import (
+    MCP_ERROR_CLASSES,
+    REQUEST_START,
+    ServerMetrics,
+    ToolMetrics,
+)
+from mcpo.utils.notifications import NotificationRouter
+from mcpo.utils.pool import CONNECTION_CLOSED
+from mcpo.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
 MCP_ERROR_TO_HTTP_STATUS = {
     PARSE_ERROR: 400,
     INVALID_REQUEST: 400,
     METHOD_NOT_FOUND: 404,
     INVALID_PARAMS: 422,
     INTERNAL_ERROR: 500,
+    # The server went away mid-call; the pool is restarting it
+    CONNECTION_CLOSED: 503,
 }
 
+# Non-standard (nginx) status for requests the client abandoned
+CLIENT_CLOSED_REQUEST = 499
+
+# Compiled models kept by _MODEL_CACHE; the least recently used go first
+MODEL_CACHE_SIZE = 1024
+
+
+class _ModelCache(OrderedDict):
+    """``OrderedDict`` that keeps only the ``max_size`` most recently used items."""
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+# "model name:schema hash" -> compiled model, shared by every server in the
+# process so a tool's schemas compile only once across servers and reconnects
+_MODEL_CACHE: Dict[str, Type[BaseModel]] = _ModelCache(MODEL_CACHE_SIZE)
+
+SSE_KEEPALIVE_INTERVAL = 15
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def process_tool_response(
+    result: CallToolResult, blob_urls: Optional[Dict[int, str]] = None
+) -> list:
+    """
+    Universal response processor for all tool endpoints. Binary items listed
+    in ``blob_urls`` (see ``BlobStore.offload``) become their URL instead of
+    an inline data URI.
+    """
+    if (
+        fastjson.enabled()
+        and len(result.content) == 1
+        and isinstance(result.content[0], types.TextContent)
+    ):
+        # Sent to the client untouched; decoded only where a value is needed
+        raw = fastjson.raw_json_object(result.content[0].text)
+        if raw is not None:
+            return [raw]
 
-def process_tool_response(result: CallToolResult) -> list:
-    """Universal response processor for all tool endpoints"""
     response = []
-    for content in result.content:
-        if isinstance(content, types.TextContent):
+    for index, content in enumerate(result.content):
+        if blob_urls and index in blob_urls:
+            response.append(blob_urls[index])
+        elif isinstance(content, types.TextContent):
             text = content.text
             if isinstance(text, str):
                 try:
-                    text = json.loads(text)
+                    text = fastjson.loads(text)
                 except json.JSONDecodeError:
                     pass
             response.append(text)
@@ -43,11 +125,26 @@ def process_tool_response(result: CallToolResult) -> list:
             image_data = f"data:{content.mimeType};base64,{content.data}"
             response.append(image_data)
         elif isinstance(content, types.EmbeddedResource):
-            # TODO: Handle embedded resources
-            response.append("Embedded resource not supported yet.")
+            resource = content.resource
+            if isinstance(resource, types.TextResourceContents):
+                response.append(resource.text)
+            else:
+                mime_type = resource.mimeType or "application/octet-stream"
+                response.append(f"data:{mime_type};base64,{resource.blob}")
     return response
 
 
+def schema_hash(schema: Any, schema_defs: Optional[Dict] = None) -> str:
+    """
+    Canonical hash of a JSON schema. ``schema_defs`` only count when the schema
+    refers to them, so unrelated ``$defs`` don't split the cache.
+    """
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    if schema_defs and '"$ref"' in canonical:
+        canonical += json.dumps(schema_defs, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
 def _process_schema_property(
     _model_cache: Dict[str, Type],
     prop_schema: Dict[str, Any],
@@ -116,8 +213,11 @@ def _process_schema_property(
             "__", "_"
         ).rstrip("_")
 
-        if nested_model_name in _model_cache:
-            return _model_cache[nested_model_name], pydantic_field
+        # Keyed by name too: a model shared across tools would carry the first
+        # tool's name into every other tool's OpenAPI components
+        cache_key = f"{nested_model_name}:{schema_hash(prop_schema, schema_defs)}"
+        if cache_key in _model_cache:
+            return _model_cache[cache_key], pydantic_field
 
         for name, schema in nested_properties.items():
             is_nested_required = name in nested_required
@@ -136,7 +236,7 @@ def _process_schema_property(
             return Dict[str, Any], pydantic_field
 
         NestedModel = create_model(nested_model_name, **nested_fields)
-        _model_cache[nested_model_name] = NestedModel
+        _model_cache[cache_key] = NestedModel
 
         return NestedModel, pydantic_field
 
@@ -175,12 +275,10 @@ def _process_schema_property(
 def get_model_fields(form_model_name, properties, required_fields, schema_defs=None):
     model_fields = {}
 
-    _model_cache: Dict[str, Type] = {}
-
     for param_name, param_schema in properties.items():
         is_required = param_name in required_fields
         python_type_hint, pydantic_field_info = _process_schema_property(
-            _model_cache,
+            _MODEL_CACHE,
             param_schema,
             form_model_name,
             param_name,
@@ -192,67 +290,375 @@ def get_model_fields(form_model_name, properties, required_fields, schema_defs=N
     return model_fields
 
 
+def get_model(model_name: str, schema: Dict[str, Any]) -> Optional[Type[BaseModel]]:
+    """
+    The model for a tool's input or output schema, compiled once per process
+    for each (name, schema); ``None`` if the schema has no properties.
+    """
+    properties = schema.get("properties", {})
+    if not properties:
+        return None
+
+    cache_key = f"{model_name}:{schema_hash(schema)}"
+    model = _MODEL_CACHE.get(cache_key)
+    if model is None:
+        model_fields = get_model_fields(
+            model_name,
+            properties,
+            schema.get("required", []),
+            schema.get("$defs", {}),
+        )
+        model = create_model(model_name, **model_fields)
+        _MODEL_CACHE[cache_key] = model
+    return model
+
+
+def warm_model_cache(tools: List[Dict[str, Any]]):
+    """
+    Compile the models for a tool list ahead of time (e.g. the one stored from
+    the previous run, while the server is still starting). Best effort.
+    """
+    for tool in tools:
+        try:
+            get_model(f"{tool['name']}_form_model", tool.get("inputSchema") or {})
+            if tool.get("outputSchema"):
+                get_model(f"{tool['name']}_response_model", tool["outputSchema"])
+        except Exception as e:
+            logger.warning(
+                "Could not precompile models for %s: %s", tool.get("name"), e
+            )
+
+
+async def execute_tool(
+    session,
+    endpoint_name: str,
+    args: Dict[str, Any],
+    cache: Optional[ResponseCache] = None,
+    singleflight: Optional[SingleFlight] = None,
+    limits: Optional[ServerLimits] = None,
+    metrics: Optional[ToolMetrics] = None,
+    blobs: Optional[BlobStore] = None,
+):
+    """Call a tool over MCP and return its processed response, or raise HTTPException."""
+    use_cache = cache is not None and cache.enabled_for(endpoint_name)
+    if use_cache:
+        cached = cache.get(endpoint_name, args)
+        if cached is not MISSING:
+            return cached
+
+    if singleflight is not None and singleflight.enabled_for(endpoint_name):
+        response_data = await singleflight.do(
+            canonical_key(endpoint_name, args),
+            lambda: _call_tool_limited(
+                session, endpoint_name, args, limits, metrics, blobs=blobs
+            ),
+        )
+    else:
+        response_data = await _call_tool_limited(
+            session, endpoint_name, args, limits, metrics, blobs=blobs
+        )
+
+    final_response = response_data[0] if len(response_data) == 1 else response_data
+    # Blob links would outlive their blobs in the cache and turn into 404s
+    if use_cache and not (blobs is not None and blobs.links_to(final_response)):
+        cache.set(endpoint_name, args, final_response)
+    return final_response
+
+
+async def _call_tool_limited(
+    session,
+    endpoint_name: str,
+    args: Dict[str, Any],
+    limits: Optional[ServerLimits] = None,
+    metrics: Optional[ToolMetrics] = None,
+    blobs: Optional[BlobStore] = None,
+    **kwargs,
+) -> list:
+    """``_call_tool`` holding the server's and tool's concurrency slots, if limited."""
+    try:
+        if limits is None:
+            return await _call_tool(
+                session, endpoint_name, args, metrics, blobs, **kwargs
+            )
+        async with limits.slot(endpoint_name):
+            return await _call_tool(
+                session, endpoint_name, args, metrics, blobs, **kwargs
+            )
+    except Rejected as e:
+        # Turned away by a limit or the pool's circuit breaker
+        if metrics is not None:
+            metrics.error(e.status_code, e.reason)
+        raise
+
+
+async def _call_tool(
+    session,
+    endpoint_name: str,
+    args: Dict[str, Any],
+    metrics: Optional[ToolMetrics] = None,
+    blobs: Optional[BlobStore] = None,
+    **kwargs,
+) -> list:
+    try:
+        started = time.perf_counter()
+        if metrics is not None:
+            metrics.in_flight.inc()
+        try:
+            result = await session.call_tool(endpoint_name, arguments=args, **kwargs)
+        finally:
+            if metrics is not None:
+                metrics.in_flight.dec()
+        if metrics is not None:
+            metrics.round_trip.observe(time.perf_counter() - started)
+
+        if result.isError:
+            error_message = "Unknown tool execution error"
+            error_data = None  # Initialize error_data
+            if result.content:
+                if isinstance(result.content[0], types.TextContent):
+                    error_message = result.content[0].text
+            detail = {"message": error_message}
+            if error_data is not None:
+                detail["data"] = error_data
+            if metrics is not None:
+                metrics.error(500, "tool_error")
+            raise HTTPException(
+                status_code=500,
+                detail=detail,
+            )
+
+        started = time.perf_counter()
+        blob_urls = await blobs.offload(result.content) if blobs is not None else None
+        response_data = process_tool_response(result, blob_urls)
+        if metrics is not None:
+            metrics.processing.observe(time.perf_counter() - started)
+        return response_data
+
+    except HTTPException:
+        raise
+    except McpError as e:
+        logger.warning("MCP error calling %s: %s", endpoint_name, e.error)
+        status_code = MCP_ERROR_TO_HTTP_STATUS.get(e.error.code, 500)
+        if metrics is not None:
+            metrics.error(
+                status_code, MCP_ERROR_CLASSES.get(e.error.code, "mcp_error")
+            )
+        # Propagate the error received from MCP as an HTTP exception
+        raise HTTPException(
+            status_code=status_code,
+            detail=(
+                {"message": e.error.message, "data": e.error.data}
+                if e.error.data is not None
+                else {"message": e.error.message}
+            ),
+        )
+    except Exception as e:
+        logger.exception("Unexpected error calling %s: %s", endpoint_name, e)
+        if metrics is not None:
+            metrics.error(500, "unexpected")
+        raise HTTPException(
+            status_code=500,
+            detail={"message": "Unexpected error", "error": str(e)},
+        )
+
+
+def _observe_request(request: Request, metrics: ToolMetrics):
+    """Count a call and the time spent reading and validating its body."""
+    metrics.requests.inc()
+    started = request.scope.get(REQUEST_START)
+    if started is not None:
+        metrics.validation.observe(time.perf_counter() - started)
+
+
+async def _wait_for_disconnect(request: Request):
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(request: Request, coro: Awaitable[Any]):
+    """
+    Await ``coro``, cancelling it if the HTTP client disconnects first, so the
+    MCP call (and the server-side work, via notifications/cancelled) stops.
+    """
+    task = asyncio.ensure_future(coro)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait(
+            {task, watcher}, return_when=asyncio.FIRST_COMPLETED
+        )
+        if task in done:
+            return task.result()
+        logger.info("Client disconnected, cancelling %s", request.url.path)
+        task.cancel()
+        # Nobody will read this, but the handler still has to return something
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+
+
+def wants_stream(request: Request) -> bool:
+    """Streaming is opt-in via ``?stream=1`` or ``Accept: text/event-stream``."""
+    return request.query_params.get("stream", "").lower() in (
+        "1",
+        "true",
+    ) or "text/event-stream" in request.headers.get("accept", "")
+
+
+def _sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {fastjson.dumps(data).decode()}\n\n"
+
+
+async def stream_tool(
+    session,
+    endpoint_name: str,
+    args: Dict[str, Any],
+    notifications: Optional[NotificationRouter] = None,
+    limits: Optional[ServerLimits] = None,
+    metrics: Optional[ToolMetrics] = None,
+    blobs: Optional[BlobStore] = None,
+):
+    """
+    Call a tool and yield Server-Sent Events while it runs: ``progress`` for each
+    MCP progress notification, then one ``content`` event per content item and
+    a final ``done``, or a single ``error``. Streaming calls bypass the response
+    cache and coalescing. Closing the stream cancels the call.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    token = uuid.uuid4().hex
+    kwargs = {}
+    progress = nullcontext()
+    if notifications is not None:
+        progress = notifications.progress(token, queue.put_nowait)
+        kwargs["progress_token"] = token
+
+    with progress:
+        call = asyncio.ensure_future(
+            _call_tool_limited(
+                session, endpoint_name, args, limits, metrics, blobs=blobs, **kwargs
+            )
+        )
+        try:
+            while not call.done() or not queue.empty():
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    {call, getter},
+                    timeout=SSE_KEEPALIVE_INTERVAL,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if getter in done:
+                    params = getter.result()
+                    yield _sse_event(
+                        "progress",
+                        params.model_dump(
+                            exclude={"meta", "progressToken"}, exclude_none=True
+                        ),
+                    )
+                    continue
+                getter.cancel()
+                if not done:
+                    # Keep proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+
+            try:
+                response_data = call.result()
+            except HTTPException as e:
+                yield _sse_event("error", {"status": e.status_code, "detail": e.detail})
+                return
+
+            for item in response_data:
+                yield _sse_event("content", fastjson.materialize(item))
+            yield _sse_event("done", {})
+        finally:
+            if not call.done():
+                call.cancel()
+
+
+def _tool_response(result: Any, has_response_model: bool):
+    """
+    In fast JSON mode, encode the result ourselves (or pass raw JSON through);
+    tools with an output schema still go through FastAPI's response model.
+    """
+    if fastjson.enabled() and not has_response_model:
+        return fastjson.json_response(result)
+    return fastjson.materialize(result)
+
+
 def get_tool_handler(
     session,
     endpoint_name,
-    form_model_fields,
+    form_model_fields=None,
     response_model_fields=None,
+    cache: Optional[ResponseCache] = None,
+    singleflight: Optional[SingleFlight] = None,
+    notifications: Optional[NotificationRouter] = None,
+    limits: Optional[ServerLimits] = None,
+    metrics: Optional[ServerMetrics] = None,
+    form_model: Optional[Type[BaseModel]] = None,
+    response_model: Optional[Type[BaseModel]] = None,
+    blobs: Optional[BlobStore] = None,
 ):
-    if form_model_fields:
-        FormModel = create_model(f"{endpoint_name}_form_model", **form_model_fields)
-        ResponseModel = (
-            create_model(f"{endpoint_name}_response_model", **response_model_fields)
-            if response_model_fields
-            else Any
+    """
+    Build the endpoint for a tool, from prebuilt ``form_model``/``response_model``
+    (see ``get_model``) or from field definitions (see ``get_model_fields``).
+    """
+    tool_metrics = metrics.tool(endpoint_name) if metrics is not None else None
+
+    if form_model is None and form_model_fields:
+        form_model = create_model(f"{endpoint_name}_form_model", **form_model_fields)
+    if response_model is None and response_model_fields:
+        response_model = create_model(
+            f"{endpoint_name}_response_model", **response_model_fields
         )
 
+    if form_model is not None:
+        FormModel = form_model
+        ResponseModel = response_model or Any
+        has_response_model = response_model is not None
+
         def make_endpoint_func(
             endpoint_name: str, FormModel, session: ClientSession
         ):  # Parameterized endpoint
-            async def tool(form_data: FormModel) -> ResponseModel:
+            async def tool(form_data: FormModel, request: Request) -> ResponseModel:
+                if tool_metrics is not None:
+                    _observe_request(request, tool_metrics)
                 args = form_data.model_dump(exclude_none=True)
-                print(f"Calling endpoint: {endpoint_name}, with args: {args}")
-                try:
-                    result = await session.call_tool(endpoint_name, arguments=args)
-
-                    if result.isError:
-                        error_message = "Unknown tool execution error"
-                        error_data = None  # Initialize error_data
-                        if result.content:
-                            if isinstance(result.content[0], types.TextContent):
-                                error_message = result.content[0].text
-                        detail = {"message": error_message}
-                        if error_data is not None:
-                            detail["data"] = error_data
-                        raise HTTPException(
-                            status_code=500,
-                            detail=detail,
-                        )
-
-                    response_data = process_tool_response(result)
-                    final_response = (
-                        response_data[0] if len(response_data) == 1 else response_data
-                    )
-                    return final_response
-
-                except McpError as e:
-                    print(f"MCP Error calling {endpoint_name}: {e.error}")
-                    status_code = MCP_ERROR_TO_HTTP_STATUS.get(e.error.code, 500)
-                    raise HTTPException(
-                        status_code=status_code,
-                        detail=(
-                            {"message": e.error.message, "data": e.error.data}
-                            if e.error.data is not None
-                            else {"message": e.error.message}
+                # Shortened and formatted on the logging thread, if kept at all
+                logger.info("Calling %s with args: %s", endpoint_name, Truncated(args))
+                if wants_stream(request):
+                    return StreamingResponse(
+                        stream_tool(
+                            session,
+                            endpoint_name,
+                            args,
+                            notifications,
+                            limits,
+                            tool_metrics,
+                            blobs,
                         ),
+                        media_type="text/event-stream",
+                        headers=SSE_HEADERS,
                     )
-                except Exception as e:
-                    print(f"Unexpected error calling {endpoint_name}: {e}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail={"message": "Unexpected error", "error": str(e)},
-                    )
-
+                result = await cancel_on_disconnect(
+                    request,
+                    execute_tool(
+                        session,
+                        endpoint_name,
+                        args,
+                        cache=cache,
+                        singleflight=singleflight,
+                        limits=limits,
+                        metrics=tool_metrics,
+                        blobs=blobs,
+                    ),
+                )
+                return _tool_response(result, has_response_model)
+
+            # Reused by the batch endpoint to validate each item
+            tool.form_model = FormModel
             return tool
 
         tool_handler = make_endpoint_func(endpoint_name, FormModel, session)
@@ -261,51 +667,145 @@ def get_tool_handler(
         def make_endpoint_func_no_args(
             endpoint_name: str, session: ClientSession
         ):  # Parameterless endpoint
-            async def tool():  # No parameters
-                print(f"Calling endpoint: {endpoint_name}, with no args")
-                try:
-                    result = await session.call_tool(
-                        endpoint_name, arguments={}
-                    )  # Empty dict
-
-                    if result.isError:
-                        error_message = "Unknown tool execution error"
-                        if result.content:
-                            if isinstance(result.content[0], types.TextContent):
-                                error_message = result.content[0].text
-                        detail = {"message": error_message}
-                        raise HTTPException(
-                            status_code=500,
-                            detail=detail,
-                        )
-
-                    response_data = process_tool_response(result)
-                    final_response = (
-                        response_data[0] if len(response_data) == 1 else response_data
-                    )
-                    return final_response
-
-                except McpError as e:
-                    print(f"MCP Error calling {endpoint_name}: {e.error}")
-                    status_code = MCP_ERROR_TO_HTTP_STATUS.get(e.error.code, 500)
-                    # Propagate the error received from MCP as an HTTP exception
-                    raise HTTPException(
-                        status_code=status_code,
-                        detail=(
-                            {"message": e.error.message, "data": e.error.data}
-                            if e.error.data is not None
-                            else {"message": e.error.message}
+            async def tool(request: Request):  # No parameters
+                if tool_metrics is not None:
+                    _observe_request(request, tool_metrics)
+                logger.info("Calling %s with no args", endpoint_name)
+                if wants_stream(request):
+                    return StreamingResponse(
+                        stream_tool(
+                            session,
+                            endpoint_name,
+                            {},
+                            notifications,
+                            limits,
+                            tool_metrics,
+                            blobs,
                         ),
+                        media_type="text/event-stream",
+                        headers=SSE_HEADERS,
                     )
-                except Exception as e:
-                    print(f"Unexpected error calling {endpoint_name}: {e}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail={"message": "Unexpected error", "error": str(e)},
-                    )
-
+                result = await cancel_on_disconnect(
+                    request,
+                    execute_tool(
+                        session,
+                        endpoint_name,
+                        {},
+                        cache=cache,
+                        singleflight=singleflight,
+                        limits=limits,
+                        metrics=tool_metrics,
+                        blobs=blobs,
+                    ),
+                )
+                return _tool_response(result, False)
+
+            tool.form_model = None
             return tool
 
         tool_handler = make_endpoint_func_no_args(endpoint_name, session)
 
     return tool_handler
+
+
+class BatchItem(BaseModel):
+    tool: str = Field(..., description="Name of the tool to call")
+    arguments: Dict[str, Any] = Field(
+        default_factory=dict, description="Arguments for the tool"
+    )
+
+
+def get_batch_handler(
+    session,
+    form_models: Dict[str, Optional[Type[BaseModel]]],
+    cache: Optional[ResponseCache] = None,
+    singleflight: Optional[SingleFlight] = None,
+    max_concurrency: int = 8,
+    limits: Optional[ServerLimits] = None,
+    metrics: Optional[ServerMetrics] = None,
+    blobs: Optional[BlobStore] = None,
+    max_items: int = 100,
+):
+    """
+    Build the ``/_batch`` endpoint: validates each item with the tool's form
+    model, runs them concurrently (at most ``max_concurrency`` at a time) and
+    returns per-item results or errors in request order. Batches of more than
+    ``max_items`` calls are rejected with ``413`` before any of them runs.
+    """
+
+    async def run_item(item: BatchItem, semaphore: asyncio.Semaphore):
+        if item.tool not in form_models:
+            return {
+                "tool": item.tool,
+                "ok": False,
+                "status": 404,
+                "error": {"message": f"Unknown tool: {item.tool}"},
+            }
+
+        tool_metrics = metrics.tool(item.tool) if metrics is not None else None
+        if tool_metrics is not None:
+            tool_metrics.requests.inc()
+
+        FormModel = form_models[item.tool]
+        if FormModel is not None:
+            started = time.perf_counter()
+            try:
+                form_data = FormModel.model_validate(item.arguments)
+            except ValidationError as e:
+                return {
+                    "tool": item.tool,
+                    "ok": False,
+                    "status": 422,
+                    "error": jsonable_encoder(e.errors(include_url=False)),
+                }
+            args = form_data.model_dump(exclude_none=True)
+            if tool_metrics is not None:
+                tool_metrics.validation.observe(time.perf_counter() - started)
+        else:
+            args = {}
+
+        async with semaphore:
+            try:
+                result = await execute_tool(
+                    session,
+                    item.tool,
+                    args,
+                    cache=cache,
+                    singleflight=singleflight,
+                    limits=limits,
+                    metrics=tool_metrics,
+                    blobs=blobs,
+                )
+            except HTTPException as e:
+                return {
+                    "tool": item.tool,
+                    "ok": False,
+                    "status": e.status_code,
+                    "error": e.detail,
+                }
+        return {
+            "tool": item.tool,
+            "ok": True,
+            "result": fastjson.materialize(result),
+        }
+
+    async def batch(items: List[BatchItem], request: Request) -> List[Dict[str, Any]]:
+        if len(items) > max_items:
+            raise HTTPException(
+                status_code=413,
+                detail={
+                    "message": f"Batch of {len(items)} calls exceeds the limit "
+                    f"of {max_items}"
+                },
+            )
+        logger.info("Calling batch with %d items", len(items))
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results = await cancel_on_disconnect(
+            request,
+            asyncio.gather(*(run_item(item, semaphore) for item in items)),
+        )
+        if fastjson.enabled():
+            return fastjson.json_response(results)
+        return results
+
+    return batch
@@ -0,0 +1,509 @@
+import time
+import weakref
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from mcp.types import (
+    INTERNAL_ERROR,
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+)
+
+from mcpo.utils.pool import CONNECTION_CLOSED
+
+# Seconds; tool calls range from sub-millisecond cache-like tools to
+# minute-long image generation
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+# Error classes, keyed like MCP_ERROR_TO_HTTP_STATUS
+MCP_ERROR_CLASSES = {
+    PARSE_ERROR: "parse_error",
+    INVALID_REQUEST: "invalid_request",
+    METHOD_NOT_FOUND: "method_not_found",
+    INVALID_PARAMS: "invalid_params",
+    INTERNAL_ERROR: "internal_error",
+    CONNECTION_CLOSED: "connection_closed",
+}
+
+Sample = Tuple[str, Dict[str, str], float]
+
+# ASGI scope key holding the request's arrival time
+REQUEST_START = "mcpo.request_start"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Child for the given label values; callers should keep it for hot paths."""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def samples(self):
+        for key, child in self._children.items():
+            yield f"{self.name}_total", dict(zip(self.labelnames, key)), child.value
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def samples(self):
+        for key, child in self._children.items():
+            yield self.name, dict(zip(self.labelnames, key)), child.value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def samples(self):
+        for key, child in self._children.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    {**labels, "le": _format_value(bound)},
+                    cumulative,
+                )
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, cumulative
+
+
+class CounterTotals:
+    """
+    Running totals of counters read at scrape time from objects that get
+    replaced, like a server's runner and session pool after a reload or a
+    restart. Each scrape adds what the current source counted since the last
+    one, so the exported counters never go down.
+    """
+
+    def __init__(self):
+        # key -> (weak reference to the source, its last value, running total)
+        self._totals: Dict[Tuple, Tuple[Any, float, float]] = {}
+
+    def total(self, key: Tuple, source: Any, value: float) -> float:
+        ref, last, total = self._totals.get(key, (None, 0.0, 0.0))
+        if ref is None or ref() is not source or value < last:
+            # A new source counts from zero
+            last = 0.0
+        total += value - last
+        self._totals[key] = (weakref.ref(source), value, total)
+        return total
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus registry rendering the text exposition format.
+
+    Updates are plain attribute arithmetic on the event loop thread, so there
+    is no locking. Collectors are called on every scrape to report values that
+    are cheaper to read on demand, like pool sizes, than to track.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), **kwargs) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]):
+        """``collector()`` returns freshly built metrics on each scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            metrics.extend(collector())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class ToolMetrics:
+    """Pre-bound metric children of one server/tool pair, for the hot path."""
+
+    __slots__ = (
+        "_metrics",
+        "server",
+        "tool",
+        "requests",
+        "in_flight",
+        "validation",
+        "round_trip",
+        "processing",
+    )
+
+    def __init__(self, metrics: "ServerMetrics", tool: str):
+        self._metrics = metrics
+        self.server = metrics.server
+        self.tool = tool
+        labels = (self.server, tool)
+        self.requests = metrics.requests.labels(*labels)
+        self.in_flight = metrics.in_flight.labels(*labels)
+        self.validation = metrics.duration.labels(*labels, "validation")
+        self.round_trip = metrics.duration.labels(*labels, "mcp")
+        self.processing = metrics.duration.labels(*labels, "processing")
+
+    def error(self, status_code: int, error_class: str):
+        """Count a failed call; ``error_class`` is one of ``MCP_ERROR_CLASSES``,
+        ``"mcp_error"``, ``"tool_error"``, ``"unexpected"`` or the ``reason`` of
+        a ``Rejected`` call."""
+        self._metrics.errors.labels(
+            self.server, self.tool, str(status_code), error_class
+        ).inc()
+
+
+class ServerMetrics:
+    """Tool call metrics of one MCP server, backed by a shared registry."""
+
+    def __init__(self, registry: "ProxyMetrics", server: str):
+        self.server = server
+        self.requests = registry.tool_requests
+        self.errors = registry.tool_errors
+        self.in_flight = registry.tool_in_flight
+        self.duration = registry.tool_duration
+        self._tools: Dict[str, ToolMetrics] = {}
+
+    def tool(self, name: str) -> ToolMetrics:
+        tool = self._tools.get(name)
+        if tool is None:
+            tool = self._tools[name] = ToolMetrics(self, name)
+        return tool
+
+
+class ProxyMetrics(MetricsRegistry):
+    """Registry with the proxy's tool call metrics."""
+
+    def __init__(self):
+        super().__init__()
+        self.tool_requests = self.counter(
+            "mcpo_tool_requests",
+            "Tool calls received, including cache hits and rejected calls.",
+            ("server", "tool"),
+        )
+        self.tool_errors = self.counter(
+            "mcpo_tool_errors",
+            "Failed tool calls by HTTP status and error class.",
+            ("server", "tool", "status", "class"),
+        )
+        self.tool_in_flight = self.gauge(
+            "mcpo_tool_in_flight",
+            "Tool calls currently waiting on their MCP server.",
+            ("server", "tool"),
+        )
+        self.tool_duration = self.histogram(
+            "mcpo_tool_phase_duration_seconds",
+            "Time spent per tool call phase: request validation, MCP round-trip "
+            "and response processing.",
+            ("server", "tool", "phase"),
+        )
+        self._servers: Dict[str, ServerMetrics] = {}
+        # For collect_servers, whose sources are replaced on reload and restart
+        self.totals = CounterTotals()
+
+    def server(self, name: str) -> ServerMetrics:
+        server = self._servers.get(name)
+        if server is None:
+            server = self._servers[name] = ServerMetrics(self, name)
+        return server
+
+
+def collect_servers(
+    apps: Dict[str, object], totals: Optional[CounterTotals] = None
+) -> List[_Metric]:
+    """
+    Scrape-time gauges for each server's sub-app: runner status, session pool
+    and, when configured, concurrency limits, response cache and coalescing.
+    Counters are kept in ``totals`` across scrapes, so they don't drop back to
+    zero when a reload or restart replaces the objects they are read from.
+    """
+    if totals is None:
+        totals = CounterTotals()
+
+    def count(counter: Counter, labels: Tuple[str, ...], source, value: float):
+        counter.labels(*labels).inc(
+            totals.total((counter.name, *labels), source, value)
+        )
+
+    up = Gauge("mcpo_server_up", "1 if the MCP server is running.", ("server",))
+    status = Gauge(
+        "mcpo_server_status", "Current status of the MCP server.", ("server", "status")
+    )
+    sessions = Gauge(
+        "mcpo_pool_sessions", "MCP sessions (stdio children or HTTP streams).",
+        ("server", "state"),
+    )
+    pool_in_flight = Gauge(
+        "mcpo_pool_in_flight", "Calls in flight across the server's sessions.",
+        ("server",),
+    )
+    restarts = Counter(
+        "mcpo_server_restarts",
+        "Restarts after a failure, of the whole server or of one of its sessions.",
+        ("server", "scope"),
+    )
+    circuit_open = Gauge(
+        "mcpo_server_circuit_open",
+        "1 while calls fail fast because the MCP server is down and backing off.",
+        ("server",),
+    )
+    ping = Gauge(
+        "mcpo_server_ping_seconds",
+        "Round-trip time of the last MCP ping, fastest live session.",
+        ("server",),
+    )
+    queued = Gauge(
+        "mcpo_limit_queued", "Calls waiting for a concurrency slot.", ("server", "tool")
+    )
+    active = Gauge(
+        "mcpo_limit_active", "Calls holding a concurrency slot.", ("server", "tool")
+    )
+    rejected = Counter(
+        "mcpo_limit_rejected",
+        "Calls rejected by a concurrency limit, by reason.",
+        ("server", "tool", "reason"),
+    )
+    wait_max = Gauge(
+        "mcpo_limit_wait_seconds_max", "Longest wait for a concurrency slot.",
+        ("server", "tool"),
+    )
+    cache_hits = Counter("mcpo_cache_hits", "Response cache hits.", ("server", "tool"))
+    cache_misses = Counter(
+        "mcpo_cache_misses", "Response cache misses.", ("server", "tool")
+    )
+    cache_bytes = Gauge(
+        "mcpo_cache_bytes", "Approximate size of cached responses.", ("server",)
+    )
+    coalesced = Counter(
+        "mcpo_coalesced_calls", "Calls that joined an identical in-flight call.",
+        ("server",),
+    )
+    resource_reads = Counter(
+        "mcpo_resource_cache_reads",
+        "Resource reads, by whether the resource cache had them.",
+        ("server", "result"),
+    )
+    resource_invalidations = Counter(
+        "mcpo_resource_cache_invalidations",
+        "Cached resources dropped because the server updated them.",
+        ("server",),
+    )
+    resource_bytes = Gauge(
+        "mcpo_resource_cache_bytes", "Size of the cached resource contents.", ("server",)
+    )
+
+    for name, app in apps.items():
+        state = app.state
+        runner = getattr(state, "runner", None)
+        if runner is not None:
+            up.labels(name).set(1 if runner.running else 0)
+            status.labels(name, runner.status).set(1)
+            count(restarts, (name, "server"), runner, runner.restarts)
+            circuit_open.labels(name).set(1 if runner.retry_after else 0)
+
+        pool = getattr(state, "session", None)
+        if runner is not None and not runner.running:
+            pool = None
+        if pool is not None and hasattr(pool, "stats"):
+            pool_stats = pool.stats()
+            sessions.labels(name, "available").set(pool_stats["available"])
+            sessions.labels(name, "unavailable").set(
+                pool_stats["size"] - pool_stats["available"]
+            )
+            pool_in_flight.labels(name).set(pool_stats["in_flight"])
+            count(restarts, (name, "session"), pool, pool_stats["restarts"])
+            if pool_stats["circuit"] == "open":
+                circuit_open.labels(name).set(1)
+            if pool_stats.get("latency") is not None:
+                ping.labels(name).set(pool_stats["latency"])
+
+        limits = getattr(state, "limits", None)
+        if limits is not None:
+            limiters = dict(limits.tools)
+            if limits.server is not None:
+                limiters[""] = limits.server
+            for tool, limiter in limiters.items():
+                queued.labels(name, tool).set(limiter.queued)
+                active.labels(name, tool).set(limiter.active)
+                count(rejected, (name, tool, "queue_full"), limiter, limiter.rejected)
+                count(
+                    rejected, (name, tool, "queue_timeout"), limiter, limiter.timed_out
+                )
+                wait_max.labels(name, tool).set(limiter.wait_seconds_max)
+
+        cache = getattr(state, "cache", None)
+        if cache is not None:
+            cache_stats = cache.stats()
+            for tool, hits in cache_stats["hits"].items():
+                count(cache_hits, (name, tool), cache, hits)
+            for tool, misses in cache_stats["misses"].items():
+                count(cache_misses, (name, tool), cache, misses)
+            cache_bytes.labels(name).set(cache_stats["bytes"])
+
+        singleflight = getattr(state, "singleflight", None)
+        if singleflight is not None:
+            count(coalesced, (name,), singleflight, singleflight.coalesced)
+
+        resource_cache = getattr(state, "resource_cache", None)
+        if resource_cache is not None:
+            resource_stats = resource_cache.stats()
+            count(resource_reads, (name, "hit"), resource_cache, resource_stats["hits"])
+            count(
+                resource_reads, (name, "miss"), resource_cache, resource_stats["misses"]
+            )
+            count(
+                resource_invalidations,
+                (name,),
+                resource_cache,
+                resource_stats["invalidations"],
+            )
+            resource_bytes.labels(name).set(resource_stats["bytes"])
+
+    return [
+        up, status, sessions, pool_in_flight, restarts, circuit_open, ping,
+        queued, active, rejected, wait_max, cache_hits, cache_misses, cache_bytes,
+        coalesced, resource_reads, resource_invalidations, resource_bytes,
+    ]
+
+
+def collect_blobs(store) -> List[_Metric]:
+    """Scrape-time gauges for the blob store."""
+    blobs = Gauge("mcpo_blobs", "Blobs available from /_blobs.")
+    blob_bytes = Gauge(
+        "mcpo_blob_bytes", "Size of the stored blobs, by storage.", ("storage",)
+    )
+    stats = store.stats()
+    blobs.labels().set(stats["blobs"])
+    blob_bytes.labels("memory").set(stats["memory_bytes"])
+    blob_bytes.labels("disk").set(stats["disk_bytes"])
+    return [blobs, blob_bytes]
+
+
+class RequestTimer:
+    """
+    Pure ASGI middleware stamping when a request arrived, so handlers can
+    attribute the time spent reading and validating the body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope[REQUEST_START] = time.perf_counter()
+        await self.app(scope, receive, send)
+
@@ -0,0 +1,63 @@
+import logging
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from mcp import types
+
+logger = logging.getLogger(__name__)
+
+ProgressToken = Union[str, int]
+
+
+class NotificationRouter:
+    """
+    ``message_handler`` shared by every session of a server's pool.
+
+    Progress notifications are routed to whoever registered their progress
+    token; every other server notification is fanned out to the listeners
+    subscribed to its method. Handlers run on the session's receive loop, so
+    they must not block. ``forward``, if given, also gets every notification
+    but progress (e.g. to pass them on to worker processes).
+    """
+
+    def __init__(self, forward: Optional[Callable[[Any], Awaitable[None]]] = None):
+        self._progress: Dict[ProgressToken, Callable[[Any], None]] = {}
+        self._listeners: Dict[str, List[Callable[[Any], Awaitable[None]]]] = {}
+        self.forward = forward
+
+    async def __call__(self, message):
+        if not isinstance(message, types.ServerNotification):
+            if isinstance(message, Exception):
+                logger.debug(f"Error received from MCP session: {message}")
+            return
+
+        notification = message.root
+        if isinstance(notification, types.ProgressNotification):
+            handler = self._progress.get(notification.params.progressToken)
+            if handler is not None:
+                handler(notification.params)
+            return
+
+        for listener in list(self._listeners.get(notification.method, [])):
+            try:
+                await listener(notification)
+            except Exception as e:
+                logger.error(f"Error handling {notification.method}: {e}")
+        if self.forward is not None:
+            try:
+                await self.forward(notification)
+            except Exception as e:
+                logger.error(f"Error forwarding {notification.method}: {e}")
+
+    @contextmanager
+    def progress(self, token: ProgressToken, handler: Callable[[Any], None]):
+        """Route progress notifications for ``token`` to ``handler`` while active."""
+        self._progress[token] = handler
+        try:
+            yield
+        finally:
+            self._progress.pop(token, None)
+
+    def subscribe(self, method: str, listener: Callable[[Any], Awaitable[None]]):
+        """Call ``listener`` with every notification of the given method."""
+        self._listeners.setdefault(method, []).append(listener)
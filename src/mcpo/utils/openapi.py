@@ -0,0 +1,287 @@
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI
+
+HTTP_METHODS = frozenset(
+    ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+)
+
+# Gzip level for the precompressed specs; built once per change, so favour size
+GZIP_LEVEL = 9
+
+
+class SpecDocument:
+    """An OpenAPI spec serialized once, with its gzip body and strong ETags."""
+
+    def __init__(self, schema: Dict[str, Any], sources: Tuple, root_path: str = ""):
+        self.sources = sources
+        self.root_path = root_path
+        self.body = json.dumps(
+            schema, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode()
+        self.gzip_body = gzip.compress(self.body, GZIP_LEVEL, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        # Strong ETags differ per content coding
+        self.gzip_etag = f'"{digest}-gz"'
+
+    def current(self, sources: Tuple, root_path: str) -> bool:
+        return (
+            root_path == self.root_path
+            and len(sources) == len(self.sources)
+            and all(a is b for a, b in zip(sources, self.sources))
+        )
+
+    def matches(self, if_none_match: str) -> bool:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags or self.gzip_etag in tags
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def _rename_refs(value: Any, renames: Dict[str, str]) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: (
+                renames.get(item, item)
+                if key == "$ref" and isinstance(item, str)
+                else _rename_refs(item, renames)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_rename_refs(item, renames) for item in value]
+    return value
+
+
+def merge_specs(
+    base: Dict[str, Any], specs: Dict[str, Dict[str, Any]], path_prefix: str = "/"
+) -> Dict[str, Any]:
+    """
+    One spec with every server's paths under ``{path_prefix}{name}``, tagged
+    and with operation ids prefixed by the server name. Components that two
+    servers define differently are renamed ``{name}__{component}``.
+    """
+    paths = dict(base.get("paths", {}))
+    components: Dict[str, Dict[str, Any]] = {
+        section: dict(items) for section, items in base.get("components", {}).items()
+    }
+    tags: List[Dict[str, Any]] = list(base.get("tags", []))
+
+    for name, spec in specs.items():
+        renames = {}
+        for section, items in spec.get("components", {}).items():
+            existing = components.get(section, {})
+            for key, item in items.items():
+                if key in existing and existing[key] != item:
+                    renames[f"#/components/{section}/{key}"] = (
+                        f"#/components/{section}/{name}__{key}"
+                    )
+        if renames:
+            spec = _rename_refs(spec, renames)
+
+        for section, items in spec.get("components", {}).items():
+            target = components.setdefault(section, {})
+            for key, item in items.items():
+                if f"#/components/{section}/{key}" in renames:
+                    key = f"{name}__{key}"
+                target[key] = item
+
+        for path, path_item in spec.get("paths", {}).items():
+            merged = {}
+            for method, operation in path_item.items():
+                if method in HTTP_METHODS and isinstance(operation, dict):
+                    operation = {**operation, "tags": [name]}
+                    if "operationId" in operation:
+                        operation["operationId"] = f"{name}_{operation['operationId']}"
+                merged[method] = operation
+            paths[f"{path_prefix}{name}{path}"] = merged
+
+        tag = {"name": name}
+        description = spec.get("info", {}).get("description")
+        if description:
+            tag["description"] = description
+        tags.append(tag)
+
+    combined = {**base, "paths": paths}
+    if components:
+        combined["components"] = components
+    if tags:
+        combined["tags"] = tags
+    return combined
+
+
+class OpenAPICache:
+    """
+    Pre-serialized, precompressed OpenAPI specs: one per mounted server and a
+    combined one over all running servers, served by ``OpenAPIMiddleware``.
+
+    FastAPI keeps each app's generated schema until it is reset (e.g. after a
+    tools/list_changed refresh or a config reload). A document is rebuilt only
+    when one of the schemas it came from is no longer the app's current one,
+    so every other request is a lookup plus an ETag comparison.
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        server_apps: Dict[str, FastAPI],
+        path_prefix: str = "/",
+    ):
+        self.app = app
+        # Shared with run() and the config reloader, which keep it current
+        self.server_apps = server_apps
+        self.path_prefix = path_prefix
+        self._servers: Dict[str, SpecDocument] = {}
+        self._combined: Optional[SpecDocument] = None
+        self.builds = 0
+
+    def _mounted(self) -> Dict[str, FastAPI]:
+        """Running servers other than the main app itself (single-server mode)."""
+        return {
+            name: app
+            for name, app in self.server_apps.items()
+            if app is not self.app and _running(app)
+        }
+
+    def server(self, name: str, root_path: str = "") -> Optional[SpecDocument]:
+        """The spec of one server as it serves it at its mount, if running."""
+        app = self.server_apps.get(name)
+        if app is None or app is self.app or not _running(app):
+            return None
+        return self._server(name, app, root_path)
+
+    def _server(self, name: str, app: FastAPI, root_path: str = "") -> SpecDocument:
+        schema = app.openapi()
+        document = self._servers.get(name)
+        if document is None or not document.current((schema,), root_path):
+            server_url = f"{root_path}{self.path_prefix}{name}"
+            document = SpecDocument(
+                {**schema, "servers": [{"url": server_url}]}, (schema,), root_path
+            )
+            self._servers[name] = document
+            self.builds += 1
+        return document
+
+    def combined(self, root_path: str = "") -> SpecDocument:
+        """The main app's spec with every running server's merged in."""
+        base = self.app.openapi()
+        mounted = self._mounted()
+        schemas = {name: app.openapi() for name, app in mounted.items()}
+        sources = (base, *schemas.values())
+        document = self._combined
+        if document is None or not document.current(sources, root_path):
+            spec = merge_specs(base, schemas, self.path_prefix)
+            if root_path:
+                spec["servers"] = [{"url": root_path}]
+            document = SpecDocument(spec, sources, root_path)
+            self._combined = document
+            self.builds += 1
+        return document
+
+    def warm(self, app: Optional[FastAPI] = None):
+        """
+        Build specs ahead of the first request: ``app``'s own after it started
+        or its tools changed, or the combined one when ``app`` is omitted or is
+        the main app.
+        """
+        if app is None or app is self.app:
+            self.combined()
+            return
+        # Called while the server starts, before its runner reports it running
+        for name, server_app in list(self.server_apps.items()):
+            if server_app is app:
+                self._server(name, app)
+
+
+def _running(app: FastAPI) -> bool:
+    runner = getattr(app.state, "runner", None)
+    return runner is None or runner.running
+
+
+class OpenAPIMiddleware:
+    """
+    Pure ASGI middleware on the main app answering ``GET /openapi.json`` (the
+    combined spec) and ``{path_prefix}{name}/openapi.json`` from the
+    ``OpenAPICache``, with strong ETags, ``304 Not Modified`` and gzip. Specs of
+    servers that aren't running are left to the normal routing, which starts
+    lazy ones.
+    """
+
+    def __init__(self, app, cache: OpenAPICache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        document = None
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            document = self._document(scope)
+        if document is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {}
+        for name, value in scope["headers"]:
+            if name in (b"if-none-match", b"accept-encoding"):
+                headers[name] = value.decode("latin-1")
+
+        use_gzip = _accepts_gzip(headers.get(b"accept-encoding", ""))
+        etag = document.gzip_etag if use_gzip else document.etag
+        response_headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", b"no-cache"),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        if_none_match = headers.get(b"if-none-match")
+        if if_none_match is not None and document.matches(if_none_match):
+            await send(
+                {"type": "http.response.start", "status": 304, "headers": response_headers}
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        body = document.gzip_body if use_gzip else document.body
+        response_headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if use_gzip:
+            response_headers.append((b"content-encoding", b"gzip"))
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": response_headers}
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": body if scope["method"] == "GET" else b"",
+            }
+        )
+
+    def _document(self, scope) -> Optional[SpecDocument]:
+        root_path = scope.get("root_path", "")
+        path = scope["path"]
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        if path == self.cache.app.openapi_url:
+            return self.cache.combined(root_path)
+        prefix = self.cache.path_prefix
+        if path.startswith(prefix) and path.endswith("/openapi.json"):
+            name = path[len(prefix) : -len("/openapi.json")]
+            if name in self.cache.server_apps:
+                return self.cache.server(name, root_path)
+        return None
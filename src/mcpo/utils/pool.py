@@ -0,0 +1,640 @@
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Set,
+)
+
+import anyio
+from anyio.abc import ObjectSendStream
+from mcp import ClientSession, types
+from mcp.shared.message import SessionMessage
+from pydantic import AnyUrl
+
+from mcpo.utils.limits import Rejected
+
+logger = logging.getLogger(__name__)
+
+# Error code newer SDKs use for requests whose connection went away
+CONNECTION_CLOSED = -32000
+
+# A session that stayed up this long before failing starts the backoff over
+STABLE_AFTER = 30.0
+
+
+def _root_cause(e: BaseException) -> BaseException:
+    """Unwrap the exception groups raised by the transports' task groups."""
+    while isinstance(e, BaseExceptionGroup) and e.exceptions:
+        e = e.exceptions[0]
+    return e
+
+
+# Id of the last request the current task sent through a SupervisedSession
+_sent_request_id: ContextVar[Optional[types.RequestId]] = ContextVar(
+    "mcpo_sent_request_id", default=None
+)
+
+
+class _RequestIdStream(ObjectSendStream[SessionMessage]):
+    """A session's write stream that notes the id of each request it carries."""
+
+    def __init__(self, stream: ObjectSendStream[SessionMessage]):
+        self._stream = stream
+
+    async def send(self, item: SessionMessage) -> None:
+        await self._stream.send(item)
+        # Sent from the calling task, so the caller sees its own request's id
+        if isinstance(item.message.root, types.JSONRPCRequest):
+            _sent_request_id.set(item.message.root.id)
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class SupervisedSession(ClientSession):
+    """
+    ``ClientSession`` that notices when its transport closes, e.g. because the
+    stdio child exited: ``disconnected`` is set, and requests still waiting for
+    a response fail with ``CONNECTION_CLOSED`` instead of hanging forever.
+    """
+
+    def __init__(self, read_stream, write_stream, *args, **kwargs):
+        super().__init__(read_stream, _RequestIdStream(write_stream), *args, **kwargs)
+        self.disconnected = anyio.Event()
+
+    async def _receive_loop(self) -> None:
+        try:
+            await super()._receive_loop()
+        finally:
+            self.disconnected.set()
+            error = types.ErrorData(code=CONNECTION_CLOSED, message="Connection closed")
+            for request_id, stream in list(self._response_streams.items()):
+                try:
+                    stream.send_nowait(
+                        types.JSONRPCError(jsonrpc="2.0", id=request_id, error=error)
+                    )
+                except (
+                    anyio.WouldBlock,
+                    anyio.BrokenResourceError,
+                    anyio.ClosedResourceError,
+                ):
+                    pass
+
+
+def _disconnected(session) -> Optional[anyio.Event]:
+    return getattr(session, "disconnected", None)
+
+
+class _ListResourcesPage(
+    types.Request[Optional[Dict[str, Any]], Literal["resources/list"]]
+):
+    """
+    ``resources/list`` with ``params.cursor``, for the pages after the first:
+    ``ClientSession.list_resources`` only asks for the first one.
+    """
+
+
+class PooledSession:
+    """A single backend connection (stdio child or HTTP stream) owned by a pool."""
+
+    def __init__(self):
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self.started = time.monotonic()
+        self.ready = anyio.Event()
+        self.closing = anyio.Event()
+        self.cancel_scope = anyio.CancelScope()
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        # Round-trip time of the last answered ping, and pings missed in a row
+        self.latency: Optional[float] = None
+        self.last_ping: Optional[float] = None
+        self.ping_failures = 0
+        self.unresponsive = anyio.Event()
+        # URIs this session asked the server to send resources/updated for
+        self.subscriptions: Set[str] = set()
+
+    @property
+    def available(self) -> bool:
+        disconnected = _disconnected(self.session)
+        return (
+            self.session is not None
+            and not self.closed
+            and not self.closing.is_set()
+            and not (disconnected is not None and disconnected.is_set())
+        )
+
+
+class SessionPool:
+    """
+    Pool of MCP client sessions for a single server.
+
+    Exposes the subset of the ``ClientSession`` API used by the proxy, so it can
+    be stored in ``app.state.session`` in place of a single session. Calls are
+    dispatched to the least-busy live session; when every session is busy and
+    the pool is below ``max_size`` a new one is spawned in the background, and
+    sessions idle for longer than ``idle_timeout`` are reaped down to
+    ``min_size``.
+
+    Sessions that die (the child exits, the stream breaks) are replaced after
+    an exponential backoff from ``restart_delay`` up to ``max_restart_delay``.
+    While no session is up and the next attempt is not due, the circuit is
+    open and calls fail fast with ``503`` and ``Retry-After``.
+
+    With ``ping_interval``, every live session is sent an MCP ``ping`` that
+    often. Calls are routed around a session that missed its last ping, and
+    one that misses ``unhealthy_after`` in a row is restarted like a dead one.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], AsyncContextManager[ClientSession]],
+        min_size: int = 1,
+        max_size: int = 1,
+        idle_timeout: float = 300.0,
+        name: str = "",
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+        ping_interval: Optional[float] = None,
+        ping_timeout: float = 5.0,
+        unhealthy_after: int = 3,
+    ):
+        if min_size < 1:
+            raise ValueError("Pool 'min' must be at least 1.")
+        if max_size < min_size:
+            raise ValueError("Pool 'max' must be greater than or equal to 'min'.")
+
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.name = name
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.unhealthy_after = unhealthy_after
+
+        # Sessions started to replace failed ones, and failures in a row
+        self.restarts = 0
+        self.failures = 0
+        self._retry_at = 0.0
+        self._restart_scope: Optional[anyio.CancelScope] = None
+
+        self._members: List[PooledSession] = []
+        self._initialize_result: Optional[types.InitializeResult] = None
+        self._task_group = None
+        self._reaper_scope = anyio.CancelScope()
+        self._ping_scope = anyio.CancelScope()
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return len(self._members)
+
+    @property
+    def in_flight(self) -> int:
+        return sum(member.in_flight for member in self._members)
+
+    @property
+    def circuit_open(self) -> bool:
+        return (
+            self.failures > 0
+            and time.monotonic() < self._retry_at
+            and not any(member.available for member in self._members)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "available": sum(1 for member in self._members if member.available),
+            "in_flight": self.in_flight,
+            "min": self.min_size,
+            "max": self.max_size,
+            "restarts": self.restarts,
+            "failures": self.failures,
+            "circuit": "open" if self.circuit_open else "closed",
+            "latency": self.latency,
+        }
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Best round-trip time of the last pings to the live sessions, in seconds."""
+        latencies = [
+            member.latency
+            for member in self._members
+            if member.available and not member.ping_failures
+            and member.latency is not None
+        ]
+        return min(latencies) if latencies else None
+
+    def health(self) -> Dict[str, Any]:
+        """
+        ``ok`` when every session answers, ``degraded`` when some are missing
+        pings or restarting, ``down`` when none can take a call.
+        """
+        now = time.monotonic()
+        live = [member for member in self._members if member.available]
+        responsive = [member for member in live if not member.ping_failures]
+        if not responsive:
+            status = "down"
+        elif len(responsive) < len(live) or len(live) < self.min_size:
+            status = "degraded"
+        else:
+            status = "ok"
+        health = {
+            "status": status,
+            "latency_ms": _ms(self.latency),
+            "sessions": [
+                {
+                    "available": member.available,
+                    "in_flight": member.in_flight,
+                    "latency_ms": _ms(member.latency),
+                    "last_ping_s": (
+                        round(now - member.last_ping, 1)
+                        if member.last_ping is not None
+                        else None
+                    ),
+                    "ping_failures": member.ping_failures,
+                }
+                for member in self._members
+            ],
+            "restarts": self.restarts,
+        }
+        if self.circuit_open:
+            health["retry_after"] = max(math.ceil(self._retry_at - now), 1)
+        return health
+
+    async def __aenter__(self) -> "SessionPool":
+        self._task_group = anyio.create_task_group()
+        await self._task_group.__aenter__()
+        try:
+            members = [self._spawn() for _ in range(self.min_size)]
+            for member in members:
+                await member.ready.wait()
+            failed = [member for member in members if member.error is not None]
+            if failed:
+                raise RuntimeError(
+                    f"Failed to start MCP server '{self.name}': {failed[0].error}"
+                ) from failed[0].error
+            if self.max_size > self.min_size:
+                self._task_group.start_soon(self._reap_idle)
+            if self.ping_interval:
+                self._task_group.start_soon(self._ping_periodically)
+        except BaseException:
+            await self._shutdown()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._shutdown()
+
+    async def _shutdown(self):
+        self._closed = True
+        self._reaper_scope.cancel()
+        self._ping_scope.cancel()
+        if self._restart_scope is not None:
+            self._restart_scope.cancel()
+        for member in self._members:
+            member.closing.set()
+            # A session still connecting would otherwise hold up shutdown
+            if not member.ready.is_set():
+                member.cancel_scope.cancel()
+        await self._task_group.__aexit__(None, None, None)
+
+    def _spawn(self) -> PooledSession:
+        member = PooledSession()
+        self._members.append(member)
+        self._task_group.start_soon(self._run_member, member)
+        return member
+
+    async def _run_member(self, member: PooledSession):
+        try:
+            with member.cancel_scope:
+                async with self.connect() as session:
+                    result = await session.initialize()
+                    if self._initialize_result is None:
+                        self._initialize_result = result
+                    member.session = session
+                    member.ready.set()
+                    logger.info(
+                        f"MCP server '{self.name}': session opened "
+                        f"({self.size}/{self.max_size})"
+                    )
+                    await self._wait_closing(member, _disconnected(session))
+        except Exception as e:
+            e = _root_cause(e)
+            member.error = e
+            if member.closing.is_set():
+                logger.debug(f"MCP server '{self.name}': error while closing: {e}")
+            else:
+                logger.error(f"MCP server '{self.name}': session failed: {e}")
+        finally:
+            member.closed = True
+            member.ready.set()
+            if member in self._members:
+                self._members.remove(member)
+            if not member.closing.is_set() and not self._closed:
+                self._on_failure(member)
+
+    async def _wait_closing(self, member: PooledSession, disconnected):
+        async with anyio.create_task_group() as tg:
+
+            async def wait(event: anyio.Event):
+                await event.wait()
+                tg.cancel_scope.cancel()
+
+            tg.start_soon(wait, member.closing)
+            tg.start_soon(wait, member.unresponsive)
+            if disconnected is not None:
+                tg.start_soon(wait, disconnected)
+
+        if member.closing.is_set():
+            return
+        if member.unresponsive.is_set():
+            raise ConnectionError(
+                f"MCP server missed {member.ping_failures} pings in a row"
+            )
+        raise ConnectionError("MCP server closed the connection")
+
+    def _on_failure(self, member: PooledSession):
+        """Back off before replacing a failed session, and schedule the restart."""
+        now = time.monotonic()
+        if member.session is not None and now - member.started >= STABLE_AFTER:
+            self.failures = 1
+        else:
+            self.failures += 1
+        delay = min(
+            self.restart_delay * 2 ** (self.failures - 1), self.max_restart_delay
+        )
+        self._retry_at = now + delay
+        logger.warning(
+            f"MCP server '{self.name}': restarting in {delay:.0f}s "
+            f"(failure {self.failures} in a row, {self.restarts} restarts so far)"
+        )
+        if self._restart_scope is None:
+            self._restart_scope = anyio.CancelScope()
+            self._task_group.start_soon(self._restart_when_due, self._restart_scope)
+
+    async def _restart_when_due(self, scope: anyio.CancelScope):
+        with scope:
+            # Failures while waiting push the retry time further out
+            while time.monotonic() < self._retry_at:
+                await anyio.sleep(self._retry_at - time.monotonic())
+            self._restart_scope = None
+            live = [member for member in self._members if not member.closed]
+            if not self._closed and len(live) < self.min_size:
+                self.restarts += 1
+                self._spawn()
+
+    async def _ping_periodically(self):
+        with self._ping_scope:
+            while not self._closed:
+                await anyio.sleep(self.ping_interval)
+                await self.ping()
+
+    async def ping(self):
+        """Ping every live session concurrently, recording round-trip times."""
+        async with anyio.create_task_group() as tg:
+            for member in self._members:
+                if member.available:
+                    tg.start_soon(self._ping_member, member)
+
+    async def _ping_member(self, member: PooledSession):
+        started = time.perf_counter()
+        try:
+            with anyio.fail_after(self.ping_timeout):
+                await member.session.send_ping()
+        except Exception as e:
+            if not member.available:
+                return
+            member.ping_failures += 1
+            reason = "timed out" if isinstance(e, TimeoutError) else str(e)
+            logger.warning(
+                f"MCP server '{self.name}': ping {reason} "
+                f"({member.ping_failures}/{self.unhealthy_after})"
+            )
+            if member.ping_failures >= self.unhealthy_after:
+                member.unresponsive.set()
+            return
+        member.latency = time.perf_counter() - started
+        member.last_ping = time.monotonic()
+        member.ping_failures = 0
+
+    async def _reap_idle(self):
+        with self._reaper_scope:
+            await self._reap_idle_loop()
+
+    async def _reap_idle_loop(self):
+        interval = max(self.idle_timeout / 2, 1.0)
+        while not self._closed:
+            await anyio.sleep(interval)
+            now = time.monotonic()
+            live = [member for member in self._members if member.available]
+            for member in sorted(live, key=lambda m: m.last_used):
+                if len(live) <= self.min_size:
+                    break
+                if member.in_flight == 0 and now - member.last_used > self.idle_timeout:
+                    logger.info(f"MCP server '{self.name}': reaping idle session")
+                    member.closing.set()
+                    live.remove(member)
+
+    async def _checkout(self) -> PooledSession:
+        while True:
+            if self._closed:
+                raise RuntimeError(f"Session pool for '{self.name}' is closed.")
+
+            live = [member for member in self._members if member.available]
+            if live:
+                # Route around sessions that missed their last ping
+                responsive = [m for m in live if not m.ping_failures] or live
+                member = min(responsive, key=lambda m: m.in_flight)
+                # Grow in the background so this call doesn't pay for the spawn
+                if (
+                    member.in_flight > 0
+                    and self.size < self.max_size
+                    and len(live) == self.size
+                ):
+                    self._spawn()
+                return member
+
+            starting = [member for member in self._members if not member.ready.is_set()]
+            if not starting:
+                if self.circuit_open:
+                    retry_after = max(math.ceil(self._retry_at - time.monotonic()), 1)
+                    raise Rejected(
+                        503,
+                        "circuit_open",
+                        f"MCP server '{self.name}' is down, "
+                        f"restarting in {retry_after}s",
+                        retry_after,
+                    )
+                if self.failures:
+                    self.restarts += 1
+            member = starting[0] if starting else self._spawn()
+            await member.ready.wait()
+            if member.error is not None and not starting:
+                raise Rejected(
+                    503,
+                    "start_failed",
+                    f"Failed to start MCP server '{self.name}': {member.error}",
+                )
+
+    @asynccontextmanager
+    async def _acquire_member(self):
+        member = await self._checkout()
+        member.in_flight += 1
+        try:
+            yield member
+        finally:
+            member.in_flight -= 1
+            member.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self._acquire_member() as member:
+            yield member.session
+
+    async def initialize(self) -> types.InitializeResult:
+        if self._initialize_result is None:
+            async with self.acquire():
+                pass
+        return self._initialize_result
+
+    async def list_tools(self) -> types.ListToolsResult:
+        async with self.acquire() as session:
+            return await session.list_tools()
+
+    async def list_resources(self) -> types.ListResourcesResult:
+        """Every resource of the server, following ``nextCursor`` page by page."""
+        resources: List[types.Resource] = []
+        cursors: Set[str] = set()
+        async with self.acquire() as session:
+            result = await session.list_resources()
+            while True:
+                resources.extend(result.resources)
+                cursor = result.nextCursor
+                if cursor is None or cursor in cursors:
+                    break
+                cursors.add(cursor)
+                result = await session.send_request(
+                    _ListResourcesPage(
+                        method="resources/list", params={"cursor": cursor}
+                    ),
+                    types.ListResourcesResult,
+                )
+        return types.ListResourcesResult(resources=resources)
+
+    def subscribed(self, uri: str) -> bool:
+        """Whether a live session will be told when the resource at ``uri`` changes."""
+        return any(
+            member.available and uri in member.subscriptions
+            for member in self._members
+        )
+
+    async def read_resource(
+        self, uri: str, subscribe: bool = False
+    ) -> types.ReadResourceResult:
+        """
+        Read a resource; with ``subscribe``, first make sure some live session
+        is subscribed to its updates, so none are missed after this read.
+        """
+        async with self._acquire_member() as member:
+            session = member.session
+            if subscribe and not self.subscribed(uri):
+                await session.subscribe_resource(uri)
+                member.subscriptions.add(uri)
+            return await session.read_resource(uri)
+
+    async def unsubscribe(self, uri: str):
+        """Stop the server's updates for ``uri``, e.g. once it is no longer cached."""
+        for member in list(self._members):
+            if uri not in member.subscriptions:
+                continue
+            # Dropped first, so a read meanwhile subscribes again
+            member.subscriptions.discard(uri)
+            if not member.available:
+                continue
+            member.in_flight += 1
+            try:
+                await member.session.unsubscribe_resource(AnyUrl(uri))
+            finally:
+                member.in_flight -= 1
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        read_timeout_seconds: timedelta | None = None,
+        progress_token: str | int | None = None,
+    ) -> types.CallToolResult:
+        async with self.acquire() as session:
+            # Set once the request is sent, so a cancelled call can be
+            # cancelled on the server as well
+            sent = _sent_request_id.set(None)
+            try:
+                if progress_token is None:
+                    return await session.call_tool(
+                        name,
+                        arguments=arguments,
+                        read_timeout_seconds=read_timeout_seconds,
+                    )
+
+                # ClientSession.call_tool can't attach a progress token yet
+                return await session.send_request(
+                    types.ClientRequest(
+                        types.CallToolRequest(
+                            method="tools/call",
+                            params=types.CallToolRequestParams(
+                                name=name,
+                                arguments=arguments,
+                                _meta=types.RequestParams.Meta(
+                                    progressToken=progress_token
+                                ),
+                            ),
+                        )
+                    ),
+                    types.CallToolResult,
+                    request_read_timeout_seconds=read_timeout_seconds,
+                )
+            except anyio.get_cancelled_exc_class():
+                request_id = _sent_request_id.get()
+                if request_id is not None:
+                    with anyio.CancelScope(shield=True):
+                        await _send_cancelled(session, request_id)
+                raise
+            finally:
+                _sent_request_id.reset(sent)
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+async def _send_cancelled(session: ClientSession, request_id: types.RequestId):
+    """Tell the server to stop working on a request nobody is waiting for."""
+    try:
+        with anyio.fail_after(5):
+            await session.send_notification(
+                types.ClientNotification(
+                    types.CancelledNotification(
+                        method="notifications/cancelled",
+                        params=types.CancelledNotificationParams(
+                            requestId=request_id, reason="Request cancelled by client"
+                        ),
+                    )
+                )
+            )
+    except Exception as e:
+        logger.debug(f"Could not send cancellation for request {request_id}: {e}")
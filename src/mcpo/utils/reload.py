@@ -0,0 +1,230 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+from typing import Callable, Dict, Iterable, List, Optional
+
+import anyio
+from fastapi import FastAPI
+from starlette.routing import Mount
+
+from mcpo.utils.runner import ServerRunner
+
+logger = logging.getLogger(__name__)
+
+
+def describe_servers(description: str, names: Iterable[str]) -> str:
+    """The main app's description, with a docs link per mounted server."""
+    description += "\n\n- **available tools**："
+    for name in names:
+        description += f"\n    - [{name}](/{name}/docs)"
+    return description
+
+
+def load_servers(config_path: str) -> Dict[str, dict]:
+    with open(config_path, "r") as f:
+        config_data = json.load(f)
+    mcp_servers = None
+    if isinstance(config_data, dict):
+        mcp_servers = config_data.get("mcpServers")
+    if not mcp_servers:
+        raise ValueError("No 'mcpServers' found in config file.")
+    if not isinstance(mcp_servers, dict) or not all(
+        isinstance(server, dict) for server in mcp_servers.values()
+    ):
+        raise ValueError("'mcpServers' must map server names to objects.")
+    return mcp_servers
+
+
+def diff_servers(old: Dict[str, dict], new: Dict[str, dict]):
+    """Names of the (added, removed, changed) servers between two configs."""
+    added = [name for name in new if name not in old]
+    removed = [name for name in old if name not in new]
+    changed = [name for name in new if name in old and new[name] != old[name]]
+    return added, removed, changed
+
+
+class ConfigReloader:
+    """
+    Applies changes to ``mcpServers`` in the config file without restarting
+    the proxy, on ``SIGHUP`` or, with ``poll_interval``, when the file changes.
+
+    Added and changed servers are built with ``build_server`` and started
+    before they take traffic; then mounts and runners are swapped in one step,
+    and removed or replaced servers are stopped once their in-flight requests
+    finish (at most ``drain_timeout`` seconds). Unchanged servers keep running
+    untouched. A config that can't be read, or whose servers can't be built
+    or (unless ``lazy``) started within their startup timeout, is logged and
+    ignored: a bad edit never takes down the proxy or a working server.
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        config_path: str,
+        servers: Dict[str, dict],
+        runners: Dict[str, ServerRunner],
+        build_server: Callable[[str, dict], FastAPI],
+        path_prefix: str = "/",
+        server_apps: Optional[Dict[str, FastAPI]] = None,
+        description: str = "",
+        drain_timeout: float = 30,
+        poll_interval: Optional[float] = None,
+    ):
+        self.app = app
+        self.config_path = config_path
+        self.servers = servers
+        self.runners = runners
+        self.build_server = build_server
+        self.path_prefix = path_prefix
+        self.server_apps = server_apps if server_apps is not None else {}
+        self.description = description
+        self.drain_timeout = drain_timeout
+        self.poll_interval = poll_interval
+
+        self._lock = anyio.Lock()
+        self._task_group = None
+        self._watch_scope: Optional[anyio.CancelScope] = None
+        self._signal_installed = False
+        self._pending = set()
+
+    def bind(self, task_group):
+        """Attach the main app's task group; installs SIGHUP and the file watch."""
+        self._task_group = task_group
+        if hasattr(signal, "SIGHUP"):
+            try:
+                asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGHUP, self._on_sighup
+                )
+                self._signal_installed = True
+            except (NotImplementedError, RuntimeError):
+                pass
+        if self.poll_interval:
+            task_group.start_soon(self._watch)
+
+    def close(self):
+        if self._watch_scope is not None:
+            self._watch_scope.cancel()
+        if self._signal_installed:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+            self._signal_installed = False
+
+    def _on_sighup(self):
+        logger.info(f"SIGHUP received, reloading {self.config_path}")
+        task = asyncio.ensure_future(self.reload())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    async def _watch(self):
+        with anyio.CancelScope() as scope:
+            self._watch_scope = scope
+            last = self._mtime()
+            while True:
+                await anyio.sleep(self.poll_interval)
+                mtime = self._mtime()
+                if mtime != last:
+                    last = mtime
+                    logger.info(f"{self.config_path} changed, reloading")
+                    await self.reload()
+
+    async def reload(self) -> Dict[str, List[str]]:
+        """Apply the config file; returns the added, removed and changed names."""
+        async with self._lock:
+            try:
+                servers = load_servers(self.config_path)
+            except (OSError, ValueError) as e:
+                logger.error(f"Not reloading {self.config_path}: {e}")
+                return {"added": [], "removed": [], "changed": []}
+
+            added, removed, changed = diff_servers(self.servers, servers)
+            if not (added or removed or changed):
+                logger.info("Config reloaded: no MCP server changes")
+                self.servers = servers
+                return {"added": [], "removed": [], "changed": []}
+
+            new_apps: Dict[str, FastAPI] = {}
+            try:
+                # Build the whole new set before touching the current one, so a
+                # bad entry (e.g. an invalid limit) leaves every server as it is
+                for name in added + changed:
+                    new_apps[name] = self.build_server(name, servers[name])
+                # Bring new servers up before they take traffic; lazy ones start
+                # on their first request, as at startup
+                async with anyio.create_task_group() as startup:
+                    for sub_app in new_apps.values():
+                        runner: ServerRunner = sub_app.state.runner
+                        if self._task_group is not None:
+                            runner.bind(self._task_group)
+                        if not runner.lazy:
+                            startup.start_soon(runner.start)
+                # A server that doesn't come up never replaces a working one
+                failed = [
+                    f"{name} ({sub_app.state.runner.error})"
+                    for name, sub_app in new_apps.items()
+                    if not sub_app.state.runner.lazy
+                    and not sub_app.state.runner.running
+                ]
+                if failed:
+                    raise RuntimeError(f"failed to start {', '.join(failed)}")
+            except Exception as e:
+                logger.error(
+                    f"Not reloading {self.config_path}: {e!r}; keeping current servers"
+                )
+                for sub_app in new_apps.values():
+                    await sub_app.state.runner.stop()
+                return {"added": [], "removed": [], "changed": []}
+
+            old_runners = [self.runners[name] for name in removed + changed]
+            self._swap(servers, new_apps, removed)
+
+            async with anyio.create_task_group() as draining:
+                for runner in old_runners:
+                    draining.start_soon(runner.drain, self.drain_timeout)
+
+            logger.info(
+                f"Config reloaded: added {added}, removed {removed}, changed {changed}"
+            )
+            return {"added": added, "removed": removed, "changed": changed}
+
+    def _swap(
+        self,
+        servers: Dict[str, dict],
+        new_apps: Dict[str, FastAPI],
+        removed: List[str],
+    ):
+        # No awaits in here: requests see either the old or the new set of servers
+        replaced = {
+            id(self.runners[name].app): name
+            for name in list(new_apps) + removed
+            if name in self.runners
+        }
+        pending = dict(new_apps)
+        routes = []
+        for route in self.app.router.routes:
+            name = replaced.get(id(route.app)) if isinstance(route, Mount) else None
+            if name is None:
+                routes.append(route)
+            elif name in pending:
+                routes.append(Mount(route.path, app=pending.pop(name)))
+        for name, sub_app in pending.items():
+            routes.append(Mount(f"{self.path_prefix}{name}", app=sub_app))
+        self.app.router.routes = routes
+
+        for name in removed:
+            self.runners.pop(name, None)
+            self.server_apps.pop(name, None)
+        for name, sub_app in new_apps.items():
+            self.runners[name] = sub_app.state.runner
+            self.server_apps[name] = sub_app
+
+        self.servers = servers
+        self.app.description = describe_servers(self.description, servers)
+        # Rebuilt with the new description on the next request
+        self.app.openapi_schema = None
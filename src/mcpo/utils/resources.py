@@ -0,0 +1,244 @@
+import base64
+import binascii
+import logging
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from mcp import types
+from mcp.shared.exceptions import McpError
+from pydantic import AnyUrl, ValidationError
+
+from mcpo.utils.blobs import DECODE_CHUNK, READ_CHUNK
+from mcpo.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC code servers use for unknown resources
+RESOURCE_NOT_FOUND = -32002
+
+
+def resource_key(uri: str) -> str:
+    """``uri`` as the server will echo it in notifications, e.g. with a trailing slash."""
+    return str(AnyUrl(uri))
+
+
+def _contents_size(result: types.ReadResourceResult) -> int:
+    return sum(
+        len(item.text)
+        if isinstance(item, types.TextResourceContents)
+        else len(item.blob)
+        for item in result.contents
+    )
+
+
+class ResourceCache:
+    """
+    LRU cache of ``resources/read`` results for a single MCP server.
+
+    A resource is cached only while one of the server's sessions is subscribed
+    to it, and is dropped as soon as the server sends
+    ``notifications/resources/updated`` for it, so a hit is never older than
+    the server's last word on it. Reads that were in flight when an update
+    arrived aren't stored. Concurrent misses for the same URI share one read.
+    The cache is bounded by entry count and by the size of the contents;
+    evicted resources are unsubscribed from, so subscriptions stay bounded too.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        # uri -> (size, result)
+        self._entries: "OrderedDict[str, Tuple[int, types.ReadResourceResult]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        # Reads in flight per uri, and uris updated while one was
+        self._reading: Dict[str, int] = {}
+        self._updated: Set[str] = set()
+        self._reads = SingleFlight()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ResourceCache":
+        """
+        From a server's ``resourceCache`` config, e.g.
+        ``{"maxEntries": 256, "maxBytes": 16777216}``.
+        """
+        return cls(
+            max_entries=config.get("maxEntries", 256),
+            max_bytes=config.get("maxBytes", 16 * 1024 * 1024),
+        )
+
+    async def read(self, session, uri: str) -> types.ReadResourceResult:
+        entry = self._entries.get(uri)
+        if entry is not None and session.subscribed(uri):
+            self._entries.move_to_end(uri)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            # The subscription went away with its session
+            self._remove(uri)
+        self.misses += 1
+        self._reading[uri] = self._reading.get(uri, 0) + 1
+        try:
+            return await self._reads.do(uri, lambda: self._read(session, uri))
+        finally:
+            self._reading[uri] -= 1
+            if not self._reading[uri]:
+                del self._reading[uri]
+                self._updated.discard(uri)
+
+    async def _read(self, session, uri: str) -> types.ReadResourceResult:
+        result = await session.read_resource(uri, subscribe=True)
+        if uri not in self._updated and session.subscribed(uri):
+            # Nobody needs updates for what the cache won't hold
+            for dropped in self._set(uri, result):
+                try:
+                    await session.unsubscribe(dropped)
+                except Exception as e:
+                    logger.warning(f"Could not unsubscribe from {dropped}: {e!r}")
+        return result
+
+    def _set(self, uri: str, result: types.ReadResourceResult) -> List[str]:
+        """Store ``result``; returns the URIs that didn't fit, evicted or ``uri``."""
+        size = _contents_size(result)
+        if size > self.max_bytes:
+            return [uri]
+        if uri in self._entries:
+            self._remove(uri)
+        self._entries[uri] = (size, result)
+        self._bytes += size
+        evicted = []
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            evicted.append(next(iter(self._entries)))
+            self._remove(evicted[-1])
+            self.evictions += 1
+        return evicted
+
+    def _remove(self, uri: str):
+        size, _ = self._entries.pop(uri)
+        self._bytes -= size
+
+    def invalidate(self, uri: str):
+        if uri in self._reading:
+            self._updated.add(uri)
+        if uri in self._entries:
+            self._remove(uri)
+            self.invalidations += 1
+
+    def clear(self):
+        self._updated.update(self._reading)
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+def watch_resources(notifications, cache: ResourceCache):
+    """Drop cached resources when the server says they changed."""
+
+    async def on_updated(notification):
+        cache.invalidate(str(notification.params.uri))
+
+    async def on_list_changed(notification):
+        # Resources may have gone away or been replaced
+        cache.clear()
+
+    notifications.subscribe("notifications/resources/updated", on_updated)
+    notifications.subscribe("notifications/resources/list_changed", on_list_changed)
+
+
+def get_resources_handler(session):
+    """Build the ``GET /_resources`` endpoint, listing the server's resources."""
+
+    async def list_resources():
+        try:
+            result = await session.list_resources()
+        except McpError as e:
+            raise HTTPException(status_code=502, detail={"message": e.error.message})
+        return [
+            resource.model_dump(mode="json", exclude_none=True)
+            for resource in result.resources
+        ]
+
+    return list_resources
+
+
+def get_resource_handler(session, cache: Optional[ResourceCache] = None):
+    """
+    Build the ``GET /_resources/read`` endpoint. A resource with one content
+    item is streamed as its own media type, blobs decoded on the fly; several
+    items are returned as JSON ``contents``.
+    """
+
+    async def read_resource(uri: str = Query(description="URI of the resource")):
+        try:
+            uri = resource_key(uri)
+        except ValidationError:
+            raise HTTPException(status_code=400, detail="Invalid resource URI")
+        try:
+            if cache is not None:
+                result = await cache.read(session, uri)
+            else:
+                result = await session.read_resource(uri)
+        except McpError as e:
+            status_code = 404 if e.error.code == RESOURCE_NOT_FOUND else 502
+            raise HTTPException(
+                status_code=status_code, detail={"message": e.error.message}
+            )
+
+        if len(result.contents) != 1:
+            return JSONResponse(
+                {
+                    "contents": [
+                        item.model_dump(mode="json", exclude_none=True)
+                        for item in result.contents
+                    ]
+                }
+            )
+
+        item = result.contents[0]
+        if isinstance(item, types.TextResourceContents):
+            data = item.text.encode()
+            return StreamingResponse(
+                _iter_bytes(data),
+                media_type=item.mimeType or "text/plain",
+                headers={"Content-Length": str(len(data))},
+            )
+        try:
+            # Fail before the response starts rather than halfway through it
+            base64.b64decode(item.blob[:DECODE_CHUNK], validate=True)
+        except binascii.Error:
+            raise HTTPException(status_code=502, detail="Invalid blob from MCP server")
+        return StreamingResponse(
+            _iter_base64(item.blob),
+            media_type=item.mimeType or "application/octet-stream",
+        )
+
+    return read_resource
+
+
+async def _iter_bytes(data: bytes) -> AsyncIterator[bytes]:
+    view = memoryview(data)
+    for offset in range(0, len(data), READ_CHUNK):
+        yield bytes(view[offset : offset + READ_CHUNK])
+
+
+async def _iter_base64(data: str) -> AsyncIterator[bytes]:
+    for offset in range(0, len(data), DECODE_CHUNK):
+        yield base64.b64decode(data[offset : offset + DECODE_CHUNK])
@@ -0,0 +1,220 @@
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+import anyio
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from mcpo.utils.health import health_response, server_health
+
+logger = logging.getLogger(__name__)
+
+
+class ServerRunner:
+    """
+    Runs the lifespan of a mounted MCP server sub-app in its own task.
+
+    This lets the main app start every server concurrently, bound each one by a
+    startup timeout, and start ``lazy`` servers on their first request instead
+    of at boot. A server that fails or times out is marked ``failed`` and is
+    retried on the next request to its prefix, but no sooner than an
+    exponential backoff (``restart_delay`` doubling up to ``max_restart_delay``)
+    allows; until then requests fail fast.
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        name: str,
+        startup_timeout: Optional[float] = 60,
+        lazy: bool = False,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60.0,
+    ):
+        self.app = app
+        self.name = name
+        self.startup_timeout = startup_timeout
+        self.lazy = lazy
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+
+        self.status = "stopped"  # "starting", "running", "failed"
+        self.error: Optional[str] = None
+        # Requests currently being served, counted by ServerDispatchMiddleware
+        self.active = 0
+        # Starts after a failure, and failures in a row
+        self.restarts = 0
+        self.failures = 0
+        self._retry_at = 0.0
+
+        self._task_group = None
+        self._lock = anyio.Lock()
+        self._cancel_scope: Optional[anyio.CancelScope] = None
+        self._stop: Optional[anyio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    @property
+    def retry_after(self) -> Optional[int]:
+        """Seconds until a failed server may be started again, if backing off."""
+        if self.status != "failed":
+            return None
+        remaining = self._retry_at - time.monotonic()
+        return math.ceil(remaining) if remaining > 0 else None
+
+    def _failed(self, error: str):
+        self.status = "failed"
+        self.error = error
+        self.failures += 1
+        delay = min(
+            self.restart_delay * 2 ** (self.failures - 1), self.max_restart_delay
+        )
+        self._retry_at = time.monotonic() + delay
+
+    def bind(self, task_group):
+        """Attach the long-lived task group the server lifespan will run in."""
+        self._task_group = task_group
+
+    async def start(self) -> bool:
+        """Start the server if needed and wait for it; returns whether it is running."""
+        if self.running:
+            return True
+        if self.retry_after is not None:
+            return False
+        async with self._lock:
+            if self.running:
+                return True
+            if self.retry_after is not None:
+                return False
+            if self._task_group is None:
+                self.error = "Proxy is not running"
+                return False
+
+            if self.status == "failed":
+                self.restarts += 1
+            self.status = "starting"
+            self.error = None
+            ready = anyio.Event()
+            self._stop = anyio.Event()
+            self._cancel_scope = anyio.CancelScope()
+            self._task_group.start_soon(self._run, ready, self._stop, self._cancel_scope)
+
+            logger.info(f"Starting MCP server '{self.name}'...")
+            with anyio.move_on_after(self.startup_timeout):
+                await ready.wait()
+
+            if not ready.is_set():
+                self._cancel_scope.cancel()
+                self._failed(f"Startup timed out after {self.startup_timeout}s")
+                logger.error(f"MCP server '{self.name}': {self.error}")
+            elif self.running:
+                self.failures = 0
+
+            return self.running
+
+    async def _run(self, ready: anyio.Event, stop: anyio.Event, cancel_scope):
+        with cancel_scope:
+            try:
+                async with self.app.router.lifespan_context(self.app):
+                    self.status = "running"
+                    ready.set()
+                    logger.info(f"MCP server '{self.name}' started")
+                    await stop.wait()
+            except Exception as e:
+                self._failed(str(e))
+                logger.error(f"MCP server '{self.name}' failed to start: {e}")
+            finally:
+                ready.set()
+        if self.status in ("running", "starting"):
+            self.status = "stopped"
+
+    async def stop(self):
+        if self.status == "starting" and self._cancel_scope is not None:
+            # Don't make shutdown wait for the startup timeout
+            self._cancel_scope.cancel()
+        if self._stop is not None:
+            self._stop.set()
+
+    async def drain(self, timeout: float = 30):
+        """Stop once in-flight requests have finished, or after ``timeout``."""
+        with anyio.move_on_after(timeout):
+            while self.active:
+                await anyio.sleep(0.1)
+        if self.active:
+            logger.warning(
+                f"MCP server '{self.name}': stopping with {self.active} "
+                "request(s) still in flight"
+            )
+        await self.stop()
+
+
+class ServerDispatchMiddleware:
+    """
+    Pure ASGI middleware on the main app that routes ``{path_prefix}{name}/...``
+    straight to the server's sub-app, holding requests until its runner has
+    started it, or answering ``503`` if it cannot be started.
+
+    The dict lookup replaces Starlette's linear scan over the mounts, so the
+    cost of routing a request doesn't grow with the number of servers. The
+    mounts stay registered for the docs, the lifespan and slash redirects.
+    """
+
+    def __init__(self, app, runners: Dict[str, ServerRunner], path_prefix: str = "/"):
+        self.app = app
+        # Filled in by run() as servers are configured
+        self.runners = runners
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        runner = None
+        if scope["type"] == "http":
+            root_path = scope.get("root_path", "")
+            path = scope["path"]
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path) :]
+            if path.startswith(self.path_prefix):
+                name, slash, rest = path[len(self.path_prefix) :].partition("/")
+                if slash:
+                    runner = self.runners.get(name)
+
+        if runner is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Health checks report a server that isn't running instead of starting it
+        if rest == "_health" and not runner.running:
+            response = health_response(server_health(runner.app))
+            await response(scope, receive, send)
+            return
+
+        if not runner.running and not await runner.start():
+            retry_after = runner.retry_after
+            response = JSONResponse(
+                status_code=503,
+                content={
+                    "detail": f"MCP server '{runner.name}' is unavailable: "
+                    f"{runner.error}"
+                },
+                headers={"Retry-After": str(retry_after)} if retry_after else None,
+            )
+            await response(scope, receive, send)
+            return
+
+        # Same child scope as Mount would build
+        runner.active += 1
+        try:
+            await runner.app(
+                {
+                    **scope,
+                    "app_root_path": scope.get("app_root_path", root_path),
+                    "root_path": root_path + self.path_prefix + name,
+                },
+                receive,
+                send,
+            )
+        finally:
+            runner.active -= 1
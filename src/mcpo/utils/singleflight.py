@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical tool calls into a single in-flight call.
+
+    Every caller with the same key awaits the same task and receives its result
+    or exception. The shared call is only cancelled once all of its callers
+    have gone away, so one aborted request doesn't fail the others.
+    """
+
+    def __init__(self, tools: Optional[Iterable[str]] = None):
+        # None means every tool is coalesced
+        self.tools = set(tools) if tools is not None else None
+        self._calls: Dict[str, _Call] = {}
+        self.coalesced = 0
+
+    @classmethod
+    def from_config(cls, config: Union[bool, Iterable[str]]) -> "SingleFlight":
+        """Build from a server's ``coalesce`` config: ``true`` or a list of tool names."""
+        return cls(None if config is True else config)
+
+    def enabled_for(self, tool_name: str) -> bool:
+        return self.tools is None or tool_name in self.tools
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Nobody may be left to observe the outcome of a cancelled call
+        if not call.task.cancelled():
+            call.task.exception()
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import anyio
+
+logger = logging.getLogger(__name__)
+
+
+def server_fingerprint(server_type: str, command: Optional[str], args: Any) -> str:
+    """Identifies a server by how it is reached, so config changes miss the store."""
+    return hashlib.sha256(
+        json.dumps([server_type, command, args], sort_keys=True).encode()
+    ).hexdigest()[:16]
+
+
+class ToolListStore:
+    """
+    On-disk copy of each server's last tools/list, keyed by server fingerprint.
+
+    On the next start the stored schemas are compiled while the server is still
+    starting, so by the time it lists its tools the models are already cached.
+    The file is a plain JSON object and is rewritten atomically on change.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = anyio.Lock()
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._entries = data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool cache {path}: {e}")
+
+    def load(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        return self._entries.get(key)
+
+    async def save(self, key: str, tools: List[Dict[str, Any]]):
+        """Remember ``tools`` for ``key``; the file is written in a worker thread."""
+        if self._entries.get(key) == tools:
+            return
+        self._entries[key] = tools
+
+        async with self._lock:
+            # Serialized under the lock, so the last write has every server's tools
+            data = json.dumps(self._entries)
+            try:
+                await anyio.to_thread.run_sync(self._write, data)
+            except OSError as e:
+                logger.warning(f"Could not write tool cache {self.path}: {e}")
+
+    def _write(self, data: str):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
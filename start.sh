@@ -7,7 +7,8 @@ mkdir -p /app/config
 # 啟動 mcpo (使用配置文件並在後台執行)
 echo "正在啟動 mcpo..."
 if [ -f "/app/config/config.json" ]; then
-  mcpo --config /app/config/config.json --port 8000 &
+  # --hot-reload: 修改 config.json 後自動套用，不需重啟 mcpo
+  mcpo --config /app/config/config.json --port 8000 --hot-reload &
   MCPO_PID=$! # 記錄 mcpo 的 process ID
   echo "mcpo 已啟動 (PID: $MCPO_PID)"
 else